@@ -0,0 +1,718 @@
+"""Résolution par lots de fichiers « une grille par ligne ».
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Format
+    ------
+    Chaque ligne du fichier d'entrée contient une grille complète sous la
+    forme compacte de 81 caractères, en ordre de lecture :
+        - chiffres 1-9 pour les valeurs connues ;
+        - "." ou "0" pour les cases vides.
+    Les lignes vides et les lignes commençant par "#" sont ignorées.
+
+    Le fichier de sortie contient, pour chaque grille lue et dans le même
+    ordre, sa première solution au même format compact. Une grille sans
+    solution ou mal formée donne une ligne vide, ce qui conserve la
+    correspondance ligne à ligne avec l'entrée.
+
+    Pipeline
+    --------
+    lecture paresseuse -> décodage -> résolution -> écriture : chaque étape
+    est un générateur, si bien que la mémoire utilisée ne dépend pas de la
+    taille du fichier. Le fichier est lu en binaire par blocs, décodés en
+    une fois par table de traduction (`iter_file`).
+
+    Parallélisme
+    ------------
+    Avec `--workers N`, les grilles sont découpées en paquets (`--chunk-size`)
+    répartis sur un pool de N processus. Le nombre de paquets en cours est
+    borné, ce qui évite d'accumuler en mémoire un fichier énorme quand la
+    lecture va plus vite que la résolution. Par défaut l'ordre de sortie est
+    celui de l'entrée ; `--unordered` écrit les paquets dès qu'ils sont prêts
+    (plus rapide, mais sans correspondance ligne à ligne).
+
+    Fichiers binaires
+    -----------------
+    L'entrée peut aussi être un fichier binaire de `app.store` (reconnu à
+    sa signature) : les grilles sont lues par projection mémoire, sans
+    décodage de texte. `--start` / `--stop` limitent le traitement à une
+    tranche de l'entrée ; pour un fichier binaire, le reste n'est pas lu.
+
+    Budgets
+    -------
+    `--max-nodes` et `--max-time` bornent la recherche de chaque grille
+    (voir `app.budget`) : une grille qui dépasse son budget donne une ligne
+    vide et est comptée à part dans le bilan. Une grille pathologique ne
+    bloque ainsi plus un processus indéfiniment.
+
+    Cache
+    -----
+    En mode séquentiel, `--cache N` active un cache LRU indexé par la forme
+    canonique des grilles (voir `app.canonical`) : les doublons et les
+    grilles équivalentes par symétrie ne sont résolus qu'une fois.
+    `--cache-file` le recharge au démarrage et le sauvegarde à la fin.
+
+    Table de transposition
+    ----------------------
+    En mode séquentiel, avec le moteur "bitmask", `--memo N` partage une
+    table de transposition de N états entre toutes les grilles (voir
+    `app.transposition`) : les impasses déjà explorées pour une grille ne
+    sont pas reparcourues pour une grille qui la recouvre. Le bilan indique
+    ses succès et échecs, pour juger de son intérêt sur le corpus.
+
+    Usage :
+        python -m app.batch entree.txt [-o sortie.txt] [--engine MOTEUR]
+            [--workers N] [--chunk-size K] [--unordered]
+            [--cache N] [--cache-file CHEMIN] [--memo [N]] [--start N]
+            [--stop N] [--max-nodes N] [--max-time S]
+"""
+
+from __future__ import annotations
+
+import contextlib
+import itertools
+import os
+import sys
+import time
+from collections import deque
+from typing import IO, Deque, Dict, Iterable, Iterator, List, Sequence, Set, Tuple
+
+from .canonical import DEFAULT_CACHE_SIZE, SolutionCache
+from .grid import BLANKS, FlatGrid
+from .store import PuzzleStore, is_store
+from .sudoku_solver import (
+    DEFAULT_ENGINE,
+    ENGINES,
+    MEMO_ENGINES,
+    format_compact,
+    iter_cell_solutions,
+    search_with_budget,
+)
+from .transposition import DEFAULT_TABLE_SIZE, TranspositionTable
+
+
+DEFAULT_CHUNK_SIZE = 256
+DEFAULT_READ_SIZE = 1 << 20
+
+#
+# Tables de décodage (`bytes.translate`) des lignes compactes : "1"-"9"
+# donnent 1-9, "." et "0" une case vide, tout autre octet INVALID. La table
+# `_BULK`, utilisée sur des tampons entiers, marque en plus les fins de
+# ligne, les blancs et "#" pour découper et filtrer les lignes après coup.
+#
+INVALID = 0xFF
+_NEWLINE, _BLANK, _COMMENT = 0xFE, 0xFD, 0xFC
+
+
+def _decode_tables() -> Tuple[bytes, bytes]:
+    """
+        Construit `_DECODE` et `_BULK`.
+    """
+
+    decode = bytearray([INVALID]) * 256
+
+    for value, char in enumerate(b"123456789", start=1):
+        decode[char] = value
+
+    for char in BLANKS:
+        decode[ord(char)] = 0
+
+    bulk = bytearray(decode)
+    bulk[ord("\n")] = _NEWLINE
+    bulk[ord("#")] = _COMMENT
+
+    for char in b" \t\r\v\f":
+        bulk[char] = _BLANK
+
+    return bytes(decode), bytes(bulk)
+
+
+_DECODE, _BULK = _decode_tables()
+_VALUES = bytes(range(10))
+_PLAIN = _VALUES + bytes([_NEWLINE])
+_NEWLINE_BYTE, _BLANK_BYTE = bytes([_NEWLINE]), bytes([_BLANK])
+
+#
+# (grille, solution) ; la grille vaut None si la ligne est mal formée, la
+# solution None si la grille n'en a pas, ou la raison de l'interruption
+# ("nodes", "time"...) si son budget est épuisé.
+#
+Result = Tuple["FlatGrid | None", "FlatGrid | str | None"]
+
+
+class BatchReport:
+    """
+        ========================================================
+          Bilan d'un traitement par lots
+        ========================================================
+
+        Classe ordinaire plutôt que `dataclass` : l'import du module
+        `dataclasses` pèse à lui seul sur le démarrage de la CLI.
+    """
+
+    def __init__(
+        self,
+        puzzles: int = 0,
+        solved: int = 0,
+        unsolved: int = 0,
+        invalid: int = 0,
+        aborted: int = 0,
+        elapsed: float = 0.0,
+    ):
+        self.puzzles = puzzles
+        self.solved = solved
+        self.unsolved = unsolved
+        self.invalid = invalid
+        self.aborted = aborted
+        self.elapsed = elapsed
+
+    @property
+    def rate(self) -> float:
+        """
+            Débit en grilles par seconde.
+        """
+
+        return self.puzzles / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.puzzles} grille(s) : {self.solved} résolue(s), "
+            f"{self.unsolved} sans solution, {self.invalid} invalide(s), "
+            f"{self.aborted} interrompue(s) en {self.elapsed:.3f} seconde(s) ({self.rate:.1f} grilles/s)."
+        )
+
+
+def parse_line(line: str) -> FlatGrid:
+    """
+        ========================================================
+          Ligne compacte de 81 caractères -> grille compacte
+        ========================================================
+
+        Conversion par table (`bytes.translate`), sans boucle Python par
+        caractère.
+    """
+
+    text = line.strip()
+
+    if len(text) != 81:
+        raise ValueError(f"Une ligne compacte doit contenir 81 caractères (reçu {len(text)}).")
+
+    #
+    # "replace" remplace chaque caractère non ASCII par un seul octet : les
+    # positions restent celles du texte
+    #
+    cells = bytearray(text.encode("ascii", "replace").translate(_DECODE))
+
+    if max(cells) > 9:
+        raise ValueError(f"Caractère inattendu dans la grille : {text[cells.index(INVALID)]!r}.")
+
+    return cells
+
+
+def format_line(cells: Sequence[int]) -> str:
+    """
+        ========================================================
+          81 valeurs -> ligne compacte ("." pour les cases vides)
+        ========================================================
+
+        Voir `sudoku_solver.format_compact`.
+    """
+
+    return format_compact(cells)
+
+
+def iter_lines(handler: IO[str]) -> Iterator[str]:
+    """
+        Lignes utiles du fichier (ni vides, ni commentaires), lues à la
+        demande.
+    """
+
+    for line in handler:
+        text = line.strip()
+
+        if text and not text.startswith("#"):
+            yield text
+
+
+def iter_buffer(data: bytes) -> Iterator[FlatGrid | None]:
+    """
+        ========================================================
+          Décodage en bloc d'un tampon « une grille par ligne »
+        ========================================================
+
+        Une seule traduction pour tout le tampon, puis une seule vérification
+        s'il ne contient que des grilles et des fins de ligne ; sinon, par
+        ligne, quelques opérations sur des octets. Mêmes règles
+        que `iter_lines` + `iter_puzzles` : lignes vides et commentaires
+        ignorés, None pour une ligne mal formée.
+    """
+
+    decoded = data.translate(_BULK)
+    lines = decoded.split(_NEWLINE_BYTE)
+
+    if not decoded.translate(None, _PLAIN):
+        #
+        # Cas courant : que des valeurs et des fins de ligne, aucune
+        # vérification par ligne n'est nécessaire au-delà de la longueur
+        #
+        for line in lines:
+            if line:
+                yield bytearray(line) if len(line) == 81 else None
+
+        return
+
+    for line in lines:
+        line = line.strip(_BLANK_BYTE)
+
+        if not line or line[0] == _COMMENT:
+            continue
+
+        if len(line) == 81 and not line.translate(None, _VALUES):
+            yield bytearray(line)
+        else:
+            yield None
+
+
+def iter_file(handler: IO[bytes], read_size: int = DEFAULT_READ_SIZE) -> Iterator[FlatGrid | None]:
+    """
+        Grilles d'un fichier ouvert en binaire, lu par blocs de `read_size`
+        octets découpés en fin de ligne (voir `iter_buffer`).
+    """
+
+    rest = b""
+
+    while True:
+        block = handler.read(read_size)
+
+        if not block:
+            break
+
+        block = rest + block
+        cut = block.rfind(b"\n") + 1
+        rest = block[cut:]
+
+        yield from iter_buffer(block[:cut])
+
+    if rest:
+        yield from iter_buffer(rest)
+
+
+def iter_puzzles(lines: Iterable[str]) -> Iterator[FlatGrid | None]:
+    """
+        Décode chaque ligne ; None pour une ligne mal formée.
+    """
+
+    for line in lines:
+        try:
+            yield parse_line(line)
+        except ValueError:
+            yield None
+
+
+def _check_budget(cache: SolutionCache | None, max_nodes: int | None, max_time: float | None) -> None:
+    """
+        Le cache et les budgets ne se combinent pas.
+    """
+
+    if cache is not None and (max_nodes is not None or max_time is not None):
+        raise ValueError("Le cache de solutions n'est pas disponible avec un budget par grille.")
+
+
+def solve_stream(
+    puzzles: Iterable[FlatGrid | None],
+    engine: str = DEFAULT_ENGINE,
+    cache: SolutionCache | None = None,
+    max_nodes: int | None = None,
+    max_time: float | None = None,
+    table: TranspositionTable | None = None,
+) -> Iterator[Result]:
+    """
+        ========================================================
+          Résolution à la volée d'un flux de grilles
+        ========================================================
+
+        Émet des couples (grille, première solution ou None). Avec `cache`,
+        les grilles déjà vues (à une symétrie près) ne sont pas re-résolues.
+        Avec `max_nodes` ou `max_time`, la recherche de chaque grille est
+        bornée (voir `Result`). `table` est une table de transposition
+        partagée par toutes les grilles du flux.
+    """
+
+    _check_budget(cache, max_nodes, max_time)
+    budgeted = max_nodes is not None or max_time is not None
+
+    for cells in puzzles:
+        if cells is None:
+            yield None, None
+        elif cache is not None:
+            yield cells, cache.solve(cells, engine)[0]
+        elif budgeted:
+            result = search_with_budget(
+                cells, engine, max_nodes=max_nodes, max_time=max_time, table=table
+            )
+            yield cells, result.solutions[0] if result.solutions else result.aborted
+        else:
+            yield cells, next(iter_cell_solutions(cells, engine, table=table), None)
+
+
+def _solve_chunk(
+    chunk: List[FlatGrid | None],
+    engine: str,
+    max_nodes: int | None = None,
+    max_time: float | None = None,
+) -> List[FlatGrid | str | None]:
+    """
+        Tâche exécutée dans un processus du pool : résout un paquet entier.
+        Seules les solutions sont renvoyées, les grilles restent côté parent.
+    """
+
+    return [solution for _, solution in solve_stream(chunk, engine, None, max_nodes, max_time)]
+
+
+def solve_parallel(
+    puzzles: Iterable[FlatGrid | None],
+    engine: str = DEFAULT_ENGINE,
+    workers: int | None = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ordered: bool = True,
+    max_nodes: int | None = None,
+    max_time: float | None = None,
+) -> Iterator[Result]:
+    """
+        ========================================================
+          Résolution d'un flux de grilles sur un pool de processus
+        ========================================================
+
+        - Les grilles sont envoyées par paquets de `chunk_size`.
+        - Au plus 2 paquets par processus sont en cours à un instant donné :
+          on ne lit la suite du flux qu'au fur et à mesure que des résultats
+          sont consommés (contre-pression).
+        - `ordered=True` rend les résultats dans l'ordre d'entrée ; sinon ils
+          sont rendus paquet par paquet, dès qu'ils sont prêts.
+        - `max_nodes` / `max_time` bornent la recherche de chaque grille.
+    """
+
+    if workers is None or workers < 1:
+        workers = os.cpu_count() or 1
+
+    if chunk_size < 1:
+        raise ValueError(f"La taille de paquet doit être positive (reçu {chunk_size}).")
+
+    from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+
+    max_pending = 2 * workers
+    iterator = iter(puzzles)
+    chunks: Dict[Future, List[FlatGrid | None]] = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+
+        def submit() -> Future | None:
+            chunk = list(itertools.islice(iterator, chunk_size))
+
+            if not chunk:
+                return None
+
+            future = executor.submit(_solve_chunk, chunk, engine, max_nodes, max_time)
+            chunks[future] = chunk
+            return future
+
+        def results(future: Future) -> Iterator[Result]:
+            return zip(chunks.pop(future), future.result())
+
+        if ordered:
+            queue: Deque[Future] = deque()
+
+            while True:
+                while len(queue) < max_pending:
+                    future = submit()
+
+                    if future is None:
+                        break
+
+                    queue.append(future)
+
+                if not queue:
+                    return
+
+                yield from results(queue.popleft())
+
+        else:
+            pending: Set[Future] = set()
+            exhausted = False
+
+            while True:
+                while not exhausted and len(pending) < max_pending:
+                    future = submit()
+
+                    if future is None:
+                        exhausted = True
+                    else:
+                        pending.add(future)
+
+                if not pending:
+                    return
+
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    yield from results(future)
+
+
+def run_batch(
+    source: IO[str],
+    target: IO[str],
+    engine: str = DEFAULT_ENGINE,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ordered: bool = True,
+    cache: SolutionCache | None = None,
+    max_nodes: int | None = None,
+    max_time: float | None = None,
+    table: TranspositionTable | None = None,
+) -> BatchReport:
+    """
+        ========================================================
+          Traitement complet : flux d'entrée -> flux de sortie
+        ========================================================
+
+        Avec `workers` différent de 1, la résolution passe par
+        `solve_parallel` (0 ou None : autant de processus que de cœurs).
+        Le cache n'est utilisable qu'en mode séquentiel, et sans budget ;
+        la table de transposition, en mode séquentiel seulement.
+    """
+
+    puzzles = iter_puzzles(iter_lines(source))
+    return run_puzzles(
+        puzzles, target, engine, workers, chunk_size, ordered, cache, max_nodes, max_time, table
+    )
+
+
+def iter_store(store: PuzzleStore, start: int = 0, stop: int | None = None) -> Iterator[FlatGrid]:
+    """
+        Grilles `start` à `stop` (exclu) d'un fichier binaire, copiées une à
+        une (les vues sur la projection ne peuvent pas être envoyées au pool).
+    """
+
+    for cells in store.iter_puzzles(start, stop):
+        yield bytearray(cells)
+
+
+def run_puzzles(
+    puzzles: Iterable[FlatGrid | None],
+    target: IO[str],
+    engine: str = DEFAULT_ENGINE,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ordered: bool = True,
+    cache: SolutionCache | None = None,
+    max_nodes: int | None = None,
+    max_time: float | None = None,
+    table: TranspositionTable | None = None,
+) -> BatchReport:
+    """
+        ========================================================
+          Traitement d'un flux de grilles décodées
+        ========================================================
+
+        Comme `run_batch`, pour des grilles déjà décodées (None pour une
+        grille mal formée), par exemple lues dans un fichier binaire.
+    """
+
+    if cache is not None and workers != 1:
+        raise ValueError("Le cache de solutions n'est disponible qu'avec un seul processus.")
+
+    if table is not None and workers != 1:
+        raise ValueError("La table de transposition n'est disponible qu'avec un seul processus.")
+
+    _check_budget(cache, max_nodes, max_time)
+
+    report = BatchReport()
+    start = time.perf_counter()
+
+    if workers == 1:
+        results = solve_stream(puzzles, engine, cache, max_nodes, max_time, table)
+    else:
+        results = solve_parallel(
+            puzzles, engine, workers, chunk_size, ordered, max_nodes, max_time
+        )
+
+    for cells, solution in results:
+        report.puzzles += 1
+
+        if cells is None:
+            report.invalid += 1
+            target.write("\n")
+        elif solution is None:
+            report.unsolved += 1
+            target.write("\n")
+        elif isinstance(solution, str):
+            report.aborted += 1
+            target.write("\n")
+        else:
+            report.solved += 1
+            target.write(format_line(solution) + "\n")
+
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+        ========================================================
+          Point d'entrée CLI
+        ========================================================
+
+        Usage :
+            python -m app.batch entree.txt [-o sortie.txt] [--engine MOTEUR]
+                [--workers N] [--chunk-size K] [--unordered]
+                [--cache N] [--cache-file CHEMIN] [--memo [N]] [--start N]
+                [--stop N] [--max-nodes N] [--max-time S]
+
+        - L'entrée est un fichier texte ou un fichier binaire de `app.store`.
+        - Sans `-o`, les solutions sont écrites sur la sortie standard.
+        - `--workers 0` utilise autant de processus que de cœurs.
+        - Le bilan (dont le débit en grilles/s) est écrit sur stderr.
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Résout un fichier de grilles (une par ligne)")
+
+    parser.add_argument(
+        "path",
+        help="Fichier d'entrée : une grille de 81 caractères par ligne, ou fichier binaire.",
+    )
+    parser.add_argument("-o", "--output", help="Fichier de sortie (défaut : sortie standard).")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help=f"Moteur de résolution (défaut : {DEFAULT_ENGINE}).",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus (défaut : 1 ; 0 = nombre de cœurs).",
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Nombre de grilles par paquet envoyé au pool (défaut : {DEFAULT_CHUNK_SIZE}).",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="Écrit les résultats dès qu'ils sont prêts, sans garder l'ordre d'entrée.",
+    )
+    parser.add_argument(
+        "--cache",
+        type=int,
+        nargs="?",
+        const=DEFAULT_CACHE_SIZE,
+        metavar="N",
+        help=f"Active le cache de solutions (N entrées, défaut : {DEFAULT_CACHE_SIZE}).",
+    )
+    parser.add_argument(
+        "--cache-file",
+        metavar="CHEMIN",
+        help="Fichier JSON du cache, rechargé au démarrage et sauvegardé à la fin.",
+    )
+    parser.add_argument(
+        "--memo",
+        type=int,
+        nargs="?",
+        const=DEFAULT_TABLE_SIZE,
+        metavar="N",
+        help=f"Active la table de transposition (N états, défaut : {DEFAULT_TABLE_SIZE}).",
+    )
+    parser.add_argument("--start", type=int, default=0, metavar="N", help="Première grille traitée.")
+    parser.add_argument("--stop", type=int, metavar="N", help="Grille de fin (exclue).")
+    parser.add_argument("--max-nodes", type=int, metavar="N", help="Budget de nœuds par grille.")
+    parser.add_argument("--max-time", type=float, metavar="S", help="Durée maximale par grille, en secondes.")
+    args = parser.parse_args(argv)
+
+    budgeted = args.max_nodes is not None or args.max_time is not None
+
+    cache = None
+
+    if args.cache is not None or args.cache_file is not None:
+        if args.workers != 1:
+            parser.error("le cache n'est disponible qu'avec --workers 1")
+
+        if budgeted:
+            parser.error("le cache n'est pas disponible avec --max-nodes / --max-time")
+
+        if args.cache is not None and args.cache < 1:
+            parser.error("--cache doit être positif")
+
+        cache = SolutionCache(DEFAULT_CACHE_SIZE if args.cache is None else args.cache)
+
+    table = None
+
+    if args.memo is not None:
+        if args.workers != 1:
+            parser.error("la table de transposition n'est disponible qu'avec --workers 1")
+
+        if args.engine not in MEMO_ENGINES:
+            parser.error(f"--memo n'est disponible qu'avec --engine {' / '.join(MEMO_ENGINES)}")
+
+        if args.memo < 1:
+            parser.error("--memo doit être positif")
+
+        table = TranspositionTable(args.memo)
+
+    options = dict(
+        engine=args.engine,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+        ordered=not args.unordered,
+        cache=cache,
+        max_nodes=args.max_nodes,
+        max_time=args.max_time,
+        table=table,
+    )
+
+    try:
+        if args.cache_file is not None and os.path.exists(args.cache_file):
+            cache.load(args.cache_file)
+
+        with contextlib.ExitStack() as stack:
+            if is_store(args.path):
+                store = stack.enter_context(PuzzleStore(args.path))
+                puzzles = iter_store(store, args.start, args.stop)
+            else:
+                source = stack.enter_context(open(args.path, "rb"))
+                puzzles = itertools.islice(iter_file(source), args.start, args.stop)
+
+            if args.output is None:
+                target = sys.stdout
+            else:
+                target = stack.enter_context(open(args.output, "w", encoding="utf-8"))
+
+            report = run_puzzles(puzzles, target, **options)
+
+        if args.cache_file is not None:
+            cache.save(args.cache_file)
+
+    except (OSError, ValueError) as exc:  # pragma: no cover - CLI UX
+        print(f"Erreur d'accès au fichier: {exc}", file=sys.stderr)
+        return 1
+
+    print(report, file=sys.stderr)
+
+    if cache is not None:
+        print(f"Cache : {cache.hits} succès, {cache.misses} échec(s).", file=sys.stderr)
+
+    if table is not None:
+        print(table.format(), file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - exécution directe
+    raise SystemExit(main())
@@ -0,0 +1,623 @@
+"""Banc de mesure des performances des solveurs.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Cibles
+    ------
+    Chaque cible est une façon de résoudre une grille :
+        - "solve:<moteur>"          : première solution (`iter_cell_solutions`) ;
+        - "find_solutions:<moteur>" : énumération complète des solutions,
+          comme le fait `main()` pour détecter les grilles non uniques ;
+        - "cherche"                 : la recherche historique de `sudoku.py`.
+
+    Les cibles historiques ("...:backtracking" et "cherche") peuvent prendre
+    plusieurs minutes sur les grilles difficiles : elles ne font pas partie
+    des cibles par défaut et doivent être demandées avec `--targets`.
+
+    Corpus
+    ------
+    Les corpus livrés dans `app/corpora` (format compact, une grille par
+    ligne) : "easy", "hard", "17clue" (grilles minimales) et "pathological"
+    (grilles construites contre le backtracking naïf, dont une grille sans
+    solution, très longue à réfuter par recherche). Un corpus peut aussi
+    être un chemin de fichier, texte ou binaire (`app.store`) ; `--start` /
+    `--stop` n'en mesurent qu'une tranche, et seule cette tranche est lue
+    dans un fichier binaire.
+
+    Mesures
+    -------
+    Pour chaque couple (cible, corpus) : latence médiane, p95 et p99 par
+    grille, débit en grilles par seconde et nombre de nœuds développés.
+    Les nœuds sont comptés lors d'une passe préalable, instrumentée (voir
+    `app.stats`), qui n'entre pas dans les durées mesurées. Dans cette
+    passe, chaque grille a une durée maximale (`--max-time`, voir
+    `app.budget`) : une grille qui la dépasse est comptée comme expirée et
+    exclue des mesures, au lieu de bloquer la campagne. Le résultat peut être écrit en JSON
+    (`--save`) puis comparé à une référence (`--baseline`) : toute
+    dégradation au-delà du seuil (`--threshold`, 10 % par défaut) est
+    signalée et le code de retour vaut 1.
+
+    Démarrage
+    ---------
+    Lancé des milliers de fois par des scripts, un CLI passe l'essentiel de
+    son temps à démarrer. `--startup` mesure, à la place des cibles, la
+    durée complète de chaque commande de `STARTUP_COMMANDS` (interpréteur,
+    imports, lecture et résolution d'une grille facile), chacune dans un
+    processus neuf. Le surcoût d'une commande est sa médiane moins celle de
+    l'interpréteur nu (`python -c pass`) ; au-delà de l'objectif
+    (`--startup-target`, `STARTUP_TARGET_MS` par défaut), il est signalé et
+    le code de retour vaut 1. Les médianes sont aussi comparées à la
+    référence, comme les autres mesures.
+
+    Usage :
+        python -m app.benchmark [--targets T ...] [--corpora C ...]
+            [--repeat N] [--start N] [--stop N] [--max-time S] [--json]
+            [--save FICHIER] [--baseline FICHIER]
+        python -m app.benchmark --startup [N] [--startup-target MS]
+"""
+
+from __future__ import annotations
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+from .batch import iter_file
+from .budget import Budget, SearchAborted
+from .grid import FlatGrid
+from .stats import SearchStats, percentile
+from .store import PuzzleStore, is_store
+from .sudoku_solver import ENGINES, iter_cell_solutions
+
+
+CORPORA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpora")
+CORPORA = ("easy", "hard", "17clue", "pathological")
+
+LEGACY_TARGETS = ("solve:backtracking", "find_solutions:backtracking", "cherche")
+TARGETS = tuple(
+    f"{mode}:{engine}" for mode in ("solve", "find_solutions") for engine in ENGINES
+) + ("cherche",)
+DEFAULT_TARGETS = tuple(target for target in TARGETS if target not in LEGACY_TARGETS)
+
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 0.10
+DEFAULT_MAX_TIME = 5.0
+REPORT_FORMAT_VERSION = 1
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+#
+# Commandes de démarrage, lancées depuis la racine du dépôt : "{grid}" est
+# remplacé par une grille facile sur 9 lignes, "{line}" par la même grille
+# sur une ligne. "python" (l'interpréteur nu) sert de plancher.
+#
+STARTUP_COMMANDS = {
+    "python": ("-c", "pass"),
+    "sudoku_solver": ("-m", "app.sudoku_solver", "{grid}"),
+    "sudoku_solver:jsonl": ("-m", "app.sudoku_solver", "--format", "jsonl", "{line}"),
+    "batch": ("-m", "app.batch", "{line}"),
+    "sudoku.py": ("sudoku.py", "{grid}"),
+}
+DEFAULT_STARTUP_REPEAT = 20
+STARTUP_TARGET_MS = 50.0
+
+#
+# Une cible prend une grille compacte et des statistiques à compléter (None
+# pour les passes chronométrées), et retourne le nombre de solutions.
+#
+Runner = Callable[[FlatGrid, "SearchStats | None"], int]
+
+
+def load_corpus(name: str, start: int = 0, stop: int | None = None) -> List[FlatGrid]:
+    """
+        Charge un corpus livré (`name`) ou un fichier (chemin quelconque,
+        texte ou binaire), limité aux grilles `start` à `stop` (exclu).
+    """
+
+    path = name if os.path.exists(name) else os.path.join(CORPORA_DIR, f"{name}.txt")
+
+    if is_store(path):
+        with PuzzleStore(path) as store:
+            return [bytearray(cells) for cells in store.iter_puzzles(start, stop)]
+
+    with open(path, "rb") as handler:
+        puzzles = list(itertools.islice(iter_file(handler), start, stop))
+
+    if None in puzzles:
+        raise ValueError(f"Ligne mal formée dans {path} (grille n° {puzzles.index(None)}).")
+
+    return puzzles
+
+
+def _engine_runner(engine: str, exhaustive: bool) -> Runner:
+    """
+        Cible « moteur » : première solution, ou toutes si `exhaustive`.
+    """
+
+    def run(cells: FlatGrid, stats: SearchStats | None) -> int:
+        solutions = iter_cell_solutions(cells, engine, stats=stats)
+
+        if exhaustive:
+            return sum(1 for _ in solutions)
+
+        return 1 if next(solutions, None) is not None else 0
+
+    return run
+
+
+def _cherche_runner(cells: FlatGrid, stats: SearchStats | None) -> int:
+    """
+        Cible « cherche » : la recherche de `sudoku.py`, sortie écran
+        neutralisée. Le compteur global `nb_iter` donne le nombre de nœuds.
+    """
+
+    import sudoku
+
+    sudoku.nb_iter = 0
+    sudoku.nb_solutions = 0
+
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            sudoku.cherche(sudoku.Grille(cells), stats.budget if stats is not None else None)
+    finally:
+        if stats is not None:
+            stats.nodes += sudoku.nb_iter
+
+    return sudoku.nb_solutions
+
+
+def get_runner(target: str) -> Runner:
+    """
+        Fonction de résolution associée au nom de cible.
+    """
+
+    if target not in TARGETS:
+        raise ValueError(
+            f"Cible inconnue : {target!r} (choix possibles : {', '.join(TARGETS)})."
+        )
+
+    if target == "cherche":
+        return _cherche_runner
+
+    mode, engine = target.split(":")
+    return _engine_runner(engine, exhaustive=mode == "find_solutions")
+
+
+def measure(
+    runner: Runner,
+    puzzles: List[FlatGrid],
+    repeat: int = DEFAULT_REPEAT,
+    max_time: float | None = DEFAULT_MAX_TIME,
+) -> Dict:
+    """
+        ========================================================
+          Mesure d'une cible sur un corpus
+        ========================================================
+
+        Une première passe instrumentée, hors chronométrage, compte les
+        nœuds ; les grilles qui y dépassent `max_time` (None : pas de
+        limite) sont écartées. Chaque grille restante est ensuite résolue
+        `repeat` fois ; toutes les durées servent au calcul des
+        percentiles. Une résolution préalable, non mesurée, absorbe les
+        coûts d'initialisation (matrice DLX, imports...).
+    """
+
+    completed: List[FlatGrid] = []
+    nodes = 0
+
+    for cells in puzzles:
+        budget = Budget(max_time=max_time).start() if max_time is not None else None
+        stats = SearchStats(budget=budget)
+
+        try:
+            runner(cells, stats)
+        except SearchAborted:
+            continue
+
+        nodes += stats.nodes
+        completed.append(cells)
+
+    if completed:
+        runner(completed[0], None)
+
+    samples: List[float] = []
+    solved = 0
+
+    for _ in range(repeat):
+        for cells in completed:
+            start = time.perf_counter()
+            count = runner(cells, None)
+            samples.append(time.perf_counter() - start)
+
+            solved += count > 0
+
+    total = sum(samples)
+    runs = len(samples)
+
+    return {
+        "puzzles": len(completed),
+        "timeouts": len(puzzles) - len(completed),
+        "solved": solved // repeat if repeat else 0,
+        "median_ms": 1000 * percentile(samples, 50) if runs else 0.0,
+        "p95_ms": 1000 * percentile(samples, 95) if runs else 0.0,
+        "p99_ms": 1000 * percentile(samples, 99) if runs else 0.0,
+        "puzzles_per_sec": runs / total if total else 0.0,
+        "nodes": nodes,
+    }
+
+
+def measure_startup(repeat: int = DEFAULT_STARTUP_REPEAT, log=None) -> Dict:
+    """
+        ========================================================
+          Durée de démarrage des CLI, chacune dans un processus neuf
+        ========================================================
+
+        Chaque commande de `STARTUP_COMMANDS` est lancée `repeat` fois (plus
+        une fois au préalable, hors mesure, pour les fichiers `.pyc`) sur
+        la première grille du corpus "easy". Retourne, par commande, la
+        médiane et le p95 en millisecondes et le surcoût par rapport à
+        l'interpréteur nu. Une commande en échec lève ValueError.
+    """
+
+    cells = load_corpus("easy", 0, 1)[0]
+    line = "".join(str(value) if value else "." for value in cells)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = {
+            "grid": os.path.join(directory, "grid.txt"),
+            "line": os.path.join(directory, "line.txt"),
+        }
+
+        with open(paths["grid"], "w", encoding="utf-8") as handler:
+            handler.write("\n".join(line[start : start + 9] for start in range(0, 81, 9)) + "\n")
+
+        with open(paths["line"], "w", encoding="utf-8") as handler:
+            handler.write(line + "\n")
+
+        results: Dict[str, Dict] = {}
+
+        for name, arguments in STARTUP_COMMANDS.items():
+            if log is not None:
+                print(f"  démarrage / {name}...", file=log, flush=True)
+
+            command = [sys.executable] + [argument.format(**paths) for argument in arguments]
+            samples: List[float] = []
+
+            for run in range(repeat + 1):
+                start = time.perf_counter()
+                completed = subprocess.run(
+                    command, cwd=ROOT_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+                )
+                elapsed = time.perf_counter() - start
+
+                if completed.returncode != 0:
+                    raise ValueError(f"La commande {name} a échoué (code {completed.returncode}).")
+
+                if run:
+                    samples.append(elapsed)
+
+            results[name] = {
+                "median_ms": 1000 * percentile(samples, 50) if samples else 0.0,
+                "p95_ms": 1000 * percentile(samples, 95) if samples else 0.0,
+            }
+
+    floor = results["python"]["median_ms"]
+
+    for stats in results.values():
+        stats["overhead_ms"] = stats["median_ms"] - floor
+
+    return results
+
+
+def check_startup(startup: Dict, target_ms: float = STARTUP_TARGET_MS) -> List[str]:
+    """
+        Commandes dont le surcoût de démarrage dépasse l'objectif.
+    """
+
+    return [
+        f"{name} : surcoût {stats['overhead_ms']:.1f} ms > objectif {target_ms:.1f} ms"
+        for name, stats in startup.items()
+        if stats["overhead_ms"] > target_ms
+    ]
+
+
+def run_benchmark(
+    targets: List[str],
+    corpora: List[str],
+    repeat: int = DEFAULT_REPEAT,
+    log=None,
+    start: int = 0,
+    stop: int | None = None,
+    max_time: float | None = DEFAULT_MAX_TIME,
+) -> Dict:
+    """
+        ========================================================
+          Campagne complète : toutes les cibles sur tous les corpus
+        ========================================================
+
+        Retourne le rapport sous forme de dictionnaire sérialisable en JSON.
+        `start` / `stop` limitent chaque corpus à une tranche ; `max_time`
+        est la durée maximale par grille (voir `measure`).
+    """
+
+    loaded = {name: load_corpus(name, start, stop) for name in corpora}
+    results: Dict[str, Dict[str, Dict]] = {}
+
+    for target in targets:
+        runner = get_runner(target)
+        results[target] = {}
+
+        for name, puzzles in loaded.items():
+            if log is not None:
+                print(f"  {target} / {name}...", file=log, flush=True)
+
+            results[target][name] = measure(runner, puzzles, repeat, max_time)
+
+    return {
+        "version": REPORT_FORMAT_VERSION,
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def run_startup(
+    repeat: int = DEFAULT_STARTUP_REPEAT, target_ms: float = STARTUP_TARGET_MS, log=None
+) -> Dict:
+    """
+        Rapport de démarrage (voir `measure_startup`), au format de
+        `run_benchmark`, sans cible de résolution.
+    """
+
+    return {
+        "version": REPORT_FORMAT_VERSION,
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "results": {},
+        "startup": measure_startup(repeat, log),
+        "startup_target_ms": target_ms,
+    }
+
+
+def compare(report: Dict, baseline: Dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """
+        ========================================================
+          Comparaison avec une référence : liste des régressions
+        ========================================================
+
+        Sont comparés, pour chaque couple (cible, corpus) présent des deux
+        côtés : la médiane et le p95 (plus hauts = moins bien), le débit
+        (plus bas = moins bien) et le nombre de nœuds.
+    """
+
+    regressions = []
+
+    for name, current in report.get("startup", {}).items():
+        old = baseline.get("startup", {}).get(name, {}).get("median_ms")
+        new = current["median_ms"]
+
+        if name != "python" and old and new > old * (1 + threshold):
+            regressions.append(
+                f"démarrage / {name} : median_ms {old:.3f} -> {new:.3f} "
+                f"(+{100 * (new / old - 1):.1f} %)"
+            )
+
+    for target, corpora in report["results"].items():
+        for name, current in corpora.items():
+            reference = baseline.get("results", {}).get(target, {}).get(name)
+
+            if reference is None:
+                continue
+
+            for metric in ("median_ms", "p95_ms", "nodes"):
+                new, old = current.get(metric), reference.get(metric)
+
+                if new is not None and old and new > old * (1 + threshold):
+                    regressions.append(
+                        f"{target} / {name} : {metric} {old:.3f} -> {new:.3f} "
+                        f"(+{100 * (new / old - 1):.1f} %)"
+                    )
+
+            new, old = current["puzzles_per_sec"], reference.get("puzzles_per_sec")
+
+            if old and new < old * (1 - threshold):
+                regressions.append(
+                    f"{target} / {name} : puzzles_per_sec {old:.1f} -> {new:.1f} "
+                    f"(-{100 * (1 - new / old):.1f} %)"
+                )
+
+    return regressions
+
+
+def format_report(report: Dict) -> str:
+    """
+        Tableau lisible du rapport.
+    """
+
+    header = (
+        f"{'cible':<28} {'corpus':<13} {'grilles':>7} {'expirées':>8} {'médiane':>10} "
+        f"{'p95':>10} {'p99':>10} {'grilles/s':>10} {'nœuds':>9}"
+    )
+    lines = [header, "-" * len(header)] if report["results"] else []
+
+    for target, corpora in report["results"].items():
+        for name, stats in corpora.items():
+            nodes = "-" if stats["nodes"] is None else str(stats["nodes"])
+
+            lines.append(
+                f"{target:<28} {name:<13} {stats['puzzles']:>7} {stats.get('timeouts', 0):>8} "
+                f"{stats['median_ms']:>8.3f}ms {stats['p95_ms']:>8.3f}ms "
+                f"{stats['p99_ms']:>8.3f}ms {stats['puzzles_per_sec']:>10.1f} {nodes:>9}"
+            )
+
+    if "startup" in report:
+        header = f"{'démarrage':<28} {'médiane':>10} {'p95':>10} {'surcoût':>10}"
+        lines += ([""] if lines else []) + [header, "-" * len(header)]
+
+        for name, stats in report["startup"].items():
+            lines.append(
+                f"{name:<28} {stats['median_ms']:>8.1f}ms {stats['p95_ms']:>8.1f}ms "
+                f"{stats['overhead_ms']:>8.1f}ms"
+            )
+
+        lines.append(f"Objectif : surcoût au plus {report['startup_target_ms']:.1f} ms.")
+
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+        ========================================================
+          Point d'entrée CLI
+        ========================================================
+
+        Usage :
+            python -m app.benchmark [--targets T ...] [--corpora C ...]
+                [--repeat N] [--start N] [--stop N] [--max-time S] [--json]
+                [--save FICHIER] [--baseline FICHIER] [--threshold S]
+            python -m app.benchmark --startup [N] [--startup-target MS]
+
+        - Les corpus sont des noms de `app/corpora` ou des chemins de fichier
+          (texte ou binaire).
+        - `--max-time 0` supprime la durée maximale par grille.
+        - `--startup` mesure le démarrage des CLI (N lancements par
+          commande, défaut : `DEFAULT_STARTUP_REPEAT`) au lieu des cibles.
+        - Code de retour 1 si une régression est détectée par rapport à la
+          référence, ou si un surcoût de démarrage dépasse l'objectif.
+    """
+
+    parser = argparse.ArgumentParser(description="Mesure les performances des solveurs")
+
+    parser.add_argument(
+        "--targets",
+        nargs="+",
+        default=list(DEFAULT_TARGETS),
+        metavar="CIBLE",
+        help=f"Cibles à mesurer (choix : {', '.join(TARGETS)}).",
+    )
+    parser.add_argument(
+        "--corpora",
+        nargs="+",
+        default=list(CORPORA),
+        metavar="CORPUS",
+        help=f"Corpus livrés ({', '.join(CORPORA)}) ou chemins de fichiers.",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=DEFAULT_REPEAT,
+        help=f"Nombre de passes sur chaque corpus (défaut : {DEFAULT_REPEAT}).",
+    )
+    parser.add_argument(
+        "--start", type=int, default=0, metavar="N", help="Première grille de chaque corpus."
+    )
+    parser.add_argument("--stop", type=int, metavar="N", help="Grille de fin (exclue) de chaque corpus.")
+    parser.add_argument(
+        "--max-time",
+        type=float,
+        default=DEFAULT_MAX_TIME,
+        metavar="S",
+        help=f"Durée maximale par grille, en secondes (défaut : {DEFAULT_MAX_TIME} ; 0 = aucune).",
+    )
+    parser.add_argument("--json", action="store_true", help="Écrit le rapport JSON sur stdout.")
+    parser.add_argument("--save", metavar="FICHIER", help="Enregistre le rapport JSON.")
+    parser.add_argument("--baseline", metavar="FICHIER", help="Rapport JSON de référence.")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Dégradation tolérée avant de signaler une régression (défaut : {DEFAULT_THRESHOLD}).",
+    )
+    parser.add_argument(
+        "--startup",
+        nargs="?",
+        type=int,
+        const=DEFAULT_STARTUP_REPEAT,
+        metavar="N",
+        help=(
+            "Mesure le démarrage des CLI au lieu des cibles, N lancements par commande "
+            f"(défaut : {DEFAULT_STARTUP_REPEAT})."
+        ),
+    )
+    parser.add_argument(
+        "--startup-target",
+        type=float,
+        default=STARTUP_TARGET_MS,
+        metavar="MS",
+        help=f"Surcoût de démarrage maximal, en millisecondes (défaut : {STARTUP_TARGET_MS}).",
+    )
+    args = parser.parse_args(argv)
+
+    if args.startup is not None and args.startup < 1:
+        parser.error(f"le nombre de lancements doit être positif (reçu {args.startup})")
+
+    try:
+        if args.startup is not None:
+            report = run_startup(args.startup, args.startup_target, log=sys.stderr)
+        else:
+            report = run_benchmark(
+                args.targets,
+                args.corpora,
+                args.repeat,
+                log=sys.stderr,
+                start=args.start,
+                stop=args.stop,
+                max_time=args.max_time or None,
+            )
+    except (OSError, ValueError) as exc:  # pragma: no cover - CLI UX
+        print(f"Erreur : {exc}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    else:
+        print(format_report(report))
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as handler:
+            json.dump(report, handler, indent=2)
+
+    status = 0
+
+    if "startup" in report:
+        failures = check_startup(report["startup"], report["startup_target_ms"])
+
+        if failures:
+            print("\nObjectif de démarrage dépassé :", file=sys.stderr)
+
+            for line in failures:
+                print(f"  - {line}", file=sys.stderr)
+
+            status = 1
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as handler:
+            regressions = compare(report, json.load(handler), args.threshold)
+
+        if regressions:
+            print("\nRégressions détectées :", file=sys.stderr)
+
+            for line in regressions:
+                print(f"  - {line}", file=sys.stderr)
+
+            return 1
+
+        print("\nAucune régression par rapport à la référence.", file=sys.stderr)
+
+    return status
+
+
+if __name__ == "__main__":  # pragma: no cover - exécution directe
+    raise SystemExit(main())
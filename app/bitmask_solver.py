@@ -0,0 +1,571 @@
+"""Moteur de résolution par masques de bits.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Principe
+    --------
+    Le moteur historique (`_is_valid`) re-parcourt la ligne, la colonne et le
+    bloc 3x3 pour chaque valeur testée. Ici, on maintient trois tableaux de
+    masques d'occupation :
+        - rows[r]  : le bit (v - 1) est levé si la valeur v est dans la ligne r ;
+        - cols[c]  : idem pour la colonne c ;
+        - boxes[b] : idem pour le bloc b.
+
+    Ces masques sont mis à jour de façon incrémentale à chaque placement et à
+    chaque retour arrière : tester une valeur ou lister les candidats d'une
+    case devient une simple opération sur les bits.
+
+    Choix de la case (heuristique)
+    ------------------------------
+        - "first" : première case vide dans l'ordre de lecture ;
+        - "mrv"   : case la plus contrainte d'abord (*minimum remaining
+          values*). Le nombre de candidats de chaque case est tenu à jour de
+          façon incrémentale par `CountingState` lors des placements et des
+          retours arrière, sans jamais tout recalculer.
+
+    Représentation
+    --------------
+    Le moteur travaille sur une grille compacte (`app.grid`) : 81 octets en
+    ordre de lecture, 0 pour une case vide. Chaque solution émise est une
+    copie de ce tableau d'octets. La conversion depuis/vers la grille 9x9
+    est faite par `app.sudoku_solver`.
+
+    Instrumentation
+    ---------------
+    Avec un objet `stats` (`app.stats.SearchStats`), la recherche passe par
+    `_search_traced`, qui compte les nœuds et chronomètre le choix de la
+    case et la mise à jour des masques ; sans lui, `_search` / `_search_mrv`
+    sont utilisées telles quelles.
+
+    Table de transposition
+    ----------------------
+    Avec une table (`app.transposition.TranspositionTable`, paramètre
+    `table`), la recherche passe par `_search_memo` (ou `_count_memo` pour
+    `count_solutions`), qui tient à jour la clé de Zobrist de la grille à
+    chaque placement : les impasses déjà rencontrées sont écartées, et un
+    comptage reprend directement le nombre de solutions d'un état connu.
+"""
+
+from __future__ import annotations
+
+import itertools
+import time
+from typing import Iterator, List, Sequence
+
+from .grid import FlatGrid
+from .stats import SearchStats
+from .tables import BOX_OF, COL_OF, FULL_MASK, PEERS, POPCOUNT, ROW_OF, VALUE_OF_BIT
+from .transposition import ZOBRIST, TranspositionTable, zobrist_key
+
+
+HEURISTICS = ("first", "mrv")
+DEFAULT_HEURISTIC = "mrv"
+
+
+class BitmaskState:
+    """
+        ========================================================
+          État de recherche : cases + masques d'occupation
+        ========================================================
+
+        - `cells` : les 81 valeurs courantes (0 = vide) ;
+        - `rows`, `cols`, `boxes` : masques des valeurs déjà utilisées ;
+        - `consistent` : faux si les indices de départ se contredisent
+          (même valeur deux fois dans une ligne, colonne ou bloc).
+    """
+
+    __slots__ = ("cells", "rows", "cols", "boxes", "consistent")
+
+    def __init__(self, cells: Sequence[int]):
+        if len(cells) != 81:
+            raise ValueError(f"La grille doit contenir 81 cases (reçu {len(cells)}).")
+
+        self.cells: FlatGrid = bytearray(81)
+        self.rows = [0] * 9
+        self.cols = [0] * 9
+        self.boxes = [0] * 9
+        self.consistent = True
+
+        for index, value in enumerate(cells):
+            if not value:
+                continue
+
+            if not 1 <= value <= 9:
+                raise ValueError(f"Valeur hors limites en case {index} : {value}.")
+
+            if not self.candidates(index) & (1 << (value - 1)):
+                self.consistent = False
+
+            BitmaskState.place(self, index, value)
+
+    def candidates(self, index: int) -> int:
+        """
+            Masque des valeurs encore possibles pour la case `index`.
+        """
+
+        return FULL_MASK & ~(
+            self.rows[ROW_OF[index]] | self.cols[COL_OF[index]] | self.boxes[BOX_OF[index]]
+        )
+
+    def place(self, index: int, value: int) -> None:
+        """
+            Place `value` dans la case `index` et met à jour les masques.
+        """
+
+        bit = 1 << (value - 1)
+        self.cells[index] = value
+        self.rows[ROW_OF[index]] |= bit
+        self.cols[COL_OF[index]] |= bit
+        self.boxes[BOX_OF[index]] |= bit
+
+    def undo(self, index: int, value: int) -> None:
+        """
+            Retire `value` de la case `index` (retour arrière).
+        """
+
+        mask = ~(1 << (value - 1))
+        self.cells[index] = 0
+        self.rows[ROW_OF[index]] &= mask
+        self.cols[COL_OF[index]] &= mask
+        self.boxes[BOX_OF[index]] &= mask
+
+
+class CountingState(BitmaskState):
+    """
+        ========================================================
+          État de recherche avec nombre de candidats par case
+        ========================================================
+
+        `counts[i]` donne le nombre de candidats de la case vide `i`. À chaque
+        placement, seuls les voisins vides qui perdent réellement la valeur
+        sont décrémentés ; le retour arrière fait l'opération inverse.
+
+        La valeur de `counts` pour une case remplie n'a pas de sens : elle
+        redevient exacte dès que la case est libérée, car les placements
+        effectués entre-temps ont tous été annulés (discipline de pile).
+    """
+
+    __slots__ = ("counts",)
+
+    def __init__(self, cells: Sequence[int]):
+        super().__init__(cells)
+        self.counts = [
+            0 if value else POPCOUNT[self.candidates(index)]
+            for index, value in enumerate(self.cells)
+        ]
+
+    def place(self, index: int, value: int) -> None:
+        bit = 1 << (value - 1)
+        cells = self.cells
+        counts = self.counts
+
+        for peer in PEERS[index]:
+            if not cells[peer] and self.candidates(peer) & bit:
+                counts[peer] -= 1
+
+        BitmaskState.place(self, index, value)
+
+    def undo(self, index: int, value: int) -> None:
+        bit = 1 << (value - 1)
+        cells = self.cells
+        counts = self.counts
+
+        BitmaskState.undo(self, index, value)
+
+        for peer in PEERS[index]:
+            if not cells[peer] and self.candidates(peer) & bit:
+                counts[peer] += 1
+
+
+def _search(state: BitmaskState, empties: List[int], depth: int) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Backtracking récursif sur les cases vides
+        ========================================================
+
+        Les cases sont traitées dans l'ordre de `empties` (ordre de lecture),
+        et les candidats par valeur croissante (bit de poids faible d'abord) :
+        on obtient donc les solutions dans le même ordre que le moteur
+        historique.
+    """
+
+    if depth == len(empties):
+        yield state.cells[:]
+        return
+
+    index = empties[depth]
+    mask = state.candidates(index)
+
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        value = VALUE_OF_BIT[bit]
+
+        state.place(index, value)
+        yield from _search(state, empties, depth + 1)
+        state.undo(index, value)
+
+
+def _choose(state: BitmaskState, empties: List[int], depth: int, mrv: bool) -> int:
+    """
+        Position, dans `empties[depth:]`, de la case à développer (-1 : une
+        case vide n'a plus aucun candidat).
+    """
+
+    if not mrv:
+        return depth
+
+    counts = state.counts  # type: ignore[attr-defined]
+    best = depth
+    best_count = 10
+
+    for position in range(depth, len(empties)):
+        count = counts[empties[position]]
+
+        if count < best_count:
+            best, best_count = position, count
+
+            if count <= 1:
+                break
+
+    return best if best_count else -1
+
+
+def _search_mrv(state: CountingState, empties: List[int], depth: int) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Backtracking récursif, case la plus contrainte d'abord
+        ========================================================
+
+        `empties[depth:]` contient les cases encore vides. À chaque niveau,
+        on choisit celle qui a le moins de candidats (arrêt immédiat si l'on
+        en trouve une à 0 ou 1 candidat) et on la permute en position `depth`.
+    """
+
+    if depth == len(empties):
+        yield state.cells[:]
+        return
+
+    best = _choose(state, empties, depth, True)
+
+    if best < 0:
+        #
+        # Impasse : une case vide n'a plus aucun candidat
+        #
+        return
+
+    empties[depth], empties[best] = empties[best], empties[depth]
+    index = empties[depth]
+    mask = state.candidates(index)
+
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        value = VALUE_OF_BIT[bit]
+
+        state.place(index, value)
+        yield from _search_mrv(state, empties, depth + 1)
+        state.undo(index, value)
+
+
+def _search_traced(
+    state: BitmaskState, empties: List[int], depth: int, mrv: bool, stats: SearchStats
+) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Variante instrumentée de `_search` / `_search_mrv`
+        ========================================================
+
+        Même parcours, dans le même ordre, avec mise à jour de `stats`.
+    """
+
+    stats.enter(depth)
+
+    if depth == len(empties):
+        yield state.cells[:]
+        return
+
+    clock = time.perf_counter
+    start = clock()
+
+    best = _choose(state, empties, depth, mrv)
+    stats.select_time += clock() - start
+
+    if best < 0:
+        stats.backtracks += 1
+        return
+
+    empties[depth], empties[best] = empties[best], empties[depth]
+    index = empties[depth]
+
+    start = clock()
+    mask = state.candidates(index)
+    stats.check_time += clock() - start
+
+    if not mask:
+        stats.backtracks += 1
+        return
+
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        value = VALUE_OF_BIT[bit]
+        stats.branching[depth] += 1
+
+        start = clock()
+        state.place(index, value)
+        stats.check_time += clock() - start
+
+        yield from _search_traced(state, empties, depth + 1, mrv, stats)
+
+        start = clock()
+        state.undo(index, value)
+        stats.check_time += clock() - start
+
+
+def _search_memo(
+    state: BitmaskState,
+    empties: List[int],
+    depth: int,
+    mrv: bool,
+    table: TranspositionTable,
+    key: int,
+    stats: SearchStats | None,
+) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Backtracking avec table de transposition
+        ========================================================
+
+        Même choix de case que `_search` / `_search_mrv`, mais un état déjà
+        reconnu comme impasse est abandonné aussitôt. Un état dont le
+        sous-arbre a été parcouru en entier est enregistré avec son nombre
+        de solutions ; si le consommateur s'arrête avant (première solution
+        seulement), rien n'est enregistré.
+
+        Tant que la table ne répond pas, le parcours est exactement celui
+        de `_search` / `_search_mrv`. Un sous-arbre écarté ne permute pas
+        `empties` comme l'aurait fait son parcours : avec "mrv", la suite de
+        la recherche peut alors départager autrement les cases ex æquo
+        (mêmes solutions, dans un ordre éventuellement différent).
+    """
+
+    if stats is not None:
+        stats.enter(depth)
+
+    if depth == len(empties):
+        yield state.cells[:]
+        return
+
+    best = _choose(state, empties, depth, mrv)
+
+    if best < 0:
+        if stats is not None:
+            stats.backtracks += 1
+        return
+
+    empties[depth], empties[best] = empties[best], empties[depth]
+
+    if table.probe(key) == 0:
+        if stats is not None:
+            stats.backtracks += 1
+        return
+
+    index = empties[depth]
+    keys = ZOBRIST[index]
+    mask = state.candidates(index)
+    found = 0
+
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        value = VALUE_OF_BIT[bit]
+
+        state.place(index, value)
+
+        for solution in _search_memo(state, empties, depth + 1, mrv, table, key ^ keys[value], stats):
+            found += 1
+            yield solution
+
+        state.undo(index, value)
+
+    if not found and stats is not None:
+        stats.backtracks += 1
+
+    table.store(key, found)
+
+
+def _count_memo(
+    state: BitmaskState,
+    empties: List[int],
+    depth: int,
+    mrv: bool,
+    table: TranspositionTable,
+    key: int,
+    limit: int | None,
+    stats: SearchStats | None,
+) -> int:
+    """
+        ========================================================
+          Comptage des solutions avec table de transposition
+        ========================================================
+
+        Rend le nombre de solutions sous l'état courant, ou au moins `limit`
+        si la limite est atteinte (sous-arbre alors non enregistré). Un état
+        connu rend directement le nombre mémorisé. Même parcours que
+        `_search_memo`.
+    """
+
+    if stats is not None:
+        stats.enter(depth)
+
+    if depth == len(empties):
+        return 1
+
+    best = _choose(state, empties, depth, mrv)
+
+    if best < 0:
+        if stats is not None:
+            stats.backtracks += 1
+        return 0
+
+    empties[depth], empties[best] = empties[best], empties[depth]
+    known = table.probe(key)
+
+    if known is not None:
+        return known
+
+    index = empties[depth]
+    keys = ZOBRIST[index]
+    mask = state.candidates(index)
+    total = 0
+
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        value = VALUE_OF_BIT[bit]
+
+        state.place(index, value)
+        total += _count_memo(
+            state,
+            empties,
+            depth + 1,
+            mrv,
+            table,
+            key ^ keys[value],
+            None if limit is None else limit - total,
+            stats,
+        )
+        state.undo(index, value)
+
+        if limit is not None and total >= limit:
+            return total
+
+    if not total and stats is not None:
+        stats.backtracks += 1
+
+    table.store(key, total)
+    return total
+
+
+def _check_heuristic(heuristic: str) -> None:
+    """
+        Vérifie que l'heuristique demandée fait partie de `HEURISTICS`.
+    """
+
+    if heuristic not in HEURISTICS:
+        raise ValueError(
+            f"Heuristique inconnue : {heuristic!r} (choix possibles : {', '.join(HEURISTICS)})."
+        )
+
+
+def iter_solutions(
+    cells: Sequence[int],
+    heuristic: str = DEFAULT_HEURISTIC,
+    stats: SearchStats | None = None,
+    table: TranspositionTable | None = None,
+) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Générateur : toutes les solutions d'une grille à plat
+        ========================================================
+
+        Chaque solution est émise sous forme d'une nouvelle grille compacte ;
+        la séquence d'entrée n'est jamais modifiée. `stats`, s'il est
+        fourni, est complété au fil de la recherche. Avec `table`, la
+        recherche écarte les impasses déjà mémorisées et enregistre les
+        siennes.
+    """
+
+    _check_heuristic(heuristic)
+
+    if heuristic == "mrv":
+        state: BitmaskState = CountingState(cells)
+        search = _search_mrv
+    else:
+        state = BitmaskState(cells)
+        search = _search
+
+    if not state.consistent:
+        return
+
+    empties = [index for index, value in enumerate(state.cells) if not value]
+
+    if table is not None:
+        yield from _search_memo(
+            state, empties, 0, heuristic == "mrv", table, zobrist_key(state.cells), stats
+        )
+    elif stats is not None:
+        yield from _search_traced(state, empties, 0, heuristic == "mrv", stats)
+    else:
+        yield from search(state, empties, 0)
+
+
+def count_solutions(
+    cells: Sequence[int],
+    limit: int | None = None,
+    heuristic: str = DEFAULT_HEURISTIC,
+    table: TranspositionTable | None = None,
+    stats: SearchStats | None = None,
+) -> int:
+    """
+        ========================================================
+          Comptage des solutions, arrêté dès `limit` atteint
+        ========================================================
+
+        Avec `table`, les sous-arbres déjà comptés ne sont pas reparcourus ;
+        le résultat est plafonné à `limit`.
+    """
+
+    _check_heuristic(heuristic)
+
+    if table is None:
+        return sum(1 for _ in itertools.islice(iter_solutions(cells, heuristic, stats), limit))
+
+    state: BitmaskState = CountingState(cells) if heuristic == "mrv" else BitmaskState(cells)
+
+    if not state.consistent:
+        return 0
+
+    empties = [index for index, value in enumerate(state.cells) if not value]
+    total = _count_memo(
+        state, empties, 0, heuristic == "mrv", table, zobrist_key(state.cells), limit, stats
+    )
+
+    return total if limit is None else min(total, limit)
+
+
+def solve_cells(
+    cells: Sequence[int],
+    heuristic: str = DEFAULT_HEURISTIC,
+    stats: SearchStats | None = None,
+) -> FlatGrid | None:
+    """
+        ========================================================
+          Première solution d'une grille à plat (ou None)
+        ========================================================
+    """
+
+    return next(iter_solutions(cells, heuristic, stats), None)
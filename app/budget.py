@@ -0,0 +1,136 @@
+"""Budgets de recherche : nœuds, durée et annulation coopérative.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Principe
+    --------
+    Un objet `Budget` fixe les limites d'une recherche :
+        - max_nodes : nombre maximal de nœuds développés ;
+        - max_time  : durée maximale, en secondes, à partir de la création
+          du budget, ou du dernier appel à `start()` ;
+        - cancel    : jeton d'annulation (`CancelToken`), qu'un autre thread
+          peut déclencher à tout moment.
+
+    Le budget est rattaché à un objet `SearchStats` (attribut `budget`) :
+    les recherches instrumentées appellent `check` tous les `check_every`
+    nœuds, ce qui ne coûte qu'un test et un modulo par nœud. Les nœuds sont
+    comptés à partir de `start(nodes)` : un objet `SearchStats` déjà
+    utilisé (dont les compteurs s'additionnent) garde ainsi, pour chaque
+    recherche, son budget de nœuds entier. Une limite
+    atteinte lève `SearchAborted`, dont l'attribut `reason` vaut "nodes",
+    "time" ou "cancelled". La recherche s'arrête proprement (les moteurs
+    restaurent leur état en sortie) ; les statistiques et les solutions
+    déjà trouvées restent disponibles (voir
+    `app.sudoku_solver.search_with_budget`).
+
+    Précision
+    ---------
+    Les limites sont vérifiées tous les `check_every` nœuds : le nombre de
+    nœuds peut dépasser `max_nodes` de moins de `check_every`, et la durée
+    dépasser `max_time` du temps de développement de ces nœuds.
+"""
+
+from __future__ import annotations
+
+import time
+
+
+DEFAULT_CHECK_EVERY = 256
+
+REASONS = ("nodes", "time", "cancelled")
+
+
+class SearchAborted(Exception):
+    """
+        Recherche interrompue : budget épuisé ou annulation.
+    """
+
+    def __init__(self, reason: str):
+        super().__init__(f"Recherche interrompue ({reason}).")
+        self.reason = reason
+
+
+class CancelToken:
+    """
+        ========================================================
+          Jeton d'annulation coopérative
+        ========================================================
+
+        `cancel()` peut être appelé depuis n'importe quel thread ; la
+        recherche s'arrête à la vérification suivante.
+    """
+
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self) -> None:
+        self.cancelled = True
+
+
+class Budget:
+    """
+        ========================================================
+          Limites d'une recherche
+        ========================================================
+    """
+
+    __slots__ = ("max_nodes", "max_time", "cancel", "check_every", "deadline", "start_nodes")
+
+    def __init__(
+        self,
+        max_nodes: int | None = None,
+        max_time: float | None = None,
+        cancel: CancelToken | None = None,
+        check_every: int = DEFAULT_CHECK_EVERY,
+    ):
+        if max_nodes is not None and max_nodes < 1:
+            raise ValueError(f"Le budget de nœuds doit être positif (reçu {max_nodes}).")
+
+        if max_time is not None and max_time <= 0:
+            raise ValueError(f"La durée maximale doit être positive (reçu {max_time}).")
+
+        if check_every < 1:
+            raise ValueError(f"La période de vérification doit être positive (reçu {check_every}).")
+
+        self.max_nodes = max_nodes
+        self.max_time = max_time
+        self.cancel = cancel
+        self.check_every = check_every if max_nodes is None else min(check_every, max_nodes)
+        self.deadline: float | None = None
+        self.start_nodes = 0
+        self.start()
+
+    def start(self, nodes: int = 0) -> "Budget":
+        """
+            (Re)démarre le chronomètre de `max_time`, déjà démarré à la
+            création du budget : un budget utilisé sans `start()` respecte
+            donc aussi sa durée maximale. `nodes` (nombre de nœuds déjà
+            comptés par les statistiques) sert d'origine à `max_nodes` et
+            aux vérifications périodiques.
+        """
+
+        self.start_nodes = nodes
+
+        if self.max_time is not None:
+            self.deadline = time.perf_counter() + self.max_time
+
+        return self
+
+    def check(self, nodes: int) -> None:
+        """
+            Lève `SearchAborted` si une limite est atteinte (`nodes` : total
+            des statistiques, origine comprise).
+        """
+
+        if self.max_nodes is not None and nodes - self.start_nodes >= self.max_nodes:
+            raise SearchAborted("nodes")
+
+        if self.cancel is not None and self.cancel.cancelled:
+            raise SearchAborted("cancelled")
+
+        if self.deadline is not None and time.perf_counter() >= self.deadline:
+            raise SearchAborted("time")
@@ -0,0 +1,367 @@
+"""Forme canonique des grilles et cache de résultats associé.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Symétries
+    ---------
+    Les transformations suivantes changent une grille sans changer sa
+    difficulté ni son nombre de solutions :
+        - la transposition ;
+        - la permutation des bandes (groupes de 3 lignes), et des lignes à
+          l'intérieur de chaque bande ;
+        - la permutation des piles (groupes de 3 colonnes), et des colonnes
+          à l'intérieur de chaque pile ;
+        - le renommage des chiffres.
+
+    Forme canonique
+    ---------------
+    Parmi toutes les grilles équivalentes, on retient la plus petite dans
+    l'ordre lexicographique (lecture ligne par ligne, 0 pour une case vide),
+    les chiffres étant renommés dans leur ordre d'apparition. Elle est
+    calculée case par case en ne gardant, à chaque étape, que les
+    transformations partielles qui atteignent le plus petit préfixe : le
+    résultat est exact, sans énumérer les 3 359 232 transformations
+    géométriques.
+
+    Les grilles très creuses ont beaucoup de symétries internes ; si le
+    nombre de transformations à suivre dépasse `MAX_STATES`, on renonce
+    (`canonicalize` retourne None) et le cache est simplement contourné.
+
+    Cache
+    -----
+    `SolutionCache` est un cache LRU indexé par la forme canonique. Il
+    conserve la solution (dans l'espace canonique) et le nombre de
+    solutions ; un succès évite toute recherche, la solution étant ramenée
+    dans le repère de la grille d'origine par la transformation inverse.
+    Le cache peut être sauvegardé dans un fichier JSON entre deux
+    exécutions.
+"""
+
+from __future__ import annotations
+
+import itertools
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Sequence, Tuple
+
+from .grid import FlatGrid
+from .sudoku_solver import DEFAULT_ENGINE, iter_cell_solutions
+
+
+MAX_STATES = 50_000
+DEFAULT_CACHE_SIZE = 100_000
+DEFAULT_COUNT_LIMIT = 2
+CACHE_FORMAT_VERSION = 1
+
+
+class Transform(NamedTuple):
+    """
+        Transformation « grille d'origine -> grille canonique » :
+            canonique[i][j] = relabel[source[rows[i]][cols[j]]]
+        où `source` est la grille d'origine, éventuellement transposée.
+    """
+
+    transpose: bool
+    rows: Tuple[int, ...]
+    cols: Tuple[int, ...]
+    relabel: Tuple[int, ...]
+
+
+class _State(NamedTuple):
+    source: Tuple[Tuple[int, ...], ...]
+    transpose: bool
+    rows: Tuple[int, ...]
+    cols: Tuple[int, ...]
+    relabel: Dict[int, int]
+
+
+def _allowed(chosen: Tuple[int, ...]) -> List[int]:
+    """
+        Indices (lignes ou colonnes) pouvant occuper la position suivante,
+        compte tenu de la structure en bandes/piles de 3.
+    """
+
+    if len(chosen) % 3 == 0:
+        used = {index // 3 for index in chosen}
+        return [index for index in range(9) if index // 3 not in used]
+
+    group = chosen[-1] // 3
+    return [index for index in range(3 * group, 3 * group + 3) if index not in chosen]
+
+
+def _label(values: Sequence[int], relabel: Dict[int, int]) -> Tuple[Tuple[int, ...], Dict[int, int]]:
+    """
+        Renomme `values` en prolongeant `relabel` (ordre d'apparition).
+        Le dictionnaire n'est copié que s'il doit être complété.
+    """
+
+    labels = []
+    extended = relabel
+
+    for value in values:
+        if not value:
+            labels.append(0)
+            continue
+
+        label = extended.get(value)
+
+        if label is None:
+            if extended is relabel:
+                extended = dict(relabel)
+
+            label = len(extended) + 1
+            extended[value] = label
+
+        labels.append(label)
+
+    return tuple(labels), extended
+
+
+def canonicalize(cells: Sequence[int]) -> Tuple[str, Transform] | None:
+    """
+        ========================================================
+          Forme canonique d'une grille à plat
+        ========================================================
+
+        Retourne (clé de 81 caractères, transformation), ou None si la grille
+        a trop de symétries internes pour être traitée (voir `MAX_STATES`).
+    """
+
+    if len(cells) != 81:
+        raise ValueError(f"La grille doit contenir 81 cases (reçu {len(cells)}).")
+
+    grid = tuple(tuple(cells[i : i + 9]) for i in range(0, 81, 9))
+    transposed = tuple(zip(*grid))
+
+    states = [
+        _State(source, transpose, (row,), (), {})
+        for transpose, source in ((False, grid), (True, transposed))
+        for row in range(9)
+    ]
+
+    #
+    # Première ligne : on choisit les colonnes une par une. Seuls les états
+    # qui égalent le meilleur préfixe courant sont construits.
+    #
+    for _ in range(9):
+        best: Tuple[int, ...] | None = None
+        survivors: List[_State] = []
+
+        for state in states:
+            line = state.source[state.rows[0]]
+
+            for col in _allowed(state.cols):
+                key, relabel = _label((line[col],), state.relabel)
+
+                if best is None or key < best:
+                    best, survivors = key, []
+                elif key > best:
+                    continue
+
+                survivors.append(state._replace(cols=state.cols + (col,), relabel=relabel))
+
+                if len(survivors) > MAX_STATES:
+                    return None
+
+        states = survivors
+
+    #
+    # Lignes suivantes : les colonnes sont fixées, on choisit la ligne
+    #
+    for _ in range(8):
+        best = None
+        survivors = []
+
+        for state in states:
+            cols = state.cols
+
+            for row in _allowed(state.rows):
+                line = state.source[row]
+                key, relabel = _label([line[col] for col in cols], state.relabel)
+
+                if best is None or key < best:
+                    best, survivors = key, []
+                elif key > best:
+                    continue
+
+                survivors.append(state._replace(rows=state.rows + (row,), relabel=relabel))
+
+                if len(survivors) > MAX_STATES:
+                    return None
+
+        states = survivors
+
+    state = states[0]
+
+    #
+    # Les chiffres absents de la grille reçoivent les étiquettes restantes,
+    # afin que la transformation soit une vraie permutation de 1 à 9.
+    #
+    relabel = dict(state.relabel)
+    free_labels = iter(sorted(set(range(1, 10)) - set(relabel.values())))
+
+    for value in range(1, 10):
+        if value not in relabel:
+            relabel[value] = next(free_labels)
+
+    transform = Transform(
+        state.transpose,
+        state.rows,
+        state.cols,
+        tuple([0] + [relabel[value] for value in range(1, 10)]),
+    )
+
+    key = "".join(str(value) if value else "." for value in apply_transform(cells, transform))
+    return key, transform
+
+
+def _source_index(transform: Transform, i: int, j: int) -> int:
+    """
+        Index (dans la grille d'origine) de la case qui arrive en (i, j).
+    """
+
+    row, col = transform.rows[i], transform.cols[j]
+    return col * 9 + row if transform.transpose else row * 9 + col
+
+
+def apply_transform(cells: Sequence[int], transform: Transform) -> FlatGrid:
+    """
+        Grille d'origine -> repère canonique.
+    """
+
+    relabel = transform.relabel
+
+    return bytearray(
+        relabel[cells[_source_index(transform, i, j)]] for i in range(9) for j in range(9)
+    )
+
+
+def apply_inverse(cells: Sequence[int], transform: Transform) -> FlatGrid:
+    """
+        Repère canonique -> grille d'origine.
+    """
+
+    inverse = [0] * 10
+
+    for value, label in enumerate(transform.relabel):
+        inverse[label] = value
+
+    result = bytearray(81)
+
+    for i, j in itertools.product(range(9), range(9)):
+        result[_source_index(transform, i, j)] = inverse[cells[i * 9 + j]]
+
+    return result
+
+
+class SolutionCache:
+    """
+        ========================================================
+          Cache LRU : forme canonique -> (solution, nb de solutions)
+        ========================================================
+
+        - `count_limit` borne le comptage des solutions : un nombre égal à
+          cette limite signifie « au moins autant ».
+        - `hits` / `misses` permettent de juger de l'intérêt du cache.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, count_limit: int = DEFAULT_COUNT_LIMIT):
+        if maxsize < 1:
+            raise ValueError(f"La taille du cache doit être positive (reçu {maxsize}).")
+
+        self.maxsize = maxsize
+        self.count_limit = count_limit
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Tuple[str | None, int]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _store(self, key: str, solution: str | None, count: int) -> None:
+        self._entries[key] = (solution, count)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def solve(
+        self, cells: Sequence[int], engine: str = DEFAULT_ENGINE
+    ) -> Tuple[FlatGrid | None, int]:
+        """
+            ========================================================
+              Première solution et nombre de solutions (borné)
+            ========================================================
+
+            En cas de succès, aucune recherche n'est lancée.
+        """
+
+        canonical = canonicalize(cells)
+
+        if canonical is not None:
+            key, transform = canonical
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self.hits += 1
+                self._entries.move_to_end(key)
+                solution, count = entry
+
+                if solution is None:
+                    return None, count
+
+                return apply_inverse([int(char) for char in solution], transform), count
+
+        self.misses += 1
+
+        solutions = iter_cell_solutions(cells, engine)
+        found = list(itertools.islice(solutions, self.count_limit))
+        first = found[0] if found else None
+
+        if canonical is not None:
+            key, transform = canonical
+            stored = None
+
+            if first is not None:
+                stored = "".join(map(str, apply_transform(first, transform)))
+
+            self._store(key, stored, len(found))
+
+        return first, len(found)
+
+    def save(self, path: str) -> None:
+        """
+            Sauvegarde le cache (du moins récent au plus récent) en JSON.
+        """
+
+        data = {
+            "version": CACHE_FORMAT_VERSION,
+            "count_limit": self.count_limit,
+            "entries": [[key, solution, count] for key, (solution, count) in self._entries.items()],
+        }
+
+        import json
+
+        with open(path, "w", encoding="utf-8") as handler:
+            json.dump(data, handler)
+
+    def load(self, path: str) -> None:
+        """
+            Recharge un cache sauvegardé par `save`. Les entrées comptées avec
+            une autre limite sont ignorées, leur nombre n'étant pas comparable.
+        """
+
+        import json
+
+        with open(path, "r", encoding="utf-8") as handler:
+            data = json.load(handler)
+
+        if data.get("version") != CACHE_FORMAT_VERSION:
+            raise ValueError(f"Version de cache non prise en charge : {data.get('version')!r}.")
+
+        if data.get("count_limit") != self.count_limit:
+            return
+
+        for key, solution, count in data["entries"]:
+            self._store(key, solution, count)
@@ -0,0 +1,472 @@
+"""Moteur « Dancing Links » (Algorithme X de Knuth).
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Principe
+    --------
+    Le Sudoku est vu comme un problème de couverture exacte :
+        - 729 lignes : une par couple (case, valeur) ;
+        - 324 colonnes : chaque contrainte doit être couverte exactement une
+          fois (case remplie, valeur dans la ligne, dans la colonne, dans le
+          bloc).
+
+    Pour une grille N²xN² (voir `app.tables.geometry`), la matrice compte
+    N⁶ lignes et 4 x N⁴ colonnes : c'est le moteur à utiliser pour les
+    grilles 16x16 et 25x25. Le choix de la colonne la moins remplie y joue
+    le rôle des singletons nus et cachés, sans aucun parcours des lignes,
+    colonnes ou blocs de la grille.
+
+    La matrice creuse est stockée sous forme de listes doublement chaînées
+    circulaires (tableaux `left`, `right`, `up`, `down`), ce qui rend les
+    opérations « couvrir » / « découvrir » réversibles en temps constant par
+    nœud.
+
+    Réutilisation
+    -------------
+    La matrice est construite une seule fois par processus et par taille de
+    grille (`_shared_matrices`), et réutilisée d'une grille à l'autre : les indices sont couverts au début
+    de la recherche, puis tout est découvert à la fin, y compris si le
+    générateur est abandonné en cours de route. Si la matrice partagée est
+    déjà utilisée (générateurs imbriqués, threads), une matrice privée est
+    construite pour l'occasion.
+
+    Instrumentation
+    ---------------
+    Avec un objet `stats` (`app.stats.SearchStats`), la recherche passe par
+    `search_traced` : le choix de la colonne compte comme « sélection », les
+    opérations cover/uncover comme « vérification ».
+"""
+
+from __future__ import annotations
+
+import _thread
+import time
+from typing import Dict, Iterator, List, Sequence
+
+from .grid import FlatGrid
+from .stats import SearchStats
+from .tables import SUDOKU, Geometry, geometry_for_cells
+
+
+COLUMNS = 4 * SUDOKU.cells
+ROWS = SUDOKU.cells * SUDOKU.size
+
+
+def _row_columns(row: int, geo: Geometry = SUDOKU) -> tuple:
+    """
+        Les 4 colonnes (contraintes) couvertes par la ligne `row`
+        (row = geo.size * case + valeur - 1, geo.size étant le nombre de
+        valeurs).
+    """
+
+    size, cells = geo.size, geo.cells
+    index, digit = divmod(row, size)
+
+    #
+    # Les colonnes 0 à geo.cells - 1 sont les contraintes « case remplie ».
+    # Les unités (lignes, colonnes, blocs) sont numérotées de 0 à
+    # 3 * geo.size - 1 : la contrainte « valeur dans l'unité » est la colonne
+    # geo.cells + geo.size * unité + valeur - 1.
+    #
+    return (index,) + tuple(cells + unit * size + digit for unit in geo.units_of[index])
+
+
+class DancingLinks:
+    """
+        ========================================================
+          Matrice de couverture exacte du Sudoku
+        ========================================================
+
+        Le nœud 0 est la racine, les nœuds 1 à 324 sont les en-têtes de
+        colonnes, puis viennent les 4 nœuds de chacune des 729 lignes (pour
+        une grille 9x9 ; `geo` donne la taille de grille).
+        Chaque opération `cover` est inscrite dans `trail`, ce qui permet de
+        tout restaurer (`reset`) même après une recherche interrompue.
+    """
+
+    __slots__ = (
+        "geo",
+        "left",
+        "right",
+        "up",
+        "down",
+        "column",
+        "row_of",
+        "size",
+        "row_nodes",
+        "trail",
+    )
+
+    def __init__(self, geo: Geometry = SUDOKU):
+        columns = 4 * geo.cells
+        headers = columns + 1
+
+        self.geo = geo
+        self.left = [node - 1 for node in range(headers)]
+        self.right = [node + 1 for node in range(headers)]
+        self.left[0] = columns
+        self.right[columns] = 0
+
+        self.up = list(range(headers))
+        self.down = list(range(headers))
+        self.column = list(range(headers))
+        self.row_of = [-1] * headers
+        self.size = [0] * headers
+        self.row_nodes: List[int] = []
+        self.trail: List[int] = []
+
+        for row in range(geo.cells * geo.size):
+            first = -1
+
+            for col in _row_columns(row, geo):
+                self._append_node(row, col + 1, first)
+
+                if first < 0:
+                    first = len(self.up) - 1
+
+            self.row_nodes.append(first)
+
+    def _append_node(self, row: int, header: int, first: int) -> None:
+        """
+            Ajoute un nœud en bas de la colonne `header`, à la fin de la
+            ligne commençant au nœud `first` (-1 pour le premier nœud).
+        """
+
+        node = len(self.up)
+
+        self.column.append(header)
+        self.row_of.append(row)
+
+        self.up.append(self.up[header])
+        self.down.append(header)
+        self.down[self.up[header]] = node
+        self.up[header] = node
+        self.size[header] += 1
+
+        if first < 0:
+            self.left.append(node)
+            self.right.append(node)
+        else:
+            self.left.append(self.left[first])
+            self.right.append(first)
+            self.right[self.left[first]] = node
+            self.left[first] = node
+
+    def cover(self, header: int) -> None:
+        """
+            Retire la colonne `header` et toutes les lignes qui la couvrent.
+        """
+
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+
+        right[left[header]] = right[header]
+        left[right[header]] = left[header]
+
+        i = down[header]
+
+        while i != header:
+            j = right[i]
+
+            while j != i:
+                down[up[j]] = down[j]
+                up[down[j]] = up[j]
+                size[column[j]] -= 1
+                j = right[j]
+
+            i = down[i]
+
+        self.trail.append(header)
+
+    def uncover(self) -> None:
+        """
+            Annule la dernière opération `cover` (ordre strictement inverse).
+        """
+
+        left, right, up, down = self.left, self.right, self.up, self.down
+        column, size = self.column, self.size
+
+        header = self.trail.pop()
+        i = up[header]
+
+        while i != header:
+            j = left[i]
+
+            while j != i:
+                size[column[j]] += 1
+                down[up[j]] = j
+                up[down[j]] = j
+                j = left[j]
+
+            i = up[i]
+
+        right[left[header]] = header
+        left[right[header]] = header
+
+    def select(self, row: int) -> bool:
+        """
+            Impose la ligne `row` (un indice de départ) en couvrant ses 4
+            colonnes. Retourne False si l'une d'elles est déjà couverte, ce
+            qui signifie que les indices se contredisent.
+        """
+
+        first = self.row_nodes[row]
+        node = first
+
+        while True:
+            header = self.column[node]
+
+            if self.right[self.left[header]] != header:
+                return False
+
+            self.cover(header)
+            node = self.right[node]
+
+            if node == first:
+                return True
+
+    def reset(self) -> None:
+        """
+            Découvre tout ce qui a été couvert : la matrice redevient vierge.
+        """
+
+        while self.trail:
+            self.uncover()
+
+    def search(self, solution: List[int]) -> Iterator[None]:
+        """
+            ========================================================
+              Algorithme X (récursif)
+            ========================================================
+
+            À chaque solution, `solution` contient les lignes choisies et le
+            générateur émet None : l'appelant lit la pile avant de reprendre.
+        """
+
+        right, down, size = self.right, self.down, self.size
+
+        header = right[0]
+
+        if header == 0:
+            yield None
+            return
+
+        #
+        # Colonne la moins remplie d'abord (heuristique S de Knuth)
+        #
+        best, best_size = header, size[header]
+        header = right[header]
+
+        while header != 0 and best_size > 1:
+            if size[header] < best_size:
+                best, best_size = header, size[header]
+
+            header = right[header]
+
+        if best_size == 0:
+            return
+
+        self.cover(best)
+        node = down[best]
+
+        while node != best:
+            solution.append(self.row_of[node])
+
+            j = right[node]
+
+            while j != node:
+                self.cover(self.column[j])
+                j = right[j]
+
+            yield from self.search(solution)
+
+            j = self.left[node]
+
+            while j != node:
+                self.uncover()
+                j = self.left[j]
+
+            solution.pop()
+            node = down[node]
+
+        self.uncover()
+
+    def search_traced(self, solution: List[int], stats: SearchStats, depth: int = 0) -> Iterator[None]:
+        """
+            ========================================================
+              Variante instrumentée de `search`
+            ========================================================
+        """
+
+        right, down, size = self.right, self.down, self.size
+        clock = time.perf_counter
+
+        stats.enter(depth)
+        header = right[0]
+
+        if header == 0:
+            yield None
+            return
+
+        start = clock()
+        best, best_size = header, size[header]
+        header = right[header]
+
+        while header != 0 and best_size > 1:
+            if size[header] < best_size:
+                best, best_size = header, size[header]
+
+            header = right[header]
+
+        stats.select_time += clock() - start
+
+        if best_size == 0:
+            stats.backtracks += 1
+            return
+
+        start = clock()
+        self.cover(best)
+        stats.check_time += clock() - start
+        node = down[best]
+
+        while node != best:
+            solution.append(self.row_of[node])
+            stats.branching[depth] += 1
+
+            start = clock()
+            j = right[node]
+
+            while j != node:
+                self.cover(self.column[j])
+                j = right[j]
+
+            stats.check_time += clock() - start
+
+            yield from self.search_traced(solution, stats, depth + 1)
+
+            start = clock()
+            j = self.left[node]
+
+            while j != node:
+                self.uncover()
+                j = self.left[j]
+
+            stats.check_time += clock() - start
+
+            solution.pop()
+            node = down[node]
+
+        self.uncover()
+
+
+#
+# Matrices partagées (une par taille de grille) et leur verrou ; `_thread`
+# plutôt que `threading`, dont l'import pèse sur le démarrage de la CLI.
+#
+_shared_matrices: Dict[int, DancingLinks] = {}
+_shared_lock = _thread.allocate_lock()
+
+
+def _iter_rows(cells: Sequence[int], stats: SearchStats | None = None) -> Iterator[List[int]]:
+    """
+        ========================================================
+          Générateur bas niveau : lignes choisies pour chaque solution
+        ========================================================
+
+        Utilise la matrice partagée si elle est libre, sinon une matrice
+        privée. Dans tous les cas, la matrice est restaurée en sortie.
+        La taille de la grille est déduite du nombre de cases.
+    """
+
+    geo = geometry_for_cells(len(cells))
+    size = geo.size
+
+    for index, value in enumerate(cells):
+        if value and not 1 <= value <= size:
+            raise ValueError(f"Valeur hors limites en case {index} : {value}.")
+
+    shared = _shared_lock.acquire(blocking=False)
+
+    try:
+        if shared:
+            matrix = _shared_matrices.get(geo.box)
+
+            if matrix is None:
+                matrix = _shared_matrices[geo.box] = DancingLinks(geo)
+        else:
+            matrix = DancingLinks(geo)
+
+        try:
+            for index, value in enumerate(cells):
+                if value and not matrix.select(size * index + value - 1):
+                    return
+
+            solution: List[int] = []
+            search = matrix.search(solution) if stats is None else matrix.search_traced(solution, stats)
+
+            for _ in search:
+                yield solution
+
+        finally:
+            matrix.reset()
+
+    finally:
+        if shared:
+            _shared_lock.release()
+
+
+def iter_solutions(cells: Sequence[int], stats: SearchStats | None = None) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Générateur : toutes les solutions d'une grille à plat
+        ========================================================
+
+        Chaque solution est une nouvelle grille compacte ; la séquence
+        d'entrée n'est jamais modifiée. `stats`, s'il est fourni, est
+        complété au fil de la recherche.
+    """
+
+    size = geometry_for_cells(len(cells)).size
+
+    for rows in _iter_rows(cells, stats):
+        solution = bytearray(cells)
+
+        for row in rows:
+            index, digit = divmod(row, size)
+            solution[index] = digit + 1
+
+        yield solution
+
+
+def count_solutions(
+    cells: Sequence[int], limit: int | None = None, stats: SearchStats | None = None
+) -> int:
+    """
+        ========================================================
+          Comptage des solutions sans construire les grilles
+        ========================================================
+
+        `limit` arrête le comptage dès que ce nombre est atteint.
+    """
+
+    count = 0
+
+    for _ in _iter_rows(cells, stats):
+        count += 1
+
+        if limit is not None and count >= limit:
+            break
+
+    return count
+
+
+def solve_cells(cells: Sequence[int], stats: SearchStats | None = None) -> FlatGrid | None:
+    """
+        ========================================================
+          Première solution d'une grille à plat (ou None)
+        ========================================================
+    """
+
+    return next(iter_solutions(cells, stats), None)
@@ -0,0 +1,441 @@
+"""Génération de grilles à solution unique.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Principe
+    --------
+        1) Tirer une grille complète au hasard : les trois blocs de la
+           diagonale (indépendants les uns des autres) sont remplis par des
+           permutations aléatoires, puis complétés par le moteur "dlx".
+        2) Retirer les indices un par un, dans un ordre aléatoire. Un retrait
+           n'est conservé que si la grille garde une solution unique.
+        3) Vérifier que la grille obtenue atteint la difficulté visée ; sinon
+           recommencer avec une nouvelle grille complète.
+
+    Vérification incrémentale de l'unicité
+    ---------------------------------------
+    La solution étant connue, retirer l'indice v de la case i ne crée une
+    seconde solution que s'il existe une solution où la case i vaut autre
+    chose que v. On teste donc seulement les autres candidats de la case
+    (recherche de la première solution, arrêtée aussitôt), au lieu de
+    compter les solutions de toute la grille.
+
+    Difficulté
+    ----------
+    La difficulté est celle des techniques nécessaires au moteur
+    "propagation" (voir `DIFFICULTIES`) :
+        - "easy"   : singletons (nus ou cachés) uniquement ;
+        - "medium" : paires ou interactions bloc/ligne, sans supposition ;
+        - "hard"   : au moins une supposition.
+    Pour "easy" et "medium", un retrait qui rendrait la grille plus
+    difficile que la cible est refusé. `min_nodes` impose en plus un nombre
+    minimal de nœuds développés par le moteur par défaut (voir
+    `app.stats`).
+
+    Reproductibilité et parallélisme
+    --------------------------------
+    La grille n° k d'une série est tirée avec son propre générateur
+    aléatoire, initialisé à partir de (graine, k) : une même graine donne
+    les mêmes grilles, dans le même ordre, quel que soit le nombre de
+    processus (`--workers`).
+
+    Usage :
+        python -m app.generator [-n NOMBRE] [--seed GRAINE]
+            [--difficulty NIVEAU] [--min-nodes N] [--workers N] [-o FICHIER]
+"""
+
+from __future__ import annotations
+
+import itertools
+import os
+import sys
+import time
+from collections import Counter, deque
+from typing import TYPE_CHECKING, Deque, Iterator, List, NamedTuple
+
+from . import dlx, propagation
+from .grid import FlatGrid
+from .stats import SearchStats
+from .sudoku_solver import DEFAULT_ENGINE, format_compact, iter_cell_solutions
+from .tables import BOXES, PEERS
+
+#
+# `random` n'est importé qu'à l'usage (génération), comme les autres
+# imports coûteux au démarrage ; les générateurs sont passés en paramètre
+#
+if TYPE_CHECKING:
+    import random
+
+
+DIFFICULTIES = ("easy", "medium", "hard")
+DEFAULT_MAX_ATTEMPTS = 100
+DEFAULT_CHUNK_SIZE = 8
+
+ADVANCED_TECHNIQUES = ("naked_pair", "hidden_pair", "pointing", "claiming")
+
+
+class Puzzle(NamedTuple):
+    """
+        Grille générée, sa solution et sa difficulté (voir `DIFFICULTIES`).
+    """
+
+    cells: FlatGrid
+    solution: FlatGrid
+    difficulty: str
+
+
+def _check_difficulty(difficulty: str | None) -> None:
+    """
+        Vérifie que le niveau demandé fait partie de `DIFFICULTIES`.
+    """
+
+    if difficulty is not None and difficulty not in DIFFICULTIES:
+        raise ValueError(
+            f"Difficulté inconnue : {difficulty!r} (choix possibles : {', '.join(DIFFICULTIES)})."
+        )
+
+
+def random_solution(rng: random.Random) -> FlatGrid:
+    """
+        ========================================================
+          Grille complète tirée au hasard
+        ========================================================
+    """
+
+    cells = bytearray(81)
+
+    for box in (BOXES[0], BOXES[4], BOXES[8]):
+        for index, value in zip(box, rng.sample(range(1, 10), 9)):
+            cells[index] = value
+
+    solution = dlx.solve_cells(cells)
+    assert solution is not None  # les blocs de la diagonale sont indépendants
+
+    return solution
+
+
+def rate(cells: FlatGrid) -> str | None:
+    """
+        ========================================================
+          Difficulté d'une grille (None si elle n'a pas de solution)
+        ========================================================
+
+        Niveau des techniques dont le moteur "propagation" a besoin pour
+        trouver la première solution.
+    """
+
+    techniques: Counter = Counter()
+
+    if propagation.solve_cells(cells, techniques) is None:
+        return None
+
+    if techniques["guess"]:
+        return "hard"
+
+    if any(techniques[technique] for technique in ADVANCED_TECHNIQUES):
+        return "medium"
+
+    return "easy"
+
+
+def _has_other_solution(cells: FlatGrid, index: int, value: int) -> bool:
+    """
+        La grille (case `index` vide) a-t-elle une solution où cette case ne
+        vaut pas `value` ? Seuls les candidats de la case sont essayés.
+    """
+
+    used = {cells[peer] for peer in PEERS[index]}
+
+    try:
+        for other in range(1, 10):
+            if other == value or other in used:
+                continue
+
+            cells[index] = other
+
+            if dlx.count_solutions(cells, limit=1):
+                return True
+
+        return False
+
+    finally:
+        cells[index] = 0
+
+
+def _dig(solution: FlatGrid, rng: random.Random, difficulty: str | None) -> FlatGrid:
+    """
+        ========================================================
+          Retrait des indices tant que la solution reste unique
+        ========================================================
+
+        Pour une cible "easy" ou "medium", les retraits qui rendraient la
+        grille plus difficile sont aussi refusés.
+    """
+
+    cells = bytearray(solution)
+    ceiling = None if difficulty in (None, DIFFICULTIES[-1]) else DIFFICULTIES.index(difficulty)
+    order = list(range(81))
+    rng.shuffle(order)
+
+    for index in order:
+        value = cells[index]
+        cells[index] = 0
+
+        if _has_other_solution(cells, index, value):
+            cells[index] = value
+            continue
+
+        if ceiling is not None and DIFFICULTIES.index(rate(cells)) > ceiling:  # type: ignore[arg-type]
+            cells[index] = value
+
+    return cells
+
+
+def _count_nodes(cells: FlatGrid) -> int:
+    """
+        Nœuds développés par le moteur par défaut pour la première solution.
+    """
+
+    stats = SearchStats()
+    next(iter_cell_solutions(cells, DEFAULT_ENGINE, stats=stats), None)
+    return stats.nodes
+
+
+def generate(
+    rng: random.Random | None = None,
+    difficulty: str | None = None,
+    min_nodes: int | None = None,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> Puzzle | None:
+    """
+        ========================================================
+          Une grille à solution unique, à la difficulté visée
+        ========================================================
+
+        - `rng` : générateur aléatoire (un nouveau, non initialisé, si absent).
+        - `difficulty` : niveau exact visé (None : peu importe).
+        - `min_nodes` : nombre minimal de nœuds développés par le moteur par
+          défaut.
+        - Retourne None si aucune grille ne convient après `max_attempts`
+          grilles complètes essayées.
+    """
+
+    _check_difficulty(difficulty)
+
+    if rng is None:
+        import random
+
+        rng = random.Random()
+
+    for _ in range(max_attempts):
+        solution = random_solution(rng)
+        cells = _dig(solution, rng, difficulty)
+        level = rate(cells)
+
+        if difficulty is not None and level != difficulty:
+            continue
+
+        if min_nodes is not None and _count_nodes(cells) < min_nodes:
+            continue
+
+        return Puzzle(cells, solution, level)  # type: ignore[arg-type]
+
+    return None
+
+
+def _rng_for(seed: int, index: int) -> random.Random:
+    """
+        Générateur aléatoire propre à la grille n° `index` de la série.
+    """
+
+    import random
+
+    return random.Random(f"{seed}:{index}")
+
+
+def _generate_chunk(
+    seed: int,
+    indexes: range,
+    difficulty: str | None,
+    min_nodes: int | None,
+    max_attempts: int,
+) -> List[Puzzle | None]:
+    """
+        Tâche exécutée dans un processus du pool : un paquet de grilles.
+    """
+
+    return [
+        generate(_rng_for(seed, index), difficulty, min_nodes, max_attempts) for index in indexes
+    ]
+
+
+def generate_many(
+    count: int,
+    seed: int | None = None,
+    difficulty: str | None = None,
+    min_nodes: int | None = None,
+    workers: int = 1,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+) -> Iterator[Puzzle | None]:
+    """
+        ========================================================
+          Générateur : une série de `count` grilles
+        ========================================================
+
+        - Les grilles sont rendues dans l'ordre de la série ; None pour une
+          grille qui n'a pas atteint la cible après `max_attempts` essais.
+        - Avec `workers` différent de 1, les grilles sont produites par
+          paquets de `chunk_size` sur un pool de processus (0 : autant de
+          processus que de cœurs), avec au plus 2 paquets en cours par
+          processus.
+    """
+
+    _check_difficulty(difficulty)
+
+    if chunk_size < 1:
+        raise ValueError(f"La taille de paquet doit être positive (reçu {chunk_size}).")
+
+    if seed is None:
+        import random
+
+        seed = random.SystemRandom().getrandbits(64)
+
+    options = (difficulty, min_nodes, max_attempts)
+
+    if workers == 1:
+        for index in range(count):
+            yield generate(_rng_for(seed, index), *options)
+
+        return
+
+    if workers < 1:
+        workers = os.cpu_count() or 1
+
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    max_pending = 2 * workers
+    chunks = (range(start, min(start + chunk_size, count)) for start in range(0, count, chunk_size))
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        queue: Deque[Future] = deque()
+
+        while True:
+            for indexes in itertools.islice(chunks, max_pending - len(queue)):
+                queue.append(executor.submit(_generate_chunk, seed, indexes, *options))
+
+            if not queue:
+                return
+
+            yield from queue.popleft().result()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+        ========================================================
+          Point d'entrée CLI
+        ========================================================
+
+        Usage :
+            python -m app.generator [-n NOMBRE] [--seed GRAINE]
+                [--difficulty NIVEAU] [--min-nodes N] [--workers N]
+                [--with-solution] [-o FICHIER]
+
+        - Une grille par ligne, au format compact de `app.batch` ; avec
+          `--with-solution`, la solution suit sur la même ligne, après un
+          espace.
+        - Le bilan (dont le débit en grilles/min) est écrit sur stderr.
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Génère des grilles à solution unique")
+
+    parser.add_argument("-n", "--count", type=int, default=1, help="Nombre de grilles (défaut : 1).")
+    parser.add_argument("--seed", type=int, help="Graine, pour reproduire une série.")
+    parser.add_argument(
+        "--difficulty",
+        choices=DIFFICULTIES,
+        help="Difficulté visée (défaut : peu importe).",
+    )
+    parser.add_argument(
+        "--min-nodes",
+        type=int,
+        metavar="N",
+        help="Nombre minimal de nœuds développés par le moteur par défaut.",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus (défaut : 1 ; 0 = nombre de cœurs).",
+    )
+    parser.add_argument(
+        "--max-attempts",
+        type=int,
+        default=DEFAULT_MAX_ATTEMPTS,
+        help=f"Grilles complètes essayées par grille produite (défaut : {DEFAULT_MAX_ATTEMPTS}).",
+    )
+    parser.add_argument(
+        "--with-solution",
+        action="store_true",
+        help="Écrit la solution à la suite de chaque grille.",
+    )
+    parser.add_argument("-o", "--output", help="Fichier de sortie (défaut : sortie standard).")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    produced = missed = 0
+
+    try:
+        target = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+    except OSError as exc:  # pragma: no cover - CLI UX
+        print(f"Erreur d'accès au fichier: {exc}", file=sys.stderr)
+        return 1
+
+    try:
+        for puzzle in generate_many(
+            args.count,
+            seed=args.seed,
+            difficulty=args.difficulty,
+            min_nodes=args.min_nodes,
+            workers=args.workers,
+            max_attempts=args.max_attempts,
+        ):
+            if puzzle is None:
+                missed += 1
+                continue
+
+            produced += 1
+            line = format_compact(puzzle.cells)
+
+            if args.with_solution:
+                line += " " + format_compact(puzzle.solution)
+
+            target.write(line + "\n")
+
+    finally:
+        if target is not sys.stdout:
+            target.close()
+
+    elapsed = time.perf_counter() - start
+    rate_per_minute = 60 * produced / elapsed if elapsed else 0.0
+
+    print(
+        f"{produced} grille(s) générée(s) en {elapsed:.3f} seconde(s) "
+        f"({rate_per_minute:.0f} grilles/min).",
+        file=sys.stderr,
+    )
+
+    if missed:
+        print(f"{missed} grille(s) n'ont pas atteint la cible.", file=sys.stderr)
+        return 2
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - exécution directe
+    raise SystemExit(main())
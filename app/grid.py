@@ -0,0 +1,118 @@
+"""Représentation compacte d'une grille de Sudoku.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Principe
+    --------
+    Une grille compacte est un `bytearray` de 81 octets, en ordre de lecture
+    (index = 9 * ligne + colonne, 0 pour une case vide). Par rapport à une
+    liste de listes :
+        - un seul accès indexé par case, sans double indirection ;
+        - une copie complète coûte une seule allocation de 81 octets ;
+        - l'empreinte mémoire est minimale pour les traitements par lots.
+
+    Les tables d'index (ligne, colonne, bloc, unités et voisins de chaque
+    case) sont celles de `app.tables`.
+
+    Compatibilité
+    -------------
+    `from_rows` / `to_rows` convertissent depuis/vers la grille 9x9
+    historique (`List[List[int]]`), et `as_flat` accepte indifféremment
+    une grille 9x9, une séquence de 81 valeurs ou une grille compacte.
+
+    Autres tailles
+    --------------
+    Les mêmes fonctions acceptent les grilles N²xN² (256 cases pour 16x16,
+    625 pour 25x25...) : la taille est déduite du nombre de cases ou de
+    lignes. Une valeur tient toujours dans un octet.
+
+    Notation des valeurs
+    --------------------
+    `symbols(size)` donne les caractères des valeurs 1 à `size` : les
+    chiffres 1-9, puis les lettres A, B, C... au-delà de 9 (jusqu'à P pour
+    une grille 25x25). `LETTERS` est la notation alternative où toutes les
+    valeurs sont des lettres (A-P pour un « hexadoku » 16x16). Dans les deux
+    cas, "." ou "0" désigne une case vide.
+"""
+
+from __future__ import annotations
+
+from math import isqrt
+from typing import List, Sequence, Union
+
+from .tables import CELLS, SIZE, geometry_for_cells
+
+
+Grid = List[List[int]]
+FlatGrid = bytearray
+
+DIGITS = "123456789ABCDEFGHIJKLMNOP"
+LETTERS = "ABCDEFGHIJKLMNOPQRSTUVWXY"
+BLANKS = ".0"
+
+
+def symbols(size: int = SIZE, alphabet: str = DIGITS) -> str:
+    """
+        Caractères représentant les valeurs 1 à `size` dans `alphabet`.
+    """
+
+    if size > len(alphabet):
+        raise ValueError(f"Pas de notation pour des grilles de plus de {len(alphabet)} valeurs.")
+
+    return alphabet[:size]
+
+
+def new_grid(cells: int = CELLS) -> FlatGrid:
+    """
+        Grille compacte vide (`cells` zéros, 81 par défaut).
+    """
+
+    return bytearray(cells)
+
+
+def from_rows(grid: Grid) -> FlatGrid:
+    """
+        Grille 9x9 (liste de listes) -> grille compacte.
+    """
+
+    return bytearray(value for row in grid for value in row)
+
+
+def to_rows(cells: Sequence[int]) -> Grid:
+    """
+        Grille compacte (ou séquence de 81 valeurs) -> grille 9x9.
+        Une grille de N⁴ cases donne N² lignes de N² valeurs.
+    """
+
+    count = len(cells)
+    size = SIZE if count == CELLS else isqrt(count)
+    return [list(cells[i : i + size]) for i in range(0, count, size)]
+
+
+def as_flat(grid: Union[Grid, Sequence[int]]) -> FlatGrid:
+    """
+        ========================================================
+          Conversion tolérante vers une grille compacte
+        ========================================================
+
+        - Une grille compacte est renvoyée telle quelle (pas de copie).
+        - Une grille 9x9 ou une séquence de 81 entiers est convertie.
+        - Toute grille N²xN² (ou séquence de N⁴ entiers) est acceptée.
+    """
+
+    if isinstance(grid, bytearray):
+        cells = grid
+    elif grid and isinstance(grid[0], (list, tuple)):
+        cells = from_rows(grid)  # type: ignore[arg-type]
+    else:
+        try:
+            cells = bytearray(grid)  # type: ignore[arg-type]
+        except ValueError:
+            raise ValueError("Valeur hors limites dans la grille.") from None
+
+    if len(cells) != CELLS:
+        geometry_for_cells(len(cells))
+
+    return cells
@@ -0,0 +1,249 @@
+"""Moteur itératif : backtracking à pile explicite, sans récursion.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Principe
+    --------
+    Même parcours que le moteur "bitmask" (mêmes masques d'occupation, même
+    choix de case, mêmes solutions dans le même ordre), mais la récursion
+    est remplacée par une boucle et trois tableaux indexés par la
+    profondeur :
+        - `empties[d]` : la case remplie à la profondeur d ;
+        - `pending[d]` : les candidats de cette case qui restent à essayer ;
+        - `placed[d]`  : la valeur actuellement placée (pile d'annulation).
+
+    Avantages :
+        - pas de chaîne de `yield from` dont le coût croît avec la
+          profondeur : une solution est émise directement par la boucle ;
+        - pas d'appel de fonction par nœud, les mises à jour de masques
+          sont faites en ligne ;
+        - la pile d'appels Python reste de taille constante : aucune limite
+          de récursion à craindre, même dans un thread à petite pile.
+
+    Instrumentation
+    ---------------
+    Avec un objet `stats`, une variante instrumentée de la même boucle
+    (`_iter_traced`) est utilisée : mêmes nœuds, comptés comme ceux de la
+    recherche instrumentée du moteur "bitmask", et budget vérifié au fil
+    de la boucle, toujours sans récursion.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Iterator, Sequence
+
+from . import bitmask_solver
+from .bitmask_solver import DEFAULT_HEURISTIC, BitmaskState, CountingState, _choose
+from .grid import FlatGrid
+from .stats import SearchStats
+from .tables import BOX_OF, COL_OF, FULL_MASK, PEERS, ROW_OF, VALUE_OF_BIT
+
+
+def iter_solutions(
+    cells: Sequence[int],
+    heuristic: str = DEFAULT_HEURISTIC,
+    stats: SearchStats | None = None,
+) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Générateur : toutes les solutions d'une grille à plat
+        ========================================================
+
+        Chaque solution est émise sous forme d'une nouvelle grille compacte ;
+        la séquence d'entrée n'est jamais modifiée.
+    """
+
+    bitmask_solver._check_heuristic(heuristic)
+
+    mrv = heuristic == "mrv"
+    state: BitmaskState = CountingState(cells) if mrv else BitmaskState(cells)
+
+    if not state.consistent:
+        return
+
+    if stats is not None:
+        yield from _iter_traced(state, mrv, stats)
+        return
+
+    grid = state.cells
+    rows, cols, boxes = state.rows, state.cols, state.boxes
+    counts = state.counts if mrv else None  # type: ignore[attr-defined]
+
+    empties = [index for index, value in enumerate(grid) if not value]
+    total = len(empties)
+    pending = [0] * total
+    placed = [0] * total
+
+    depth = 0
+    descending = True
+
+    while depth >= 0:
+        if descending:
+            if depth == total:
+                yield grid[:]
+                depth -= 1
+                descending = False
+                continue
+
+            if mrv:
+                #
+                # Case la plus contrainte, permutée en position `depth`
+                #
+                best = _choose(state, empties, depth, True)
+
+                if best < 0:
+                    depth -= 1
+                    descending = False
+                    continue
+
+                empties[depth], empties[best] = empties[best], empties[depth]
+
+            index = empties[depth]
+            pending[depth] = FULL_MASK & ~(
+                rows[ROW_OF[index]] | cols[COL_OF[index]] | boxes[BOX_OF[index]]
+            )
+
+        else:
+            #
+            # Retour à ce niveau : on retire la valeur essayée
+            #
+            index = empties[depth]
+            bit = 1 << (placed[depth] - 1)
+            mask = ~bit
+
+            grid[index] = 0
+            rows[ROW_OF[index]] &= mask
+            cols[COL_OF[index]] &= mask
+            boxes[BOX_OF[index]] &= mask
+
+            if mrv:
+                for peer in PEERS[index]:
+                    if not grid[peer] and not (
+                        rows[ROW_OF[peer]] | cols[COL_OF[peer]] | boxes[BOX_OF[peer]]
+                    ) & bit:
+                        counts[peer] += 1
+
+        candidates = pending[depth]
+
+        if not candidates:
+            depth -= 1
+            descending = False
+            continue
+
+        bit = candidates & -candidates
+        pending[depth] = candidates ^ bit
+        value = VALUE_OF_BIT[bit]
+        placed[depth] = value
+
+        if mrv:
+            for peer in PEERS[index]:
+                if not grid[peer] and not (
+                    rows[ROW_OF[peer]] | cols[COL_OF[peer]] | boxes[BOX_OF[peer]]
+                ) & bit:
+                    counts[peer] -= 1
+
+        grid[index] = value
+        rows[ROW_OF[index]] |= bit
+        cols[COL_OF[index]] |= bit
+        boxes[BOX_OF[index]] |= bit
+
+        depth += 1
+        descending = True
+
+
+def _iter_traced(state: BitmaskState, mrv: bool, stats: SearchStats) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Variante instrumentée de la boucle d'`iter_solutions`
+        ========================================================
+
+        Même parcours, dans le même ordre, avec mise à jour de `stats` ;
+        les placements passent par `state.place` / `state.undo`.
+    """
+
+    clock = time.perf_counter
+    grid = state.cells
+    empties = [index for index, value in enumerate(grid) if not value]
+    total = len(empties)
+    pending = [0] * total
+    placed = [0] * total
+
+    depth = 0
+    descending = True
+
+    while depth >= 0:
+        if descending:
+            stats.enter(depth)
+
+            if depth == total:
+                yield grid[:]
+                depth -= 1
+                descending = False
+                continue
+
+            start = clock()
+            best = _choose(state, empties, depth, mrv)
+            stats.select_time += clock() - start
+
+            if best < 0:
+                stats.backtracks += 1
+                depth -= 1
+                descending = False
+                continue
+
+            empties[depth], empties[best] = empties[best], empties[depth]
+            index = empties[depth]
+
+            start = clock()
+            pending[depth] = state.candidates(index)
+            stats.check_time += clock() - start
+
+            if not pending[depth]:
+                stats.backtracks += 1
+                depth -= 1
+                descending = False
+                continue
+
+        else:
+            index = empties[depth]
+
+            start = clock()
+            state.undo(index, placed[depth])
+            stats.check_time += clock() - start
+
+        candidates = pending[depth]
+
+        if not candidates:
+            depth -= 1
+            descending = False
+            continue
+
+        bit = candidates & -candidates
+        pending[depth] = candidates ^ bit
+        value = VALUE_OF_BIT[bit]
+        placed[depth] = value
+        stats.branching[depth] += 1
+
+        start = clock()
+        state.place(index, value)
+        stats.check_time += clock() - start
+
+        depth += 1
+        descending = True
+
+
+def solve_cells(
+    cells: Sequence[int],
+    heuristic: str = DEFAULT_HEURISTIC,
+    stats: SearchStats | None = None,
+) -> FlatGrid | None:
+    """
+        ========================================================
+          Première solution d'une grille à plat (ou None)
+        ========================================================
+    """
+
+    return next(iter_solutions(cells, heuristic, stats), None)
@@ -0,0 +1,557 @@
+"""Propagation de contraintes avant chaque branchement.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Principe
+    --------
+    Chaque case porte un masque de candidats (bit v - 1 pour la valeur v).
+    Avant de « deviner » une valeur, on applique des techniques de
+    raisonnement jusqu'à un point fixe :
+        - naked_single  : une case n'a plus qu'un candidat ;
+        - hidden_single : une valeur n'a plus qu'une place dans une unité ;
+        - naked_pair    : deux cases d'une unité ont les deux mêmes candidats,
+          qu'on retire des autres cases de l'unité ;
+        - hidden_pair   : deux valeurs n'ont que les deux mêmes places dans
+          une unité, ces deux cases perdent leurs autres candidats ;
+        - pointing      : dans un bloc, une valeur est cantonnée à une ligne
+          (ou colonne), qu'on retire du reste de cette ligne ;
+        - claiming      : dans une ligne (ou colonne), une valeur est
+          cantonnée à un bloc, qu'on retire du reste de ce bloc.
+
+    On ne branche (case la plus contrainte, copie de l'état) que lorsque plus
+    aucune technique ne progresse. La plupart des grilles « de journal » sont
+    ainsi résolues sans aucun retour arrière.
+
+    Bilan
+    -----
+    Le compteur passé en paramètre (`collections.Counter`) reçoit, par
+    technique, le nombre de cases remplies (singles) ou de candidats
+    éliminés (paires, pointing, claiming), ainsi que le nombre de cases
+    remplies par supposition ("guess").
+
+    Un objet `stats` (`app.stats.SearchStats`) peut en outre être fourni :
+    la recherche instrumentée (`_search_traced`) compte alors les nœuds et
+    sépare le temps de propagation (vérification) du temps de choix de la
+    case.
+"""
+
+from __future__ import annotations
+
+import time
+from collections import Counter
+from typing import Iterator, List, Sequence
+
+from .grid import FlatGrid
+from .stats import SearchStats
+from .tables import (
+    BOX_OF,
+    BOXES,
+    COL_OF,
+    COLS,
+    FULL_MASK,
+    LINES,
+    PEERS,
+    POPCOUNT,
+    ROW_OF,
+    ROWS,
+    UNITS,
+    VALUE_OF_BIT,
+)
+
+
+TECHNIQUES = (
+    "naked_single",
+    "hidden_single",
+    "naked_pair",
+    "hidden_pair",
+    "pointing",
+    "claiming",
+    "guess",
+)
+
+
+class _Contradiction(Exception):
+    """
+        Levée en interne dès qu'une case ou une unité n'a plus de solution.
+    """
+
+
+class CandidateGrid:
+    """
+        ========================================================
+          Grille de candidats
+        ========================================================
+
+        - `cells`   : valeur placée (0 si la case n'est pas encore fixée) ;
+        - `domains` : masque des candidats de chaque case (un seul bit pour
+          une case fixée).
+    """
+
+    __slots__ = ("cells", "domains")
+
+    def __init__(self, cells: FlatGrid, domains: List[int]):
+        self.cells = cells
+        self.domains = domains
+
+    @classmethod
+    def from_cells(cls, cells: Sequence[int]) -> "CandidateGrid | None":
+        """
+            Construit la grille de candidats à partir des 81 valeurs de départ.
+            Retourne None si les indices se contredisent.
+        """
+
+        if len(cells) != 81:
+            raise ValueError(f"La grille doit contenir 81 cases (reçu {len(cells)}).")
+
+        grid = cls(bytearray(81), [FULL_MASK] * 81)
+
+        for index, value in enumerate(cells):
+            if not value:
+                continue
+
+            if not 1 <= value <= 9:
+                raise ValueError(f"Valeur hors limites en case {index} : {value}.")
+
+            if not grid.assign(index, value):
+                return None
+
+        return grid
+
+    def copy(self) -> "CandidateGrid":
+        return CandidateGrid(self.cells[:], self.domains[:])
+
+    def assign(self, index: int, value: int) -> bool:
+        """
+            Fixe `value` en case `index` et la retire des candidats des
+            voisins. Retourne False en cas de contradiction.
+        """
+
+        bit = 1 << (value - 1)
+        domains = self.domains
+
+        if not domains[index] & bit:
+            return False
+
+        self.cells[index] = value
+        domains[index] = bit
+
+        for peer in PEERS[index]:
+            domain = domains[peer]
+
+            if domain & bit:
+                domain ^= bit
+
+                if not domain:
+                    return False
+
+                domains[peer] = domain
+
+        return True
+
+    def eliminate(self, index: int, mask: int) -> int:
+        """
+            Retire les candidats `mask` de la case `index` et retourne le
+            nombre de candidats effectivement retirés.
+        """
+
+        domain = self.domains[index]
+        removed = domain & mask
+
+        if not removed:
+            return 0
+
+        domain ^= removed
+
+        if not domain:
+            raise _Contradiction
+
+        self.domains[index] = domain
+        return POPCOUNT[removed]
+
+
+def _naked_singles(grid: CandidateGrid, techniques: Counter) -> int:
+    """
+        Fixe toutes les cases qui n'ont plus qu'un candidat (jusqu'à
+        stabilisation, une affectation pouvant en entraîner d'autres).
+    """
+
+    cells = grid.cells
+    domains = grid.domains
+    filled = 0
+    changed = True
+
+    while changed:
+        changed = False
+
+        for index in range(81):
+            if cells[index]:
+                continue
+
+            domain = domains[index]
+
+            if not domain & (domain - 1):
+                if not grid.assign(index, VALUE_OF_BIT[domain]):
+                    raise _Contradiction
+
+                filled += 1
+                changed = True
+
+    techniques["naked_single"] += filled
+    return filled
+
+
+def _hidden_singles(grid: CandidateGrid, techniques: Counter) -> int:
+    """
+        Dans chaque unité, une valeur présente dans un seul masque est fixée
+        dans la case correspondante.
+    """
+
+    cells = grid.cells
+    domains = grid.domains
+    filled = 0
+
+    for unit in UNITS:
+        once = twice = 0
+
+        for index in unit:
+            domain = domains[index]
+            twice |= once & domain
+            once |= domain
+
+        if once != FULL_MASK:
+            raise _Contradiction
+
+        exactly = once & ~twice
+
+        while exactly:
+            bit = exactly & -exactly
+            exactly ^= bit
+
+            for index in unit:
+                if domains[index] & bit:
+                    if not cells[index]:
+                        if not grid.assign(index, VALUE_OF_BIT[bit]):
+                            raise _Contradiction
+
+                        filled += 1
+
+                    break
+
+            else:
+                raise _Contradiction
+
+    techniques["hidden_single"] += filled
+    return filled
+
+
+def _naked_pairs(grid: CandidateGrid, techniques: Counter) -> int:
+    """
+        Deux cases d'une unité réduites aux deux mêmes candidats : ces
+        candidats sont retirés des autres cases de l'unité.
+    """
+
+    cells = grid.cells
+    domains = grid.domains
+    removed = 0
+
+    for unit in UNITS:
+        seen = {}
+
+        for index in unit:
+            domain = domains[index]
+
+            if cells[index] or POPCOUNT[domain] != 2:
+                continue
+
+            if domain not in seen:
+                seen[domain] = index
+                continue
+
+            pair = (seen[domain], index)
+
+            for other in unit:
+                if other not in pair:
+                    removed += grid.eliminate(other, domain)
+
+    techniques["naked_pair"] += removed
+    return removed
+
+
+def _hidden_pairs(grid: CandidateGrid, techniques: Counter) -> int:
+    """
+        Deux valeurs cantonnées aux deux mêmes cases d'une unité : ces deux
+        cases perdent tous leurs autres candidats.
+    """
+
+    cells = grid.cells
+    domains = grid.domains
+    removed = 0
+
+    for unit in UNITS:
+        #
+        # places[v] : masque des positions (0-8 dans l'unité) où la valeur
+        # v + 1 est encore candidate, parmi les cases non fixées.
+        #
+        places = [0] * 9
+
+        for position, index in enumerate(unit):
+            if cells[index]:
+                continue
+
+            domain = domains[index]
+
+            while domain:
+                bit = domain & -domain
+                domain ^= bit
+                places[VALUE_OF_BIT[bit] - 1] |= 1 << position
+
+        seen = {}
+
+        for value_index, where in enumerate(places):
+            if POPCOUNT[where] != 2:
+                continue
+
+            if where not in seen:
+                seen[where] = value_index
+                continue
+
+            keep = (1 << seen[where]) | (1 << value_index)
+
+            for position, index in enumerate(unit):
+                if where & (1 << position):
+                    removed += grid.eliminate(index, FULL_MASK & ~keep)
+
+    techniques["hidden_pair"] += removed
+    return removed
+
+
+def _intersections(grid: CandidateGrid, techniques: Counter) -> int:
+    """
+        Interactions bloc/ligne :
+            - pointing : valeur d'un bloc cantonnée à une ligne ou colonne ;
+            - claiming : valeur d'une ligne ou colonne cantonnée à un bloc.
+    """
+
+    cells = grid.cells
+    domains = grid.domains
+    pointing = claiming = 0
+
+    for bit in VALUE_OF_BIT:
+        for box in BOXES:
+            places = [index for index in box if not cells[index] and domains[index] & bit]
+
+            if len(places) < 2:
+                continue
+
+            for line_of, lines in ((ROW_OF, ROWS), (COL_OF, COLS)):
+                line = line_of[places[0]]
+
+                if all(line_of[index] == line for index in places[1:]):
+                    for index in lines[line]:
+                        if index not in box:
+                            pointing += grid.eliminate(index, bit)
+
+        for line in LINES:
+            places = [index for index in line if not cells[index] and domains[index] & bit]
+
+            if len(places) < 2:
+                continue
+
+            box = BOX_OF[places[0]]
+
+            if all(BOX_OF[index] == box for index in places[1:]):
+                for index in BOXES[box]:
+                    if index not in line:
+                        claiming += grid.eliminate(index, bit)
+
+    techniques["pointing"] += pointing
+    techniques["claiming"] += claiming
+    return pointing + claiming
+
+
+def propagate(grid: CandidateGrid, techniques: Counter | None = None) -> bool:
+    """
+        ========================================================
+          Propagation jusqu'au point fixe
+        ========================================================
+
+        Les techniques sont appliquées de la moins coûteuse à la plus
+        coûteuse ; dès que l'une progresse, on repart de la première.
+        Retourne False si une contradiction est détectée.
+    """
+
+    if techniques is None:
+        techniques = Counter()
+
+    try:
+        while True:
+            _naked_singles(grid, techniques)
+
+            if _hidden_singles(grid, techniques):
+                continue
+
+            if _naked_pairs(grid, techniques):
+                continue
+
+            if _hidden_pairs(grid, techniques):
+                continue
+
+            if _intersections(grid, techniques):
+                continue
+
+            return True
+
+    except _Contradiction:
+        return False
+
+
+def _search(grid: CandidateGrid, techniques: Counter) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Propagation, puis branchement sur la case la plus contrainte
+        ========================================================
+    """
+
+    if not propagate(grid, techniques):
+        return
+
+    cells = grid.cells
+    domains = grid.domains
+    best = None
+    best_count = 10
+
+    for index in range(81):
+        if cells[index]:
+            continue
+
+        count = POPCOUNT[domains[index]]
+
+        if count < best_count:
+            best, best_count = index, count
+
+            if count == 2:
+                break
+
+    if best is None:
+        yield cells[:]
+        return
+
+    mask = domains[best]
+
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+
+        child = grid.copy()
+
+        if child.assign(best, VALUE_OF_BIT[bit]):
+            techniques["guess"] += 1
+            yield from _search(child, techniques)
+
+
+def _search_traced(
+    grid: CandidateGrid, techniques: Counter, stats: SearchStats, depth: int
+) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Variante instrumentée de `_search`
+        ========================================================
+    """
+
+    clock = time.perf_counter
+    stats.enter(depth)
+
+    start = clock()
+    consistent = propagate(grid, techniques)
+    stats.check_time += clock() - start
+
+    if not consistent:
+        stats.backtracks += 1
+        return
+
+    start = clock()
+    cells = grid.cells
+    domains = grid.domains
+    best = None
+    best_count = 10
+
+    for index in range(81):
+        if cells[index]:
+            continue
+
+        count = POPCOUNT[domains[index]]
+
+        if count < best_count:
+            best, best_count = index, count
+
+            if count == 2:
+                break
+
+    stats.select_time += clock() - start
+
+    if best is None:
+        yield cells[:]
+        return
+
+    mask = domains[best]
+
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        stats.branching[depth] += 1
+
+        start = clock()
+        child = grid.copy()
+        assigned = child.assign(best, VALUE_OF_BIT[bit])
+        stats.check_time += clock() - start
+
+        if assigned:
+            techniques["guess"] += 1
+            yield from _search_traced(child, techniques, stats, depth + 1)
+        else:
+            stats.backtracks += 1
+
+
+def iter_solutions(
+    cells: Sequence[int],
+    techniques: Counter | None = None,
+    stats: SearchStats | None = None,
+) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Générateur : toutes les solutions d'une grille à plat
+        ========================================================
+
+        Si `techniques` est fourni, il est complété au fil de la recherche
+        avec le bilan de chaque technique (voir `TECHNIQUES`) ; de même pour
+        `stats` (voir `app.stats`).
+    """
+
+    if techniques is None:
+        techniques = Counter()
+
+    grid = CandidateGrid.from_cells(cells)
+
+    if grid is None:
+        return
+
+    if stats is not None:
+        yield from _search_traced(grid, techniques, stats, 0)
+    else:
+        yield from _search(grid, techniques)
+
+
+def solve_cells(
+    cells: Sequence[int],
+    techniques: Counter | None = None,
+    stats: SearchStats | None = None,
+) -> FlatGrid | None:
+    """
+        ========================================================
+          Première solution d'une grille à plat (ou None)
+        ========================================================
+    """
+
+    return next(iter_solutions(cells, techniques, stats), None)
@@ -0,0 +1,695 @@
+"""Service de résolution local (asyncio), avec regroupement des requêtes.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Protocole
+    ---------
+    Connexion TCP, un message JSON par ligne dans chaque sens :
+        - requête : {"id": ..., "grid": "<81 caractères>", "engine": ...,
+          "timeout": secondes, "max_nodes": N} (seul "grid" est requis) ;
+        - réponse : {"id": ..., "status": ..., "solution": "<81 caractères>"
+          ou null, "nodes": N ou null, "latency_ms": {"queue": ...,
+          "solve": ..., "total": ...}}.
+    Les requêtes d'une même connexion sont traitées en parallèle : les
+    réponses arrivent dans l'ordre où elles sont prêtes, "id" permet de les
+    rapprocher. {"op": "stats"} renvoie le bilan du service ; une requête
+    de résolution peut aussi porter {"op": "solve"} (voir `OPS`).
+
+    Statuts (`STATUSES`) : "solved", "unsolved" (aucune solution),
+    "invalid" (grille mal formée), "timeout", "budget" (budget de nœuds
+    épuisé), "overloaded" (requête refusée, file pleine), "error" (message
+    illisible, opération inconnue ou requête de résolution sans grille).
+
+    Regroupement
+    ------------
+    Les requêtes sont placées dans une file. Une tâche de répartition
+    attend la première, puis en collecte d'autres pendant au plus
+    `batch_delay` secondes (ou jusqu'à `batch_size`), écarte celles qui ont
+    expiré entre-temps et envoie le lot au pool de processus : un seul
+    aller-retour entre processus pour tout le lot, au lieu d'un par grille.
+
+    Dans le lot, chaque grille dispose d'au plus `batch_nodes` nœuds (et de
+    son propre budget, s'il est plus petit). Une grille qui n'est pas
+    résolue dans cette limite est « reportée » : le lot rend la main sans
+    elle, et elle est renvoyée seule au pool, avec son échéance et son
+    budget complets. Une grille pathologique ne coûte ainsi aux autres
+    grilles de son lot que `batch_nodes` nœuds, au lieu de les retenir
+    jusqu'à son échéance.
+
+    Délais et budgets
+    -----------------
+    - `timeout` : passé ce délai, le client reçoit "timeout". Une requête
+      expirée avant d'avoir été envoyée au pool n'est pas résolue, et un
+      processus saute les grilles dont l'échéance est passée.
+    - Dans le processus, le temps restant avant l'échéance et `max_nodes`
+      deviennent le budget de la recherche (voir `app.budget`) : une
+      grille pathologique est abandonnée à l'échéance au lieu d'occuper le
+      processus indéfiniment. La recherche est alors instrumentée, ce qui
+      la ralentit de 10 à 30 % ; avec `timeout` et `max_nodes` à None, le
+      moteur tourne sans instrumentation.
+
+    Surcharge
+    ---------
+    La file est bornée (`max_pending`) : au-delà, les requêtes sont refusées
+    aussitôt ("overloaded") au lieu de s'accumuler, et au plus 2 tâches
+    (lots ou grilles reportées) par processus sont en cours. Le débit reste ainsi celui du pool, et les
+    requêtes acceptées gardent une latence bornée.
+
+    Usage :
+        python -m app.server [--host HOTE] [--port PORT] [--engine MOTEUR]
+            [--workers N] [--batch-size N] [--batch-delay S]
+            [--batch-nodes N] [--max-pending N] [--timeout S]
+            [--max-nodes N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Deque, Dict, List, Tuple
+
+from .batch import format_line, parse_line
+from .grid import FlatGrid
+from .stats import percentile
+from .sudoku_solver import DEFAULT_ENGINE, ENGINES, iter_cell_solutions, search_with_budget
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_BATCH_DELAY = 0.002
+DEFAULT_BATCH_NODES = 1000
+DEFAULT_MAX_PENDING = 1024
+DEFAULT_TIMEOUT = 10.0
+LATENCY_WINDOW = 10_000
+
+STATUSES = ("solved", "unsolved", "invalid", "timeout", "budget", "overloaded", "error")
+OPS = ("solve", "stats")
+
+#
+# Une tâche envoyée au pool : (grille, moteur, budget de nœuds, échéance
+# en temps absolu `time.time()`) ; son résultat : (statut, solution,
+# nœuds, durée de résolution en secondes). Le statut interne "deferred"
+# marque une grille reportée (voir `_solve_jobs`).
+#
+Job = Tuple[FlatGrid, str, "int | None", "float | None"]
+JobResult = Tuple[str, "FlatGrid | None", "int | None", float]
+
+
+def _solve_job(cells: FlatGrid, engine: str, max_nodes: int | None, deadline: float | None) -> JobResult:
+    """
+        Résolution d'une grille dans un processus du pool. Le temps restant
+        avant l'échéance devient le budget de durée de la recherche.
+    """
+
+    if deadline is None and max_nodes is None:
+        start = time.perf_counter()
+        solution = next(iter_cell_solutions(cells, engine), None)
+        status = "solved" if solution is not None else "unsolved"
+        return status, solution, None, time.perf_counter() - start
+
+    remaining = None if deadline is None else deadline - time.time()
+
+    if remaining is not None and remaining <= 0:
+        return "timeout", None, None, 0.0
+
+    result = search_with_budget(cells, engine, max_nodes=max_nodes, max_time=remaining)
+
+    if result.aborted is not None:
+        status = "budget" if result.aborted == "nodes" else "timeout"
+        return status, None, result.stats.nodes, result.stats.elapsed
+
+    solution = result.solutions[0] if result.solutions else None
+    status = "solved" if solution is not None else "unsolved"
+    return status, solution, result.stats.nodes, result.stats.elapsed
+
+
+def _solve_jobs(jobs: List[Job], batch_nodes: int | None) -> List[JobResult]:
+    """
+        ========================================================
+          Tâche exécutée dans un processus du pool : un lot entier
+        ========================================================
+
+        Chaque grille dispose d'au plus `batch_nodes` nœuds (None : pas de
+        limite propre au lot). Une grille qui épuise cette limite, et non
+        son propre budget, est rendue avec le statut "deferred", à
+        renvoyer seule au pool.
+    """
+
+    results = []
+
+    for cells, engine, max_nodes, deadline in jobs:
+        if batch_nodes is None or (max_nodes is not None and max_nodes <= batch_nodes):
+            results.append(_solve_job(cells, engine, max_nodes, deadline))
+            continue
+
+        result = _solve_job(cells, engine, batch_nodes, deadline)
+
+        if result[0] == "budget":
+            result = ("deferred",) + result[1:]
+
+        results.append(result)
+
+    return results
+
+
+def _check_message(message) -> None:
+    """
+        Lève ValueError si un message décodé n'est pas une requête
+        valide : objet JSON, opération connue (`OPS`, "solve" par défaut)
+        et, pour une résolution, une grille.
+    """
+
+    if not isinstance(message, dict):
+        raise ValueError("le message doit être un objet JSON")
+
+    op = message.get("op", "solve")
+
+    if op not in OPS:
+        raise ValueError(f"opération inconnue : {op!r}")
+
+    if op == "solve" and "grid" not in message:
+        raise ValueError("message sans grille")
+
+
+@dataclass
+class _Request:
+    """
+        Requête en attente dans la file du service.
+    """
+
+    cells: FlatGrid
+    engine: str
+    max_nodes: int | None
+    deadline: float | None
+    future: asyncio.Future
+    received: float = field(default_factory=time.perf_counter)
+    dispatched: float | None = None
+
+
+class SolverService:
+    """
+        ========================================================
+          Service de résolution : file, regroupement, pool
+        ========================================================
+
+        Utilisable sans réseau (`await service.solve(...)`) ou derrière un
+        serveur TCP (`await service.serve(host, port)`). À démarrer avec
+        `start()` (ou `async with`) dans la boucle qui l'utilise.
+    """
+
+    def __init__(
+        self,
+        engine: str = DEFAULT_ENGINE,
+        workers: int = 1,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        batch_delay: float = DEFAULT_BATCH_DELAY,
+        batch_nodes: int | None = DEFAULT_BATCH_NODES,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        timeout: float | None = DEFAULT_TIMEOUT,
+        max_nodes: int | None = None,
+    ):
+        if engine not in ENGINES:
+            raise ValueError(f"Moteur inconnu : {engine!r} (choix possibles : {', '.join(ENGINES)}).")
+
+        if batch_size < 1 or max_pending < 1:
+            raise ValueError("La taille des lots et celle de la file doivent être positives.")
+
+        if batch_nodes is not None and batch_nodes < 1:
+            raise ValueError(f"Le budget de nœuds d'un lot doit être positif (reçu {batch_nodes}).")
+
+        if workers < 1:
+            workers = os.cpu_count() or 1
+
+        self.engine = engine
+        self.workers = workers
+        self.batch_size = batch_size
+        self.batch_delay = batch_delay
+        self.batch_nodes = batch_nodes
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_nodes = max_nodes
+
+        self.counters: Counter = Counter()
+        self.batches = 0
+        self.deferred = 0
+        self._latencies: Deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self._queue: asyncio.Queue | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._executor: ProcessPoolExecutor | None = None
+        self._dispatcher: asyncio.Task | None = None
+        self._resubmits: set = set()
+
+    async def start(self) -> None:
+        """
+            Crée le pool et lance la tâche de répartition.
+        """
+
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._slots = asyncio.Semaphore(2 * self.workers)
+        #
+        # "spawn" : un processus créé par fork hériterait des sockets ouverts
+        # à ce moment-là, et une connexion fermée par le service ne le
+        # serait pas réellement tant que ce processus vit
+        #
+        context = multiprocessing.get_context("spawn")
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def close(self) -> None:
+        """
+            Arrête la répartition et le pool ; les lots en cours ne sont pas
+            attendus.
+        """
+
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+
+            self._dispatcher = None
+
+        for task in list(self._resubmits):
+            task.cancel()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def __aenter__(self) -> "SolverService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _response(self, status: str, request: _Request | None = None, result: JobResult | None = None) -> Dict:
+        """
+            Réponse au client ; met à jour les compteurs du service.
+        """
+
+        self.counters[status] += 1
+        response: Dict = {"status": status, "solution": None, "nodes": None}
+
+        if result is not None:
+            solution, nodes = result[1], result[2]
+            response["solution"] = format_line(solution) if solution is not None else None
+            response["nodes"] = nodes
+
+        if request is not None:
+            now = time.perf_counter()
+            total = now - request.received
+            queued = (request.dispatched or now) - request.received
+            response["latency_ms"] = {
+                "queue": 1000 * queued,
+                "solve": 1000 * result[3] if result is not None else 0.0,
+                "total": 1000 * total,
+            }
+
+            if status in ("solved", "unsolved", "budget"):
+                self._latencies.append(total)
+
+        return response
+
+    async def solve(
+        self,
+        grid: str,
+        engine: str | None = None,
+        timeout: float | None = None,
+        max_nodes: int | None = None,
+    ) -> Dict:
+        """
+            ========================================================
+              Résolution d'une grille (ligne compacte de 81 caractères)
+            ========================================================
+
+            `engine`, `timeout` et `max_nodes` remplacent, pour cette
+            requête, les valeurs par défaut du service.
+        """
+
+        assert self._queue is not None, "service non démarré"
+
+        engine = engine or self.engine
+        timeout = self.timeout if timeout is None else timeout
+        max_nodes = self.max_nodes if max_nodes is None else max_nodes
+
+        if engine not in ENGINES:
+            return self._response("invalid")
+
+        #
+        # bool est une sous-classe d'int : "max_nodes": true ne doit pas
+        # devenir un budget d'un nœud
+        #
+        if max_nodes is not None and (
+            isinstance(max_nodes, bool) or not isinstance(max_nodes, int) or max_nodes < 1
+        ):
+            return self._response("invalid")
+
+        if timeout is not None and (
+            isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0
+        ):
+            return self._response("invalid")
+
+        try:
+            cells = parse_line(grid)
+        except (TypeError, ValueError):
+            return self._response("invalid")
+
+        future = asyncio.get_running_loop().create_future()
+        deadline = time.time() + timeout if timeout is not None else None
+        request = _Request(cells, engine, max_nodes, deadline, future)
+
+        try:
+            self._queue.put_nowait(request)
+        except asyncio.QueueFull:
+            return self._response("overloaded", request)
+
+        try:
+            result = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            return self._response("timeout", request)
+
+        return self._response(result[0], request, result)
+
+    async def _dispatch(self) -> None:
+        """
+            ========================================================
+              Tâche de répartition : file -> lots -> pool
+            ========================================================
+        """
+
+        assert self._queue is not None and self._slots is not None
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            closing = loop.time() + self.batch_delay
+
+            while True:
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+
+                remaining = closing - loop.time()
+
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+
+                await asyncio.sleep(remaining)
+
+            await self._submit(batch, self.batch_nodes)
+
+    async def _submit(self, batch: List[_Request], batch_nodes: int | None) -> None:
+        """
+            Envoie un lot au pool (une place de `_slots` par lot en cours).
+            Les requêtes abandonnées entre-temps (délai dépassé) ne sont pas
+            envoyées.
+        """
+
+        assert self._slots is not None
+        await self._slots.acquire()
+        batch = [request for request in batch if not request.future.done()]
+
+        if not batch:
+            self._slots.release()
+            return
+
+        now = time.perf_counter()
+
+        for request in batch:
+            if request.dispatched is None:
+                request.dispatched = now
+
+        jobs: List[Job] = [(r.cells, r.engine, r.max_nodes, r.deadline) for r in batch]
+        task = asyncio.get_running_loop().run_in_executor(self._executor, _solve_jobs, jobs, batch_nodes)
+        task.add_done_callback(lambda done, batch=batch: self._deliver(batch, done))
+        self.batches += 1
+
+    def _deliver(self, batch: List[_Request], done: asyncio.Future) -> None:
+        """
+            Transmet les résultats d'un lot aux requêtes encore en attente ;
+            les grilles reportées sont renvoyées seules au pool, sans limite
+            de lot.
+        """
+
+        assert self._slots is not None
+        self._slots.release()
+
+        if done.cancelled() or done.exception() is not None:
+            results = None
+        else:
+            results = done.result()
+
+        for index, request in enumerate(batch):
+            if request.future.done():
+                continue
+
+            if results is None:
+                request.future.set_result(("error", None, None, 0.0))
+            elif results[index][0] == "deferred":
+                self.deferred += 1
+                task = asyncio.ensure_future(self._submit([request], None))
+                self._resubmits.add(task)
+                task.add_done_callback(self._resubmits.discard)
+            else:
+                request.future.set_result(results[index])
+
+    def stats(self) -> Dict:
+        """
+            Bilan du service : compteurs par statut, tâches envoyées au
+            pool (lots et grilles reportées), grilles reportées, latences (fenêtre des `LATENCY_WINDOW` dernières requêtes
+            traitées).
+        """
+
+        samples = list(self._latencies)
+
+        return {
+            "requests": sum(self.counters.values()),
+            "statuses": {status: self.counters[status] for status in STATUSES},
+            "batches": self.batches,
+            "deferred": self.deferred,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "median_ms": 1000 * percentile(samples, 50) if samples else 0.0,
+            "p95_ms": 1000 * percentile(samples, 95) if samples else 0.0,
+            "p99_ms": 1000 * percentile(samples, 99) if samples else 0.0,
+        }
+
+    async def _answer(self, message: Dict) -> Dict:
+        """
+            Traite un message déjà décodé.
+        """
+
+        if message.get("op") == "stats":
+            return self.stats()
+
+        response = await self.solve(
+            message["grid"],
+            engine=message.get("engine"),
+            timeout=message.get("timeout"),
+            max_nodes=message.get("max_nodes"),
+        )
+
+        if "id" in message:
+            response["id"] = message["id"]
+
+        return response
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+            ========================================================
+              Une connexion client : un message JSON par ligne
+            ========================================================
+        """
+
+        tasks = set()
+
+        async def reply(message: Dict) -> None:
+            writer.write(json.dumps(await self._answer(message)).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                message = None
+
+                try:
+                    message = json.loads(line)
+                    _check_message(message)
+
+                except ValueError as exc:
+                    self.counters["error"] += 1
+                    response = {"status": "error", "error": str(exc)}
+
+                    if isinstance(message, dict) and "id" in message:
+                        response["id"] = message["id"]
+
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+                    continue
+
+                task = asyncio.create_task(reply(message))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        except ConnectionError:
+            pass
+
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> asyncio.AbstractServer:
+        """
+            Ouvre le serveur TCP (port 0 : port libre choisi par le système,
+            voir `server.sockets[0].getsockname()`).
+        """
+
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def request(host: str, port: int, messages: List[Dict]) -> List[Dict]:
+    """
+        ========================================================
+          Client minimal : envoie des messages, attend les réponses
+        ========================================================
+
+        Les messages partent tous d'un coup (traitement en parallèle) ; les
+        réponses sont rendues dans l'ordre d'arrivée.
+    """
+
+    reader, writer = await asyncio.open_connection(host, port)
+
+    try:
+        writer.write(b"".join(json.dumps(message).encode() + b"\n" for message in messages))
+        await writer.drain()
+        return [json.loads(await reader.readline()) for _ in messages]
+
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def _run(args: argparse.Namespace) -> None:
+    """
+        Démarre le service et le serveur TCP, jusqu'à interruption.
+    """
+
+    async with SolverService(
+        engine=args.engine,
+        workers=args.workers,
+        batch_size=args.batch_size,
+        batch_delay=args.batch_delay,
+        batch_nodes=args.batch_nodes or None,
+        max_pending=args.max_pending,
+        timeout=args.timeout,
+        max_nodes=args.max_nodes,
+    ) as service:
+        server = await service.serve(args.host, args.port)
+        host, port = server.sockets[0].getsockname()[:2]
+        print(f"Service de résolution à l'écoute sur {host}:{port}.", file=sys.stderr)
+
+        async with server:
+            await server.serve_forever()
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+        ========================================================
+          Point d'entrée CLI
+        ========================================================
+
+        Usage :
+            python -m app.server [--host HOTE] [--port PORT]
+                [--engine MOTEUR] [--workers N] [--batch-size N]
+                [--batch-delay S] [--batch-nodes N] [--max-pending N]
+                [--timeout S] [--max-nodes N]
+
+        Les valeurs données ici sont les valeurs par défaut des requêtes ;
+        chaque requête peut fixer son propre délai et son budget.
+    """
+
+    parser = argparse.ArgumentParser(description="Service de résolution local (JSON par ligne, TCP)")
+
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"Adresse d'écoute (défaut : {DEFAULT_HOST}).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (défaut : {DEFAULT_PORT}).")
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help=f"Moteur de résolution (défaut : {DEFAULT_ENGINE}).",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=1,
+        help="Nombre de processus (défaut : 1 ; 0 = nombre de cœurs).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Nombre maximal de grilles par lot (défaut : {DEFAULT_BATCH_SIZE}).",
+    )
+    parser.add_argument(
+        "--batch-delay",
+        type=float,
+        default=DEFAULT_BATCH_DELAY,
+        help=f"Attente maximale pour compléter un lot, en secondes (défaut : {DEFAULT_BATCH_DELAY}).",
+    )
+    parser.add_argument(
+        "--batch-nodes",
+        type=int,
+        default=DEFAULT_BATCH_NODES,
+        metavar="N",
+        help=(
+            f"Nœuds accordés à chaque grille dans un lot avant de la reporter "
+            f"(défaut : {DEFAULT_BATCH_NODES} ; 0 = aucune limite)."
+        ),
+    )
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        default=DEFAULT_MAX_PENDING,
+        help=f"Taille de la file d'attente (défaut : {DEFAULT_MAX_PENDING}).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help=f"Délai par requête, en secondes (défaut : {DEFAULT_TIMEOUT}).",
+    )
+    parser.add_argument("--max-nodes", type=int, metavar="N", help="Budget de nœuds par requête.")
+    args = parser.parse_args(argv)
+
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:  # pragma: no cover - arrêt manuel
+        pass
+    except (OSError, ValueError) as exc:  # pragma: no cover - CLI UX
+        print(f"Erreur : {exc}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - exécution directe
+    raise SystemExit(main())
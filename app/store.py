@@ -0,0 +1,438 @@
+"""Stockage binaire de grilles, lu par projection mémoire (mmap).
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Format
+    ------
+    Un fichier de grilles 9x9 se compose de :
+        - un en-tête de 16 octets (`HEADER`, petit-boutiste) :
+            * signature b"SDKS" ;
+            * version du format (1) ;
+            * codage des cases : 0 = un octet par case (81 octets par
+              grille), 1 = deux cases par octet (41 octets par grille, la
+              première case dans les 4 bits de poids fort) ;
+            * drapeaux : bit 0 levé si une section de solutions suit ;
+            * un octet réservé ;
+            * nombre de grilles (entier sur 8 octets) ;
+        - la section des grilles : un enregistrement de taille fixe par
+          grille, en ordre de lecture, 0 pour une case vide ;
+        - la section des solutions (facultative) : un enregistrement par
+          grille, au même codage ; que des zéros pour une grille sans
+          solution.
+
+    Lecture
+    -------
+    `PuzzleStore` projette le fichier en mémoire : l'ouverture ne lit que
+    l'en-tête, et la grille n° i est à une position calculable. Avec un
+    octet par case, `store[i]` est une vue (`memoryview`) sur la projection,
+    sans aucune copie ; avec deux cases par octet, la grille est décodée à
+    la volée (deux `bytes.translate`). `iter_puzzles(start, stop)` parcourt
+    une tranche sans rien charger d'autre.
+
+    Les vues renvoyées doivent être libérées avant `close()` (sinon
+    BufferError) ; `puzzle(i)` renvoie une copie indépendante.
+
+    Écriture
+    --------
+    `StoreWriter` écrit au fil de l'eau : les solutions sont mises de côté
+    dans un fichier temporaire et recopiées à la fermeture, puis le nombre
+    de grilles est inscrit dans l'en-tête.
+
+    Usage :
+        python -m app.store pack entree.txt sortie.sdk [--packed] [--solve]
+            [--engine MOTEUR]
+        python -m app.store unpack entree.sdk [-o sortie.txt] [--solutions]
+        python -m app.store info entree.sdk
+"""
+
+from __future__ import annotations
+
+import mmap
+import struct
+import sys
+from typing import IO, Iterable, Iterator, Sequence
+
+from .grid import FlatGrid
+from .tables import CELLS
+
+
+MAGIC = b"SDKS"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sBBBxQ")
+
+BYTE_CELLS = 0
+PACKED_CELLS = 1
+HAS_SOLUTIONS = 1
+
+RECORD_SIZES = {BYTE_CELLS: CELLS, PACKED_CELLS: (CELLS + 1) // 2}
+
+#
+# Décodage des octets à deux cases : valeur des 4 bits de poids fort et des
+# 4 bits de poids faible de chaque octet possible.
+#
+_HIGH = bytes(byte >> 4 for byte in range(256))
+_LOW = bytes(byte & 0x0F for byte in range(256))
+
+
+def pack_cells(cells: Sequence[int]) -> bytes:
+    """
+        81 valeurs -> 41 octets (deux cases par octet).
+    """
+
+    padded = bytes(cells) + b"\0"
+    return bytes((padded[i] << 4) | padded[i + 1] for i in range(0, CELLS, 2))
+
+
+def unpack_cells(record: bytes | memoryview) -> FlatGrid:
+    """
+        41 octets -> grille compacte de 81 cases.
+    """
+
+    cells = bytearray(2 * len(record))
+    cells[0::2] = bytes(record).translate(_HIGH)
+    cells[1::2] = bytes(record).translate(_LOW)
+    del cells[CELLS:]
+    return cells
+
+
+def is_store(path: str) -> bool:
+    """
+        Le fichier commence-t-il par la signature du format ?
+    """
+
+    try:
+        with open(path, "rb") as handler:
+            return handler.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+class StoreWriter:
+    """
+        ========================================================
+          Écriture d'un fichier de grilles
+        ========================================================
+
+        À utiliser comme gestionnaire de contexte :
+
+            with StoreWriter("corpus.sdk", packed=True) as writer:
+                writer.add(cells, solution)
+    """
+
+    def __init__(self, path: str, packed: bool = False, with_solutions: bool = False):
+        self.encoding = PACKED_CELLS if packed else BYTE_CELLS
+        self.with_solutions = with_solutions
+        self.count = 0
+        self._file: IO[bytes] = open(path, "wb")
+        self._solutions: IO[bytes] | None = None
+
+        if with_solutions:
+            import tempfile
+
+            self._solutions = tempfile.TemporaryFile()
+
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.encoding, 0, 0))
+
+    def _encode(self, cells: Sequence[int]) -> bytes:
+        if len(cells) != CELLS:
+            raise ValueError(f"La grille doit contenir {CELLS} cases (reçu {len(cells)}).")
+
+        if any(value > 9 for value in cells):
+            raise ValueError("Valeur hors limites dans la grille (attendu : 0 à 9).")
+
+        return pack_cells(cells) if self.encoding == PACKED_CELLS else bytes(cells)
+
+    def add(self, cells: Sequence[int], solution: Sequence[int] | None = None) -> None:
+        """
+            Ajoute une grille (et sa solution, si le fichier en comporte).
+        """
+
+        self._file.write(self._encode(cells))
+
+        if self._solutions is not None:
+            self._solutions.write(self._encode(solution if solution is not None else bytes(CELLS)))
+
+        self.count += 1
+
+    def close(self) -> None:
+        """
+            Recopie les solutions et inscrit le nombre de grilles.
+        """
+
+        if self._file.closed:
+            return
+
+        flags = 0
+
+        if self._solutions is not None:
+            import shutil
+
+            flags |= HAS_SOLUTIONS
+            self._solutions.seek(0)
+            shutil.copyfileobj(self._solutions, self._file)
+            self._solutions.close()
+
+        self._file.seek(0)
+        self._file.write(HEADER.pack(MAGIC, FORMAT_VERSION, self.encoding, flags, self.count))
+        self._file.close()
+
+    def __enter__(self) -> "StoreWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class PuzzleStore:
+    """
+        ========================================================
+          Lecture d'un fichier de grilles par projection mémoire
+        ========================================================
+
+        - `len(store)` : nombre de grilles ;
+        - `store[i]` : la grille n° i (vue sans copie, ou grille décodée
+          pour le codage à deux cases par octet) ;
+        - `store.solution(i)` : la solution n° i, ou None ;
+        - `store.iter_puzzles(start, stop)` : parcours d'une tranche.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Fichier de grilles vide : {path}.") from None
+
+        self._view = memoryview(self._map)
+
+        try:
+            self._read_header(path)
+        except ValueError:
+            self.close()
+            raise
+
+    def _read_header(self, path: str) -> None:
+        if len(self._map) < HEADER.size:
+            raise ValueError(f"Fichier de grilles tronqué : {path}.")
+
+        magic, version, encoding, flags, count = HEADER.unpack_from(self._map)
+
+        if magic != MAGIC:
+            raise ValueError(f"{path} n'est pas un fichier de grilles.")
+
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Version de fichier non prise en charge : {version}.")
+
+        if encoding not in RECORD_SIZES:
+            raise ValueError(f"Codage des cases inconnu : {encoding}.")
+
+        self.encoding = encoding
+        self.record_size = RECORD_SIZES[encoding]
+        self.count = count
+        self.has_solutions = bool(flags & HAS_SOLUTIONS)
+
+        sections = 2 if self.has_solutions else 1
+        expected = HEADER.size + sections * count * self.record_size
+
+        if len(self._map) != expected:
+            raise ValueError(
+                f"Taille de fichier incohérente : {len(self._map)} octets (attendu {expected})."
+            )
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _record(self, section: int, index: int) -> memoryview:
+        if not -self.count <= index < self.count:
+            raise IndexError(f"Grille hors limites : {index} (le fichier en contient {self.count}).")
+
+        if index < 0:
+            index += self.count
+
+        start = HEADER.size + (section * self.count + index) * self.record_size
+        return self._view[start : start + self.record_size]
+
+    def _decode(self, record: memoryview) -> memoryview | FlatGrid:
+        return record if self.encoding == BYTE_CELLS else unpack_cells(record)
+
+    def __getitem__(self, index: int) -> memoryview | FlatGrid:
+        return self._decode(self._record(0, index))
+
+    def puzzle(self, index: int) -> FlatGrid:
+        """
+            Copie indépendante de la grille n° `index`.
+        """
+
+        return bytearray(self[index])
+
+    def solution(self, index: int) -> FlatGrid | None:
+        """
+            Solution de la grille n° `index` (None si le fichier n'en
+            comporte pas, ou si la grille n'a pas de solution).
+        """
+
+        if not self.has_solutions:
+            return None
+
+        cells = bytearray(self._decode(self._record(1, index)))
+        return cells if any(cells) else None
+
+    def iter_puzzles(self, start: int = 0, stop: int | None = None) -> Iterator[memoryview | FlatGrid]:
+        """
+            Grilles `start` à `stop` (exclu), sans lire le reste du fichier.
+        """
+
+        start, stop, _ = slice(start, stop).indices(self.count)
+
+        for index in range(start, stop):
+            yield self._decode(self._record(0, index))
+
+    def __iter__(self) -> Iterator[memoryview | FlatGrid]:
+        return self.iter_puzzles()
+
+    def close(self) -> None:
+        """
+            Libère la projection ; les vues encore détenues doivent avoir été
+            libérées.
+        """
+
+        self._view.release()
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "PuzzleStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def write_store(
+    path: str,
+    puzzles: Iterable[Sequence[int]],
+    packed: bool = False,
+    solutions: Iterable[Sequence[int] | None] | None = None,
+) -> int:
+    """
+        ========================================================
+          Écriture d'un fichier complet, retourne le nombre de grilles
+        ========================================================
+    """
+
+    with StoreWriter(path, packed, with_solutions=solutions is not None) as writer:
+        if solutions is None:
+            for cells in puzzles:
+                writer.add(cells)
+        else:
+            for cells, solution in zip(puzzles, solutions):
+                writer.add(cells, solution)
+
+        return writer.count
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+        ========================================================
+          Point d'entrée CLI
+        ========================================================
+
+        Usage :
+            python -m app.store pack entree.txt sortie.sdk [--packed]
+                [--solve] [--engine MOTEUR]
+            python -m app.store unpack entree.sdk [-o sortie.txt]
+                [--solutions]
+            python -m app.store info entree.sdk
+
+        - `pack` convertit un fichier « une grille par ligne » (format de
+          `app.batch`) ; les lignes mal formées sont ignorées. `--solve`
+          ajoute la section des solutions.
+        - `unpack` fait l'inverse (ou écrit les solutions).
+    """
+
+    import argparse
+
+    # import local : seule la CLI a besoin des moteurs
+    from .sudoku_solver import DEFAULT_ENGINE, ENGINES
+
+    parser = argparse.ArgumentParser(description="Fichiers binaires de grilles")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    pack = commands.add_parser("pack", help="Texte -> binaire.")
+    pack.add_argument("source", help="Fichier texte, une grille de 81 caractères par ligne.")
+    pack.add_argument("target", help="Fichier binaire à écrire.")
+    pack.add_argument("--packed", action="store_true", help="Deux cases par octet (41 octets).")
+    pack.add_argument("--solve", action="store_true", help="Ajoute la section des solutions.")
+    pack.add_argument(
+        "--engine",
+        choices=ENGINES,
+        default=DEFAULT_ENGINE,
+        help=f"Moteur utilisé avec --solve (défaut : {DEFAULT_ENGINE}).",
+    )
+
+    unpack = commands.add_parser("unpack", help="Binaire -> texte.")
+    unpack.add_argument("source", help="Fichier binaire.")
+    unpack.add_argument("-o", "--output", help="Fichier de sortie (défaut : sortie standard).")
+    unpack.add_argument("--solutions", action="store_true", help="Écrit les solutions.")
+
+    info = commands.add_parser("info", help="Décrit un fichier binaire.")
+    info.add_argument("source", help="Fichier binaire.")
+
+    args = parser.parse_args(argv)
+
+    # import local : `app.batch` lit lui-même ce format
+    from .batch import format_line, iter_file, solve_stream
+
+    try:
+        if args.command == "pack":
+            with open(args.source, "rb") as source:
+                puzzles = (cells for cells in iter_file(source) if cells is not None)
+
+                with StoreWriter(args.target, args.packed, with_solutions=args.solve) as writer:
+                    if args.solve:
+                        for cells, solution in solve_stream(puzzles, args.engine):
+                            writer.add(cells, solution)
+                    else:
+                        for cells in puzzles:
+                            writer.add(cells)
+
+            print(f"{writer.count} grille(s) écrite(s) dans {args.target}.", file=sys.stderr)
+
+        elif args.command == "unpack":
+            with PuzzleStore(args.source) as store:
+                if args.solutions and not store.has_solutions:
+                    raise ValueError(f"{args.source} ne contient pas de solutions.")
+
+                target = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+
+                try:
+                    for index in range(len(store)):
+                        if args.solutions:
+                            solution = store.solution(index)
+                            target.write((format_line(solution) if solution else "") + "\n")
+                        else:
+                            target.write(format_line(store[index]) + "\n")
+                finally:
+                    if target is not sys.stdout:
+                        target.close()
+
+        else:
+            with PuzzleStore(args.source) as store:
+                encoding = "2 cases par octet" if store.encoding == PACKED_CELLS else "1 octet par case"
+                print(
+                    f"{len(store)} grille(s), {store.record_size} octets par grille ({encoding}), "
+                    f"{'avec' if store.has_solutions else 'sans'} solutions."
+                )
+
+    except (OSError, ValueError) as exc:  # pragma: no cover - CLI UX
+        print(f"Erreur d'accès au fichier: {exc}", file=sys.stderr)
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - exécution directe
+    raise SystemExit(main())
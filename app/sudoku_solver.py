@@ -16,10 +16,41 @@
     Ce module fournit :
         - un parseur tolérant pour lire une grille (fichier ou saisie) ;
         - un solveur par backtracking qui modifie la grille sur place ;
+        - plusieurs moteurs interchangeables derrière `solve` et
+          `find_solutions` (voir `ENGINES`) : le moteur historique
+          ("backtracking"), un moteur à masques de bits ("bitmask"), qui
+          peut choisir la case la plus contrainte d'abord, et un moteur qui
+          propage les contraintes avant chaque branchement ("propagation"),
+          un moteur de couverture exacte par Dancing Links ("dlx"), et une
+          version itérative, à pile explicite, du moteur "bitmask"
+          ("iterative"), sans limite de profondeur de récursion ;
         - un formateur pour afficher proprement la grille ;
-        - une interface CLI : `python -m app.sudoku_solver [chemin_du_fichier]`;
+        - l'acceptation, partout, de la grille compacte de `app.grid`
+          (`bytearray` de 81 octets) en plus de la grille 9x9 historique ;
+        - une interface CLI :
+          `python -m app.sudoku_solver [--engine MOTEUR] [--heuristic H]
+          [chemin_du_fichier]`;
         - une recherche de toutes les solutions avec mesure du temps pour la
-          première et le total.
+          première et le total ;
+        - une instrumentation optionnelle de tous les moteurs (paramètre
+          `stats`, voir `app.stats`, et `solve_with_stats`) ;
+        - un comptage borné des solutions (`count_solutions`, `is_unique`)
+          qui arrête la recherche dès que la limite est atteinte ;
+        - la prise en charge des grilles N²xN² (16x16, 25x25...) par le
+          moteur "dlx" (voir `SCALABLE_ENGINES`) ;
+        - une recherche bornée en nœuds, en durée ou annulable
+          (`search_with_budget`, voir `app.budget`), qui rend les solutions
+          déjà trouvées quand elle est interrompue ;
+        - une table de transposition optionnelle (paramètre `table`, voir
+          `app.transposition` et `MEMO_ENGINES`), qui mémorise les états
+          déjà explorés d'une recherche à l'autre ;
+        - une sortie JSON Lines (`--format jsonl`, voir `iter_records` et
+          `write_records`) : une grille par ligne en entrée, un objet JSON
+          par grille en sortie, pour alimenter d'autres traitements ;
+        - un import sans effet de bord et un démarrage minimal de la CLI :
+          `argparse` et `json` ne sont importés qu'à l'usage, et un appel
+          sans autre option que `--format` (`python -m app.sudoku_solver
+          FICHIER`) ne construit pas de parseur (voir `main`).
 
     Format attendu
     --------------
@@ -28,66 +59,158 @@
         - "." ou "0" pour les cases vides ;
         - les espaces et séparateurs (|, -, etc.) sont ignorés, ce qui autorise
           des lignes comme "..1 23. 8.6".
+
+    Pour une grille à blocs de N x N (`box`), N² lignes de N² cases ; les
+    valeurs au-delà de 9 s'écrivent A, B, C... (voir `app.grid.symbols`),
+    ou bien toutes les valeurs sont des lettres (`app.grid.LETTERS`, A-P
+    pour une grille 16x16). Les lettres minuscules sont acceptées.
 """
 
 from __future__ import annotations
 
-import argparse
+import functools
+import itertools
 import sys
 import time
-from typing import Iterable, List, Tuple
+import types
+from collections import Counter
+from typing import IO, Dict, Iterable, Iterator, List, NamedTuple, Sequence, Tuple, Union
+
+from . import bitmask_solver, dlx, iterative, propagation
+from .budget import Budget, CancelToken, SearchAborted
+from .grid import DIGITS, LETTERS, FlatGrid, Grid, as_flat, from_rows, symbols, to_rows
+from .stats import SearchStats
+from .tables import CELLS, PEER_COORDS, geometry, geometry_for_cells
+from .transposition import TranspositionTable
 
 
-Grid = List[List[int]]
+AnyGrid = Union[Grid, FlatGrid]
 DEFAULT_FILE_NAME = "1.txt"
 
+ENGINES = ("backtracking", "bitmask", "propagation", "dlx", "iterative")
+DEFAULT_ENGINE = "bitmask"
+
+#
+# Moteurs capables de traiter les grilles autres que 9x9, et moteur utilisé
+# par défaut pour celles-ci.
+#
+SCALABLE_ENGINES = ("dlx",)
+DEFAULT_SCALABLE_ENGINE = "dlx"
+
+FORMATS = ("text", "jsonl")
+DEFAULT_FORMAT = "text"
+
+#
+# Sortie JSON Lines : nombre d'enregistrements écrits d'un seul bloc, et
+# statut d'une recherche interrompue selon la raison (voir `app.budget`).
+#
+JSONL_CHUNK_SIZE = 256
+ABORT_STATUSES = {"nodes": "budget", "time": "timeout", "cancelled": "cancelled"}
 
-def _clean_values(lines: Iterable[str]) -> Grid:
+#
+# Moteurs acceptant une table de transposition (paramètre `table`).
+#
+MEMO_ENGINES = ("bitmask",)
+
+HEURISTICS = bitmask_solver.HEURISTICS
+DEFAULT_HEURISTIC = bitmask_solver.DEFAULT_HEURISTIC
+
+
+def parse_grid(lines: Iterable[str], box: int = 3, alphabet: str = DIGITS) -> FlatGrid:
     """
         ========================================================
-          Lecture tolérante : lignes brutes -> grille 9x9
+          Lecture tolérante : lignes brutes -> grille compacte
         ========================================================
 
         Idée générale
         -------------
-        - Parcourir chaque caractère fourni.
-        - Conserver uniquement les chiffres 1-9, et traduire "." ou "0" en case
-          vide (valeur 0).
+        - Parcourir chaque caractère fourni (en pratique : une conversion
+          par table, `bytes.translate`, sur tout le texte).
+        - Conserver uniquement les chiffres 1-9 (ou les symboles des valeurs
+          de la grille, pour une grille à blocs de `box` x `box`), et
+          traduire "." ou "0" en case vide (valeur 0).
         - Ignorer les espaces et tout séparateur (|, -, etc.) pour rester
           permissif.
-        - Vérifier que le résultat comporte bien 81 cases.
+        - Vérifier que le résultat comporte bien 81 cases (N⁴ en général).
     """
 
-    digits = []
+    geo = geometry(box)
+    table, ignored = _grid_tables(geo.size, alphabet)
 
-    for line in lines:
-        for char in line.strip():
-            if char.isdigit() and char != "0":
-                digits.append(int(char))
+    #
+    # Conversion par table de tout le texte d'un coup : les symboles
+    # deviennent leur valeur, "." et "0" une case vide, et tout le reste
+    # (espaces, séparateurs, caractères non ASCII) est supprimé.
+    #
+    data = "".join(line.strip() for line in lines).encode("utf-8")
+    digits = bytearray(data.translate(table, ignored))
 
-            elif char in {".", "0"}:
-                digits.append(0)
+    if len(digits) != geo.cells:
+        raise ValueError(
+            f"La grille doit contenir {geo.cells} cases après nettoyage (reçu {len(digits)})."
+        )
 
-            elif char.isspace():
-                #
-                # Les espaces sont ignorés (permet des grilles aérées)
-                #
-                continue
+    return digits
 
-            else:
-                #
-                # Les autres séparateurs sont simplement sautés pour tolérer
-                # les mises en forme « jolies » des grilles.
-                #
-                continue
 
-    if len(digits) != 81:
-        raise ValueError(
-            f"La grille doit contenir 81 cases après nettoyage (reçu {len(digits)})."
-        )
+@functools.lru_cache(maxsize=None)
+def _grid_tables(size: int, alphabet: str) -> Tuple[bytes, bytes]:
+    """
+        Tables de `parse_grid` : (traduction, octets à supprimer).
+    """
+
+    table = bytearray(range(256))
+    kept = set()
 
-    grid: Grid = [digits[i : i + 9] for i in range(0, 81, 9)]
-    return grid
+    for value, char in enumerate(symbols(size, alphabet), start=1):
+        for variant in {char, char.lower()}:
+            table[ord(variant)] = value
+            kept.add(ord(variant))
+
+    for char in ".0":
+        if ord(char) not in kept:
+            table[ord(char)] = 0
+            kept.add(ord(char))
+
+    ignored = bytes(byte for byte in range(256) if byte not in kept)
+    return bytes(table), ignored
+
+
+@functools.lru_cache(maxsize=None)
+def _line_table(size: int, alphabet: str) -> bytes:
+    """
+        Table de `format_compact` : valeur -> caractère ("." pour 0).
+    """
+
+    table = bytearray(b"?" * 256)
+    table[0] = ord(".")
+
+    for value, char in enumerate(symbols(size, alphabet), start=1):
+        table[value] = ord(char)
+
+    return bytes(table)
+
+
+def format_compact(cells: Sequence[int], alphabet: str = DIGITS) -> str:
+    """
+        Grille à plat -> ligne compacte ("." pour une case vide), quelle que
+        soit sa taille.
+    """
+
+    size = geometry_for_cells(len(cells)).size
+    return bytes(cells).translate(_line_table(size, alphabet)).decode("ascii")
+
+
+def _clean_values(lines: Iterable[str], box: int = 3, alphabet: str = DIGITS) -> Grid:
+    """
+        ========================================================
+          Lecture tolérante : lignes brutes -> grille 9x9
+        ========================================================
+
+        Même règles que `parse_grid`, résultat sous forme de liste de listes.
+    """
+
+    return to_rows(parse_grid(lines, box, alphabet))
 
 
 def _find_empty(grid: Grid) -> Tuple[int, int] | None:
@@ -119,64 +242,318 @@ def _is_valid(grid: Grid, row: int, col: int, value: int) -> bool:
             - la contrainte de ligne ;
             - la contrainte de colonne ;
             - la contrainte du carré 3x3 correspondant.
+
+        Les 20 cases concernées (les « voisins ») sont lues dans la table
+        précalculée `PEER_COORDS` : aucun calcul d'origine de bloc ici.
     """
 
-    #
-    # Ligne et colonne
-    #
-    if any(grid[row][c] == value for c in range(9)):
-        return False
+    for r, c in PEER_COORDS[row * 9 + col]:
+        if grid[r][c] == value:
+            return False
 
-    if any(grid[r][col] == value for r in range(9)):
-        return False
+    return True
+
+
+def _check_engine(engine: str) -> None:
+    """
+        Vérifie que le nom de moteur demandé fait partie de `ENGINES`.
+    """
+
+    if engine not in ENGINES:
+        raise ValueError(
+            f"Moteur inconnu : {engine!r} (choix possibles : {', '.join(ENGINES)})."
+        )
 
-    #
-    # Carré 3x3
-    #
-    start_row, start_col = 3 * (row // 3), 3 * (col // 3)
 
-    for r in range(start_row, start_row + 3):
-        for c in range(start_col, start_col + 3):
-            if grid[r][c] == value:
-                return False
+def _check_table(engine: str, table: TranspositionTable | None) -> None:
+    """
+        Vérifie que le moteur demandé accepte une table de transposition.
+    """
+
+    if table is not None and engine not in MEMO_ENGINES:
+        raise ValueError(
+            f"Le moteur {engine!r} n'accepte pas de table de transposition "
+            f"(moteurs possibles : {', '.join(MEMO_ENGINES)})."
+        )
+
+
+def solve(
+    grid: AnyGrid,
+    engine: str = DEFAULT_ENGINE,
+    heuristic: str = DEFAULT_HEURISTIC,
+    techniques: Counter | None = None,
+    stats: SearchStats | None = None,
+    table: TranspositionTable | None = None,
+) -> bool:
+    """
+        ========================================================
+          Résolution sur place avec le moteur choisi
+        ========================================================
+
+        - La grille (9x9 ou compacte) est complétée sur place si une
+          solution existe.
+        - Retourne False (grille inchangée) si la grille n'a pas de solution.
+        - `heuristic` ("first" ou "mrv") règle le choix de la case à
+          remplir pour les moteurs "bitmask" et "iterative".
+        - `techniques` reçoit le bilan par technique du moteur
+          "propagation" (voir `app.propagation.TECHNIQUES`).
+        - `stats` reçoit les statistiques de recherche (voir `app.stats`).
+        - `table` : table de transposition (voir `app.transposition`).
+    """
+
+    solution = next(
+        iter_cell_solutions(as_flat(grid), engine, heuristic, techniques, stats, table), None
+    )
+
+    if solution is None:
+        return False
+
+    if isinstance(grid, bytearray):
+        grid[:] = solution
+    else:
+        for row, values in zip(grid, to_rows(solution)):
+            row[:] = values
 
     return True
 
 
-def solve(grid: Grid) -> bool:
+def find_solutions(
+    grid: AnyGrid,
+    engine: str = DEFAULT_ENGINE,
+    heuristic: str = DEFAULT_HEURISTIC,
+    techniques: Counter | None = None,
+    stats: SearchStats | None = None,
+    table: TranspositionTable | None = None,
+) -> Iterator[AnyGrid]:
     """
         ========================================================
-          Algorithme de résolution (backtracking récursif)
+          Générateur : toutes les solutions avec le moteur choisi
         ========================================================
 
-        Étapes :
-            1) Chercher la prochaine case vide.
-            2) Si aucune case vide : la grille est résolue.
-            3) Essayer chaque valeur de 1 à 9 :
-                - si la valeur est valide, la placer et appeler solve() ;
-                - si l'appel récursif échoue, remettre 0 et tester la suivante.
+        Chaque solution est une grille indépendante, de même forme que la
+        grille reçue (9x9 ou compacte). Avec le moteur "backtracking" et une
+        grille 9x9, la grille est modifiée pendant le parcours puis
+        restaurée ; dans les autres cas elle n'est jamais modifiée.
     """
 
-    empty = _find_empty(grid)
+    _check_engine(engine)
+    _check_table(engine, table)
 
-    if not empty:
-        return True
+    if isinstance(grid, bytearray):
+        return iter_cell_solutions(grid, engine, heuristic, techniques, stats, table)
 
-    row, col = empty
+    if engine == "backtracking":
+        if stats is not None:
+            return _backtracking_find_solutions_traced(grid, stats, 0)
 
-    for value in range(1, 10):
-        if _is_valid(grid, row, col, value):
-            grid[row][col] = value
+        return _backtracking_find_solutions(grid)
 
-            if solve(grid):
-                return True
+    solutions = iter_cell_solutions(from_rows(grid), engine, heuristic, techniques, stats, table)
+    return (to_rows(cells) for cells in solutions)
 
-            grid[row][col] = 0
 
-    return False
+def iter_cell_solutions(
+    cells: Sequence[int],
+    engine: str = DEFAULT_ENGINE,
+    heuristic: str = DEFAULT_HEURISTIC,
+    techniques: Counter | None = None,
+    stats: SearchStats | None = None,
+    table: TranspositionTable | None = None,
+) -> Iterator[FlatGrid]:
+    """
+        ========================================================
+          Variante « à plat » de find_solutions
+        ========================================================
+
+        Entrée : les 81 valeurs de la grille en ordre de lecture (0 = vide),
+        de préférence sous forme compacte.
+        Sortie : chaque solution sous forme d'une nouvelle grille compacte.
+        C'est la forme utilisée par les traitements par lots, qui évitent
+        ainsi les conversions vers des grilles 9x9.
+    """
+
+    _check_engine(engine)
+    _check_table(engine, table)
+
+    if len(cells) != CELLS and engine not in SCALABLE_ENGINES:
+        geo = geometry_for_cells(len(cells))
+        raise ValueError(
+            f"Le moteur {engine!r} ne traite que les grilles 9x9 (grille {geo.size}x{geo.size} : "
+            f"moteurs possibles : {', '.join(SCALABLE_ENGINES)})."
+        )
+
+    if engine == "backtracking":
+        if stats is not None:
+            solutions = _backtracking_find_solutions_traced(to_rows(cells), stats, 0)
+        else:
+            solutions = _backtracking_find_solutions(to_rows(cells))
+
+        return (from_rows(solution) for solution in solutions)
+
+    if engine == "propagation":
+        return propagation.iter_solutions(cells, techniques, stats)
+
+    if engine == "dlx":
+        return dlx.iter_solutions(cells, stats)
+
+    if engine == "iterative":
+        return iterative.iter_solutions(cells, heuristic, stats)
+
+    return bitmask_solver.iter_solutions(cells, heuristic, stats, table)
+
+
+def count_solutions(
+    grid: AnyGrid,
+    limit: int | None = None,
+    engine: str = DEFAULT_ENGINE,
+    heuristic: str = DEFAULT_HEURISTIC,
+    table: TranspositionTable | None = None,
+) -> int:
+    """
+        ========================================================
+          Comptage des solutions, arrêté dès `limit` atteint
+        ========================================================
+
+        - Sans `limit`, toutes les solutions sont comptées (durée non bornée
+          sur une grille peu contrainte).
+        - Avec `limit`, la recherche est abandonnée dès la `limit`-ième
+          solution : un résultat égal à `limit` signifie « au moins autant ».
+        - Le moteur "dlx" compte sans construire les grilles solutions.
+        - Avec `table`, les sous-arbres déjà comptés (par une recherche
+          précédente) ne sont pas reparcourus.
+        - La grille reçue n'est pas modifiée.
+    """
+
+    _check_engine(engine)
+    _check_table(engine, table)
+
+    if limit is not None and limit < 1:
+        raise ValueError(f"La limite doit être positive (reçu {limit}).")
+
+    cells = bytearray(as_flat(grid))
+
+    if engine == "dlx":
+        return dlx.count_solutions(cells, limit)
+
+    if table is not None:
+        return bitmask_solver.count_solutions(cells, limit, heuristic, table)
+
+    solutions = iter_cell_solutions(cells, engine, heuristic)
+    return sum(1 for _ in itertools.islice(solutions, limit))
+
+
+def is_unique(
+    grid: AnyGrid,
+    engine: str = DEFAULT_ENGINE,
+    heuristic: str = DEFAULT_HEURISTIC,
+    table: TranspositionTable | None = None,
+) -> bool:
+    """
+        ========================================================
+          La grille a-t-elle exactement une solution ?
+        ========================================================
+
+        La recherche s'arrête à la deuxième solution trouvée.
+    """
+
+    return count_solutions(grid, 2, engine, heuristic, table) == 1
+
+
+def solve_with_stats(
+    grid: AnyGrid,
+    engine: str = DEFAULT_ENGINE,
+    heuristic: str = DEFAULT_HEURISTIC,
+    stats: SearchStats | None = None,
+) -> Tuple[FlatGrid | None, SearchStats]:
+    """
+        ========================================================
+          Première solution et statistiques de la recherche
+        ========================================================
+
+        La grille reçue n'est pas modifiée. Retourne (solution compacte ou
+        None, statistiques) ; `elapsed` donne la durée totale, instrumentation
+        comprise.
+    """
+
+    if stats is None:
+        stats = SearchStats()
+
+    start = time.perf_counter()
+    solution = next(iter_cell_solutions(bytearray(as_flat(grid)), engine, heuristic, stats=stats), None)
+    stats.elapsed += time.perf_counter() - start
+
+    return solution, stats
+
+
+class SearchResult(NamedTuple):
+    """
+        Résultat de `search_with_budget` : solutions trouvées, statistiques
+        et raison de l'interruption (None si la recherche est allée au bout).
+    """
+
+    solutions: List[FlatGrid]
+    stats: SearchStats
+    aborted: str | None
+
+
+def search_with_budget(
+    grid: AnyGrid,
+    engine: str = DEFAULT_ENGINE,
+    heuristic: str = DEFAULT_HEURISTIC,
+    limit: int | None = 1,
+    max_nodes: int | None = None,
+    max_time: float | None = None,
+    cancel: CancelToken | None = None,
+    stats: SearchStats | None = None,
+    table: TranspositionTable | None = None,
+) -> SearchResult:
+    """
+        ========================================================
+          Recherche bornée : nœuds, durée, annulation
+        ========================================================
+
+        - Cherche au plus `limit` solutions (None : toutes, comme
+          `find_solutions`).
+        - S'arrête dès qu'une limite de `Budget` est atteinte ; `aborted`
+          vaut alors "nodes", "time" ou "cancelled" et `solutions` contient
+          celles déjà trouvées.
+        - La recherche est instrumentée (voir `app.stats`) : c'est elle qui
+          vérifie le budget, tous les `Budget.check_every` nœuds.
+        - `table` : table de transposition (voir `app.transposition`) ; un
+          sous-arbre interrompu n'y est pas enregistré.
+        - La grille reçue n'est pas modifiée.
+    """
+
+    if limit is not None and limit < 1:
+        raise ValueError(f"La limite doit être positive (reçu {limit}).")
+
+    budget = Budget(max_nodes, max_time, cancel)
 
+    if stats is None:
+        stats = SearchStats()
+
+    previous, stats.budget = stats.budget, budget
+    found: List[FlatGrid] = []
+    aborted = None
+    start = time.perf_counter()
+    budget.start(stats.nodes)
 
-def find_solutions(grid: Grid):
+    try:
+        solutions = iter_cell_solutions(
+            bytearray(as_flat(grid)), engine, heuristic, stats=stats, table=table
+        )
+        for solution in itertools.islice(solutions, limit):
+            found.append(solution)
+    except SearchAborted as exc:
+        aborted = exc.reason
+    finally:
+        stats.budget = previous
+        stats.elapsed += time.perf_counter() - start
+
+    return SearchResult(found, stats, aborted)
+
+
+def _backtracking_find_solutions(grid: Grid) -> Iterator[Grid]:
     """
         ========================================================
           Générateur : parcours de TOUTES les solutions possibles
@@ -203,57 +580,121 @@ def find_solutions(grid: Grid):
         if _is_valid(grid, row, col, value):
             grid[row][col] = value
 
-            yield from find_solutions(grid)
+            yield from _backtracking_find_solutions(grid)
 
             grid[row][col] = 0
 
 
-def format_grid(grid: Grid) -> str:
+def _backtracking_find_solutions_traced(
+    grid: Grid, stats: SearchStats, depth: int
+) -> Iterator[Grid]:
+    """
+        ========================================================
+          Variante instrumentée de `_backtracking_find_solutions`
+        ========================================================
+
+        Le temps de `_find_empty` compte comme « sélection », celui de
+        `_is_valid` comme « vérification ».
+    """
+
+    clock = time.perf_counter
+    stats.enter(depth)
+
+    start = clock()
+    empty = _find_empty(grid)
+    stats.select_time += clock() - start
+
+    if not empty:
+        yield [row[:] for row in grid]
+        return
+
+    row, col = empty
+    tried = 0
+
+    for value in range(1, 10):
+        start = clock()
+        valid = _is_valid(grid, row, col, value)
+        stats.check_time += clock() - start
+
+        if valid:
+            tried += 1
+            stats.branching[depth] += 1
+            grid[row][col] = value
+
+            yield from _backtracking_find_solutions_traced(grid, stats, depth + 1)
+
+            grid[row][col] = 0
+
+    if not tried:
+        stats.backtracks += 1
+
+
+def format_grid(grid: AnyGrid, alphabet: str = DIGITS) -> str:
     """
         ========================================================
           Mise en forme « lisible » de la grille pour affichage
         ========================================================
+
+        Accepte une grille 9x9 ou une grille compacte, quelle que soit sa
+        taille ; les valeurs sont écrites avec les symboles d'`alphabet`.
     """
 
+    if isinstance(grid, bytearray):
+        grid = to_rows(grid)
+
+    box = geometry_for_cells(len(grid) ** 2).box
+    chars = "." + symbols(len(grid), alphabet)
+    separator = "-+-".join(["-" * (2 * box - 1)] * box)
+
     lines = []
 
     for r, row in enumerate(grid):
-        if r % 3 == 0 and r != 0:
-            lines.append("------+-------+------")
+        if r % box == 0 and r != 0:
+            lines.append(separator)
 
         chunks = []
 
         for c, value in enumerate(row):
-            if c % 3 == 0 and c != 0:
+            if c % box == 0 and c != 0:
                 chunks.append("|")
 
-            chunks.append(str(value) if value else ".")
+            chunks.append(chars[value])
 
         lines.append(" ".join(chunks))
 
     return "\n".join(lines)
 
 
-def read_from_file(path: str) -> Grid:
+def read_from_file(
+    path: str, compact: bool = False, box: int = 3, alphabet: str = DIGITS
+) -> AnyGrid:
     """
         ========================================================
           Lecture d'une grille depuis un fichier texte
         ========================================================
+
+        `compact=True` renvoie une grille compacte au lieu d'une grille 9x9.
+        `box` et `alphabet` : voir `parse_grid`.
     """
 
     with open(path, "r", encoding="utf-8") as handler:
-        return _clean_values(handler.readlines())
+        cells = parse_grid(handler.readlines(), box, alphabet)
 
+    return cells if compact else to_rows(cells)
 
-def read_from_stdin() -> Grid:
+
+def read_from_stdin(box: int = 3, alphabet: str = DIGITS) -> Grid:
     """
         ========================================================
           Lecture interactive depuis l'entrée standard
         ========================================================
     """
 
+    size = geometry(box).size
+
     print(
-        "Saisissez la grille (au moins 9 lignes). Tapez simplement Entrée après la 9e ligne pour terminer."
+        f"Saisissez la grille (au moins {size} lignes). "
+        f"Tapez simplement Entrée après la {size}e ligne pour terminer."
     )
 
     lines = []
@@ -264,12 +705,141 @@ def read_from_stdin() -> Grid:
         except EOFError:
             break
 
-        if not line.strip() and len(lines) >= 9:
+        if not line.strip() and len(lines) >= size:
             break
 
         lines.append(line)
 
-    return _clean_values(lines)
+    return _clean_values(lines, box, alphabet)
+
+
+def iter_records(
+    lines: Iterable[str],
+    engine: str = DEFAULT_ENGINE,
+    heuristic: str = DEFAULT_HEURISTIC,
+    limit: int | None = None,
+    max_nodes: int | None = None,
+    max_time: float | None = None,
+    box: int = 3,
+    alphabet: str = DIGITS,
+) -> Iterator[Dict]:
+    """
+        ========================================================
+          Une grille par ligne -> un enregistrement par grille
+        ========================================================
+
+        Les lignes vides et les commentaires ("#") sont ignorés. Chaque
+        enregistrement contient :
+            - input     : la grille, en ligne compacte ("." pour une case vide) ;
+            - status    : "solved", "unsolved", "invalid" (ligne illisible,
+              voir `error`), "budget" ou "timeout" (recherche interrompue
+              sans solution, voir `app.budget`) ;
+            - solution  : la première solution, en ligne compacte, ou None ;
+            - solutions : le nombre de solutions trouvées (au plus `limit`) ;
+            - elapsed   : la durée de la recherche, en secondes ;
+            - nodes     : le nombre de nœuds développés ;
+            - aborted   : la raison de l'interruption, ou None.
+
+        La recherche est instrumentée (voir `app.stats`) pour compter les
+        nœuds : `elapsed` inclut ce surcoût.
+    """
+
+    budgeted = max_nodes is not None or max_time is not None
+    clock = time.perf_counter
+
+    for line in lines:
+        text = line.strip()
+
+        if not text or text.startswith("#"):
+            continue
+
+        try:
+            cells = parse_grid([text], box, alphabet)
+        except ValueError as exc:
+            yield {
+                "input": text,
+                "status": "invalid",
+                "solution": None,
+                "solutions": 0,
+                "elapsed": 0.0,
+                "nodes": 0,
+                "aborted": None,
+                "error": str(exc),
+            }
+            continue
+
+        stats = SearchStats(budget=Budget(max_nodes, max_time).start() if budgeted else None)
+        first = None
+        count = 0
+        aborted = None
+        start = clock()
+
+        try:
+            for solution in itertools.islice(iter_cell_solutions(cells, engine, heuristic, stats=stats), limit):
+                if first is None:
+                    first = solution
+
+                count += 1
+
+        except SearchAborted as exc:
+            aborted = exc.reason
+
+        elapsed = clock() - start
+
+        if count:
+            status = "solved"
+        elif aborted is not None:
+            status = ABORT_STATUSES[aborted]
+        else:
+            status = "unsolved"
+
+        yield {
+            "input": format_compact(cells, alphabet),
+            "status": status,
+            "solution": None if first is None else format_compact(first, alphabet),
+            "solutions": count,
+            "elapsed": elapsed,
+            "nodes": stats.nodes,
+            "aborted": aborted,
+        }
+
+
+def write_records(
+    records: Iterable[Dict], target: IO[str], chunk_size: int = JSONL_CHUNK_SIZE
+) -> int:
+    """
+        ========================================================
+          Écriture JSON Lines, par blocs
+        ========================================================
+
+        Une ligne JSON (compacte) par enregistrement. Les lignes sont
+        écrites par blocs de `chunk_size`, en un seul appel à `write` et
+        sans `flush` : le coût d'écriture ne dépend presque plus du nombre
+        de lignes. Retourne le nombre d'enregistrements écrits.
+    """
+
+    if chunk_size < 1:
+        raise ValueError(f"La taille de bloc doit être positive (reçu {chunk_size}).")
+
+    import json
+
+    encode = json.JSONEncoder(ensure_ascii=False, separators=(",", ":")).encode
+    buffer: List[str] = []
+    written = 0
+
+    for record in records:
+        buffer.append(encode(record))
+
+        if len(buffer) == chunk_size:
+            target.write("\n".join(buffer) + "\n")
+            written += len(buffer)
+            buffer.clear()
+
+    if buffer:
+        target.write("\n".join(buffer) + "\n")
+        written += len(buffer)
+
+    return written
 
 
 def main(argv: list[str] | None = None) -> int:
@@ -279,22 +849,57 @@ def main(argv: list[str] | None = None) -> int:
         ========================================================
 
         Usage :
-            python -m app.sudoku_solver [chemin_du_fichier]
+            python -m app.sudoku_solver [--engine MOTEUR] [--stats]
+                [--limit N | --unique] [--box N] [--letters]
+                [--max-nodes N] [--max-time S] [--format FORMAT]
+                [-o FICHIER] [chemin_du_fichier]
 
         - Si le chemin est fourni, on lit la grille depuis ce fichier.
+        - `--engine` choisit le moteur de résolution (défaut : "bitmask") ;
+          "backtracking" reste disponible pour comparaison.
+        - `--box N` lit une grille N²xN² (4 pour 16x16, 5 pour 25x25) ; le
+          moteur par défaut est alors "dlx". `--letters` note toutes les
+          valeurs par des lettres (A-P pour une grille 16x16).
+        - `--heuristic` choisit l'ordre des cases pour les moteurs "bitmask"
+          et "iterative" :
+          "mrv" (case la plus contrainte d'abord, défaut) ou "first".
+        - Avec le moteur "propagation", le résumé indique ce que chaque
+          technique de raisonnement a apporté.
+        - `--stats` ajoute au résumé les statistiques de la recherche
+          (nœuds, impasses, profondeur, temps de vérification et de
+          sélection) ; les temps mesurés incluent alors ce surcoût.
+        - `--limit N` arrête la recherche après N solutions ; `--unique`
+          (limite de 2) vérifie en temps borné que la grille a une solution
+          unique : code de retour 0 si c'est le cas, 3 si elle en a
+          plusieurs.
+        - `--max-nodes N` / `--max-time S` bornent la recherche (voir
+          `app.budget`) ; si elle est interrompue, les solutions déjà
+          trouvées sont affichées et le code de retour vaut 4.
+        - `--format jsonl` lit une grille par ligne (fichier, ou entrée
+          standard sans chemin) et écrit un objet JSON par grille (voir
+          `iter_records`), sur la sortie standard ou dans le fichier `-o`.
+          Le format "text" (affichage des grilles et résumé) reste le
+          format par défaut.
         - Sinon, on bascule en saisie interactive.
+        - Sans autre option que `--format`, la CLI démarre sans `argparse`
+          (voir `_fast_args`) ; les imports coûteux (`argparse`, `json`) ne sont
+          faits que par les fonctionnalités qui en ont besoin.
         - Les messages d'erreur sont renvoyés sur stderr pour faciliter l'usage
           en ligne de commande (redirections, etc.).
     """
 
-    parser = argparse.ArgumentParser(description="Résout une grille de Sudoku")
+    if argv is None:
+        argv = sys.argv[1:]
 
-    parser.add_argument(
-        "path",
-        nargs="?",
-        help="Chemin du fichier contenant la grille. Si absent, saisie manuelle.",
-    )
-    args = parser.parse_args(argv)
+    args = _fast_args(argv)
+
+    if args is None:
+        args = _parse_args(argv)
+
+    if args.format == "jsonl":
+        return _main_jsonl(args)
+
+    engine, limit, alphabet, budget = args.engine, args.limit, args.alphabet, args.budget
 
     #
     # Choix du mode d'entrée :
@@ -312,18 +917,24 @@ def main(argv: list[str] | None = None) -> int:
             input_path = DEFAULT_FILE_NAME
         elif user_choice.lower() == "s":
             input_path = None
-            print("Mode saisie manuelle. Appuyez sur Entrée après la 9e ligne pour terminer.")
+            print(
+                f"Mode saisie manuelle. Appuyez sur Entrée après la "
+                f"{geometry(args.box).size}e ligne pour terminer."
+            )
         else:
             input_path = user_choice
 
     try:
-        grid = read_from_file(input_path) if input_path is not None else read_from_stdin()
+        if input_path is not None:
+            grid = read_from_file(input_path, box=args.box, alphabet=alphabet)
+        else:
+            grid = read_from_stdin(args.box, alphabet)
     except Exception as exc:  # pragma: no cover - CLI UX
         print(f"Erreur de lecture de la grille: {exc}", file=sys.stderr)
         return 1
 
     print("\nGrille initiale:\n")
-    print(format_grid(grid))
+    print(format_grid(grid, alphabet))
 
     #
     # Recherche de TOUTES les solutions, avec affichage immédiat de la première
@@ -337,22 +948,50 @@ def main(argv: list[str] | None = None) -> int:
 
     # Copie défensive pour ne pas altérer la grille affichée
     working_grid = [row[:] for row in grid]
+    techniques: Counter = Counter()
+    stats = SearchStats() if args.stats or budget is not None else None
+    aborted = None
+
+    if budget is not None:
+        stats.budget = budget.start()
+
+    solutions = find_solutions(
+        working_grid,
+        engine=engine,
+        heuristic=args.heuristic,
+        techniques=techniques,
+        stats=stats,
+    )
 
-    for solution in find_solutions(working_grid):
-        solutions_count += 1
+    try:
+        for solution in itertools.islice(solutions, limit):
+            solutions_count += 1
 
-        if solutions_count == 1:
-            first_solution_time = time.perf_counter() - start
+            if solutions_count == 1:
+                first_solution_time = time.perf_counter() - start
 
-            print("\nPremière solution trouvée ({} seconde(s)):\n".format(round(first_solution_time, 6)))
-            print(format_grid(solution))
+                print("\nPremière solution trouvée ({} seconde(s)):\n".format(round(first_solution_time, 6)))
+                print(format_grid(solution, alphabet))
 
-        else:
-            # Les autres solutions seront affichées après la boucle
-            extra_solutions.append(solution)
+            else:
+                # Les autres solutions seront affichées après la boucle
+                extra_solutions.append(solution)
+
+    except SearchAborted as exc:
+        aborted = exc.reason
 
     total_time = time.perf_counter() - start
 
+    if aborted is not None:
+        print(
+            f"Recherche interrompue ({aborted}) après {stats.nodes} nœud(s) "
+            f"et {round(total_time, 6)} seconde(s).",
+            file=sys.stderr,
+        )
+
+        if solutions_count == 0:
+            return 4
+
     if solutions_count == 0:
         print("Aucune solution trouvée", file=sys.stderr)
         return 2
@@ -362,7 +1001,7 @@ def main(argv: list[str] | None = None) -> int:
     #
     for index, solution in enumerate(extra_solutions, start=2):
         print("\nSolution supplémentaire #{} :\n".format(index))
-        print(format_grid(solution))
+        print(format_grid(solution, alphabet))
 
     print(
         "\nRésumé : {} solution(s) trouvée(s) en {} seconde(s).".format(
@@ -371,6 +1010,220 @@ def main(argv: list[str] | None = None) -> int:
         )
     )
 
+    if limit is not None and solutions_count == limit:
+        print(f"Recherche arrêtée à la limite : au moins {limit} solution(s).")
+
+    if engine == "propagation":
+        print("\nBilan de la propagation :")
+
+        for technique in propagation.TECHNIQUES:
+            print(f"  - {technique} : {techniques[technique]}")
+
+    if args.stats:
+        stats.elapsed = total_time
+        print("\nStatistiques de la recherche :")
+        print(stats.format())
+
+    if aborted is not None:
+        return 4
+
+    if args.unique:
+        if solutions_count > 1:
+            print("\nLa grille n'a pas de solution unique.")
+            return 3
+
+        print("\nLa grille a une solution unique.")
+
+    return 0
+
+
+def _fast_args(argv: Sequence[str]) -> types.SimpleNamespace | None:
+    """
+        ========================================================
+          Chemin rapide de la CLI : appels sans option
+        ========================================================
+
+        `python -m app.sudoku_solver [--format FORMAT] [FICHIER]`, la forme
+        employée par les scripts, n'a besoin d'aucune analyse : les autres
+        options prennent leur valeur par défaut, sans importer ni construire
+        le parseur `argparse`, dont le coût domine le démarrage quand le
+        solveur est lancé des milliers de fois. Retourne None pour toute
+        autre forme (voir `_parse_args`).
+    """
+
+    output_format = DEFAULT_FORMAT
+
+    if len(argv) >= 2 and argv[0] == "--format" and argv[1] in FORMATS:
+        output_format = argv[1]
+        argv = argv[2:]
+
+    if len(argv) > 1 or (argv and argv[0].startswith("-")):
+        return None
+
+    return types.SimpleNamespace(
+        path=argv[0] if argv else None,
+        engine=DEFAULT_ENGINE,
+        heuristic=DEFAULT_HEURISTIC,
+        stats=False,
+        limit=None,
+        unique=False,
+        box=3,
+        alphabet=DIGITS,
+        max_nodes=None,
+        max_time=None,
+        budget=None,
+        format=output_format,
+        output=None,
+    )
+
+
+def _parse_args(argv: Sequence[str]):
+    """
+        Analyse complète des options de `main` (`argparse`, importé ici
+        seulement) ; complète l'espace de noms avec le moteur, la limite,
+        l'alphabet et le budget effectifs.
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Résout une grille de Sudoku")
+
+    parser.add_argument(
+        "path",
+        nargs="?",
+        help="Chemin du fichier contenant la grille. Si absent, saisie manuelle.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=ENGINES,
+        help=(
+            f"Moteur de résolution (défaut : {DEFAULT_ENGINE} ; "
+            f"{DEFAULT_SCALABLE_ENGINE} pour les grilles autres que 9x9)."
+        ),
+    )
+    parser.add_argument(
+        "--heuristic",
+        choices=HEURISTICS,
+        default=DEFAULT_HEURISTIC,
+        help=f"Choix de la case à remplir, moteurs bitmask et iterative (défaut : {DEFAULT_HEURISTIC}).",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Affiche les statistiques de la recherche (ralentit la résolution).",
+    )
+    limits = parser.add_mutually_exclusive_group()
+    limits.add_argument(
+        "--limit",
+        type=int,
+        metavar="N",
+        help="Arrête la recherche après N solutions (défaut : toutes).",
+    )
+    limits.add_argument(
+        "--unique",
+        action="store_true",
+        help="Vérifie seulement l'unicité de la solution (arrêt à la 2e solution).",
+    )
+    parser.add_argument(
+        "--box",
+        type=int,
+        default=3,
+        help="Taille des blocs : 3 pour 9x9 (défaut), 4 pour 16x16, 5 pour 25x25.",
+    )
+    parser.add_argument(
+        "--letters",
+        action="store_true",
+        help="Valeurs notées A, B, C... au lieu de 1-9 puis A, B...",
+    )
+    parser.add_argument("--max-nodes", type=int, metavar="N", help="Nombre maximal de nœuds développés.")
+    parser.add_argument("--max-time", type=float, metavar="S", help="Durée maximale de la recherche, en secondes.")
+    parser.add_argument(
+        "--format",
+        choices=FORMATS,
+        default=DEFAULT_FORMAT,
+        help=(
+            f"Format de sortie (défaut : {DEFAULT_FORMAT}) ; jsonl : une grille par ligne en "
+            "entrée, un objet JSON par grille en sortie."
+        ),
+    )
+    parser.add_argument("-o", "--output", help="Fichier de sortie JSON Lines (défaut : sortie standard).")
+    args = parser.parse_args(argv)
+
+    if args.output is not None and args.format != "jsonl":
+        parser.error("-o n'est disponible qu'avec --format jsonl")
+
+    if args.box < 2 or args.box > 5:
+        parser.error(f"taille de blocs non prise en charge : {args.box} (2 à 5)")
+
+    alphabet = LETTERS if args.letters else DIGITS
+    engine = args.engine
+
+    if engine is None:
+        engine = DEFAULT_ENGINE if args.box == 3 else DEFAULT_SCALABLE_ENGINE
+    elif args.box != 3 and engine not in SCALABLE_ENGINES:
+        parser.error(
+            f"le moteur {engine} ne traite que les grilles 9x9 "
+            f"(possibles : {', '.join(SCALABLE_ENGINES)})"
+        )
+
+    limit = 2 if args.unique else args.limit
+
+    if limit is not None and limit < 1:
+        parser.error(f"la limite doit être positive (reçu {limit})")
+
+    budget = None
+
+    if args.max_nodes is not None or args.max_time is not None:
+        try:
+            budget = Budget(args.max_nodes, args.max_time)
+        except ValueError as exc:
+            parser.error(str(exc))
+
+    args.engine, args.limit, args.alphabet, args.budget = engine, limit, alphabet, budget
+    return args
+
+
+def _main_jsonl(args) -> int:
+    """
+        Mode `--format jsonl` de `main` : flux de grilles -> flux JSON Lines.
+    """
+
+    try:
+        source = sys.stdin if args.path is None else open(args.path, "r", encoding="utf-8")
+    except OSError as exc:  # pragma: no cover - CLI UX
+        print(f"Erreur de lecture de la grille: {exc}", file=sys.stderr)
+        return 1
+
+    try:
+        target = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+    except OSError as exc:  # pragma: no cover - CLI UX
+        print(f"Erreur d'accès au fichier: {exc}", file=sys.stderr)
+
+        if source is not sys.stdin:
+            source.close()
+
+        return 1
+
+    try:
+        records = iter_records(
+            source,
+            args.engine,
+            args.heuristic,
+            args.limit,
+            args.max_nodes,
+            args.max_time,
+            args.box,
+            args.alphabet,
+        )
+        write_records(records, target)
+
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+        if target is not sys.stdout:
+            target.close()
+
     return 0
 
 
@@ -0,0 +1,184 @@
+"""Tables de correspondance précalculées, partagées par tous les solveurs.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Toutes les tables sont calculées une seule fois, à l'import du module,
+    et sont immuables (tuples). Les boucles de recherche n'ont ainsi plus
+    aucune division, aucun modulo ni aucun découpage de liste à faire.
+
+    Index des cases
+    ---------------
+    Une case est repérée par son index dans la grille à plat :
+    index = 9 * ligne + colonne (0 à 80).
+        - ROW_OF, COL_OF, BOX_OF : ligne, colonne et bloc de chaque case ;
+        - COORDS                 : couple (ligne, colonne) de chaque case ;
+        - UNITS_OF               : identifiants des 3 unités de chaque case
+          (0-8 lignes, 9-17 colonnes, 18-26 blocs) ;
+        - ROWS, COLS, BOXES      : les cases de chaque ligne, colonne, bloc ;
+        - UNITS                  : les 27 unités, dans l'ordre des identifiants ;
+        - PEERS                  : les 20 voisins de chaque case ;
+        - PEER_COORDS            : les mêmes voisins, en coordonnées (ligne,
+          colonne), pour les grilles 9x9.
+
+    Autres tailles de grille
+    ------------------------
+    Les constantes ci-dessus décrivent la grille 9x9 (blocs de 3x3). Pour
+    une grille N²xN² (16x16 avec des blocs de 4x4, 25x25 avec des blocs de
+    5x5...), `geometry(N)` construit les mêmes tables, regroupées dans un
+    objet `Geometry` (attributs en minuscules : `row_of`, `peers`...). Les
+    géométries sont construites à la demande et mémorisées ;
+    `geometry_for_cells` retrouve la géométrie d'après le nombre de cases.
+
+    Masques de bits
+    ---------------
+    La valeur v (1 à 9) est représentée par le bit v - 1.
+        - FULL_MASK    : les 9 valeurs ;
+        - POPCOUNT     : nombre de bits levés de chacun des 512 masques ;
+        - VALUE_OF_BIT : masque à un seul bit -> valeur.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from math import isqrt
+from typing import Tuple
+
+
+class Geometry:
+    """
+        ========================================================
+          Tables d'index d'une grille N²xN² (N = `box`)
+        ========================================================
+
+        - `size`  : nombre de lignes (et de valeurs possibles), N² ;
+        - `cells` : nombre de cases, N⁴ ;
+        - les autres attributs sont les tables décrites en tête de module.
+
+        Les voisins sont calculés unité par unité (et non en comparant
+        toutes les paires de cases), ce qui reste rapide pour 625 cases.
+    """
+
+    __slots__ = (
+        "box",
+        "size",
+        "cells",
+        "row_of",
+        "col_of",
+        "box_of",
+        "coords",
+        "units_of",
+        "rows",
+        "cols",
+        "boxes",
+        "lines",
+        "units",
+        "peers",
+        "peer_coords",
+        "full_mask",
+        "value_of_bit",
+    )
+
+    def __init__(self, box: int):
+        if box < 2:
+            raise ValueError(f"La taille des blocs doit être au moins 2 (reçu {box}).")
+
+        size = box * box
+        cells = size * size
+
+        self.box = box
+        self.size = size
+        self.cells = cells
+
+        self.row_of = tuple(index // size for index in range(cells))
+        self.col_of = tuple(index % size for index in range(cells))
+        self.box_of = tuple(
+            (index // (size * box)) * box + (index % size) // box for index in range(cells)
+        )
+        self.coords = tuple(zip(self.row_of, self.col_of))
+        self.units_of = tuple(
+            (self.row_of[index], size + self.col_of[index], 2 * size + self.box_of[index])
+            for index in range(cells)
+        )
+
+        self.rows = _group(self.row_of, size)
+        self.cols = _group(self.col_of, size)
+        self.boxes = _group(self.box_of, size)
+        self.lines = self.rows + self.cols
+        self.units = self.lines + self.boxes
+
+        self.peers = tuple(
+            tuple(
+                sorted(
+                    {other for unit in self.units_of[index] for other in self.units[unit]} - {index}
+                )
+            )
+            for index in range(cells)
+        )
+        self.peer_coords = tuple(tuple(self.coords[peer] for peer in peers) for peers in self.peers)
+
+        self.full_mask = (1 << size) - 1
+        self.value_of_bit = {1 << (value - 1): value for value in range(1, size + 1)}
+
+
+def _group(key_of: Tuple[int, ...], count: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+        Les cases regroupées par valeur de `key_of` (ligne, colonne ou bloc).
+    """
+
+    groups: list = [[] for _ in range(count)]
+
+    for index, key in enumerate(key_of):
+        groups[key].append(index)
+
+    return tuple(tuple(group) for group in groups)
+
+
+@lru_cache(maxsize=None)
+def geometry(box: int = 3) -> Geometry:
+    """
+        Géométrie de la grille à blocs de `box` x `box` (mémorisée).
+    """
+
+    return Geometry(box)
+
+
+def geometry_for_cells(count: int) -> Geometry:
+    """
+        Géométrie d'une grille de `count` cases (81, 256, 625...).
+    """
+
+    box = isqrt(isqrt(count))
+
+    if box < 2 or box ** 4 != count:
+        raise ValueError(
+            f"La grille doit contenir N⁴ cases, par exemple 81, 256 ou 625 (reçu {count})."
+        )
+
+    return geometry(box)
+
+
+SUDOKU = geometry(3)
+
+SIZE = SUDOKU.size
+CELLS = SUDOKU.cells
+
+ROW_OF = SUDOKU.row_of
+COL_OF = SUDOKU.col_of
+BOX_OF = SUDOKU.box_of
+COORDS = SUDOKU.coords
+UNITS_OF = SUDOKU.units_of
+
+ROWS = SUDOKU.rows
+COLS = SUDOKU.cols
+BOXES = SUDOKU.boxes
+LINES = SUDOKU.lines
+UNITS = SUDOKU.units
+
+PEERS = SUDOKU.peers
+PEER_COORDS = SUDOKU.peer_coords
+
+FULL_MASK = SUDOKU.full_mask
+POPCOUNT = tuple(bin(mask).count("1") for mask in range(FULL_MASK + 1))
+VALUE_OF_BIT = SUDOKU.value_of_bit
@@ -0,0 +1,223 @@
+"""Table de transposition : mémoïsation des états partiels de recherche.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Principe
+    --------
+    Le nombre de solutions d'une grille partiellement remplie ne dépend que
+    de son contenu, pas du chemin (ni de l'heuristique) qui y a mené. Une
+    `TranspositionTable` associe donc à un état déjà exploré en entier le
+    nombre de solutions trouvées en dessous (0 : impasse). Quand la
+    recherche retombe sur cet état :
+        - une impasse connue est abandonnée immédiatement ;
+        - un comptage (`count_solutions`) reprend directement le nombre
+          mémorisé, sans redescendre.
+
+    Un état n'est enregistré que si son sous-arbre a été parcouru en
+    entier : une recherche arrêtée en route (première solution trouvée,
+    limite de comptage atteinte, budget épuisé) n'enregistre rien de faux.
+
+    Clé de Zobrist
+    --------------
+    Chaque couple (case, valeur) reçoit une clé pseudo-aléatoire de 64 bits
+    (`ZOBRIST`, tirée une fois pour toutes par SplitMix64 avec une graine
+    fixe, sans importer `random`, coûteux au démarrage) ; la clé
+    d'une grille est le OU exclusif des clés de ses cases remplies
+    (`zobrist_key`). Placer ou retirer une valeur revient à un seul OU
+    exclusif : la clé est tenue à jour de façon incrémentale par les
+    moteurs, sans relire la grille. Deux grilles distinctes de même clé
+    sont possibles en théorie, mais avec une probabilité négligeable
+    (de l'ordre de n² / 2⁶⁵ pour n états enregistrés).
+
+    Quand la table est-elle utile ?
+    -------------------------------
+    À l'intérieur d'une seule recherche, deux branches d'un même nœud
+    diffèrent par la valeur de la case choisie : aucun état ne peut être
+    atteint deux fois. La table sert donc entre recherches successives sur
+    des grilles qui se recouvrent : grilles en double dans un corpus,
+    comptage des solutions (`is_unique`) après une résolution, grille
+    obtenue d'une autre par ajout d'indices... Elle ne sert pas aux
+    vérifications d'unicité du générateur (`app.generator`) : chacune fixe
+    la case retirée à une valeur contraire aux indices des vérifications
+    précédentes, si bien qu'aucun état ne peut se répéter.
+
+    La table peut être partagée par tout le processus (`shared_table`) ;
+    `hits` / `misses` disent si elle est rentable sur un corpus donné.
+
+    Mémoire
+    -------
+    La table est un cache LRU borné à `maxsize` états (comme
+    `app.canonical.SolutionCache`) : au-delà, les états les moins récemment
+    utilisés sont évincés. Compter environ 100 octets par état.
+"""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from typing import Dict, Iterator, Sequence, Tuple
+
+from .tables import CELLS
+
+
+DEFAULT_TABLE_SIZE = 1_000_000
+ZOBRIST_SEED = 0x5D0C0
+
+_MASK64 = (1 << 64) - 1
+
+
+def _splitmix64(seed: int) -> Iterator[int]:
+    """
+        Suite pseudo-aléatoire de 64 bits (SplitMix64), déterministe.
+    """
+
+    state = seed
+
+    while True:
+        state = (state + 0x9E3779B97F4A7C15) & _MASK64
+        value = state
+        value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+        value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+        yield value ^ (value >> 31)
+
+
+#
+# ZOBRIST[case][valeur] : clé pseudo-aléatoire de 64 bits (0 pour une case vide)
+#
+_keys = _splitmix64(ZOBRIST_SEED)
+ZOBRIST: Tuple[Tuple[int, ...], ...] = tuple(
+    (0,) + tuple(next(_keys) for _ in range(9)) for _ in range(CELLS)
+)
+del _keys
+
+_shared: "TranspositionTable | None" = None
+
+
+def zobrist_key(cells: Sequence[int]) -> int:
+    """
+        Clé de Zobrist d'une grille à plat (81 valeurs, 0 = vide).
+    """
+
+    key = 0
+
+    for index, value in enumerate(cells):
+        key ^= ZOBRIST[index][value]
+
+    return key
+
+
+class TranspositionTable:
+    """
+        ========================================================
+          Cache LRU : clé de Zobrist -> nombre de solutions
+        ========================================================
+
+        - `probe` rend le nombre de solutions mémorisé (None si l'état est
+          inconnu) ; `store` enregistre un état exploré en entier.
+        - `hits`, `misses`, `stores` et `evictions` permettent de juger de
+          l'intérêt de la table.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_TABLE_SIZE):
+        if maxsize < 1:
+            raise ValueError(f"La taille de la table doit être positive (reçu {maxsize}).")
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[int, int]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def probe(self, key: int) -> int | None:
+        """
+            Nombre de solutions sous l'état de clé `key`, ou None.
+        """
+
+        count = self._entries.get(key)
+
+        if count is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return count
+
+    def store(self, key: int, count: int) -> None:
+        """
+            Enregistre le nombre de solutions d'un état exploré en entier.
+        """
+
+        entries = self._entries
+        entries[key] = count
+        entries.move_to_end(key)
+        self.stores += 1
+
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """
+            Vide la table et remet les compteurs à zéro.
+        """
+
+        self._entries.clear()
+        self.hits = self.misses = self.stores = self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+            Part des consultations fructueuses (0.0 sans consultation).
+        """
+
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+    def as_dict(self) -> Dict:
+        """
+            Forme sérialisable en JSON.
+        """
+
+        return {
+            "size": len(self),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+    def format(self) -> str:
+        """
+            Bilan sur une ligne.
+        """
+
+        return (
+            f"Table de transposition : {self.hits} succès, {self.misses} échec(s) "
+            f"({100 * self.hit_rate:.1f} %), {len(self)} état(s), {self.evictions} éviction(s)."
+        )
+
+
+def shared_table(maxsize: int | None = None) -> TranspositionTable:
+    """
+        ========================================================
+          Table partagée par tout le processus
+        ========================================================
+
+        Créée au premier appel (`maxsize` : taille, défaut
+        `DEFAULT_TABLE_SIZE`) ; les appels suivants rendent la même table.
+        Dans un pool de processus, chaque processus a la sienne.
+    """
+
+    global _shared
+
+    if _shared is None:
+        _shared = TranspositionTable(maxsize or DEFAULT_TABLE_SIZE)
+
+    return _shared
@@ -0,0 +1,366 @@
+"""Vérification et calcul des candidats par lots, vectorisés avec NumPy.
+
+    ========================================================
+      Présentation générale
+    ========================================================
+
+    Principe
+    --------
+    Un lot de N grilles 9x9 est un tableau NumPy (N, 81) d'entiers non
+    signés (`uint8`), une grille par ligne en ordre de lecture, 0 pour une
+    case vide. Toutes les opérations portent sur le lot entier, sans boucle
+    Python par grille :
+        - `clue_counts`  : nombre d'indices de chaque grille ;
+        - `unit_masks`   : masque des valeurs présentes dans chacune des 27
+          unités (lignes, colonnes, blocs), comme dans `app.bitmask_solver` ;
+        - `consistent`   : aucune valeur en double dans une unité ;
+        - `is_solved`    : grille complète et correcte ;
+        - `candidates`   : masque des candidats de chaque case (le bit de sa
+          valeur pour une case remplie) ;
+        - `check`        : tous ces résultats d'un coup (`BatchCheck`).
+
+    Pré-filtre
+    ----------
+    `prefilter` écarte, avant toute recherche, les grilles incohérentes,
+    celles dont une case vide n'a déjà plus aucun candidat et celles qui ont
+    trop peu d'indices. Le CLI fait de même sur un fichier « une grille par
+    ligne » et peut n'écrire que les grilles retenues, pour alimenter
+    `app.batch`.
+
+    Dépendance
+    ----------
+    NumPy est une dépendance optionnelle, importée au premier appel d'une
+    fonction du module (et non à son import) : le module s'importe sans
+    elle, mais ses fonctions lèvent alors ImportError.
+
+    Usage :
+        python -m app.vectorized entree.txt [--filter] [--min-clues N]
+            [-o sortie.txt]
+"""
+
+from __future__ import annotations
+
+import itertools
+import sys
+from typing import Iterable, Iterator, List, NamedTuple
+
+from .batch import iter_lines
+from .tables import CELLS, FULL_MASK, POPCOUNT, UNITS, UNITS_OF
+
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+np = None  # NumPy, importé au premier usage (voir `_require_numpy`)
+_tables: dict = {}
+
+
+class BatchCheck(NamedTuple):
+    """
+        Résultats de `check` pour un lot de N grilles.
+    """
+
+    clues: "np.ndarray"  # (N,) nombre d'indices
+    consistent: "np.ndarray"  # (N,) aucune valeur en double
+    solved: "np.ndarray"  # (N,) grille complète et correcte
+    candidates: "np.ndarray"  # (N, 81) masques de candidats (uint16)
+    dead: "np.ndarray"  # (N,) une case vide sans aucun candidat
+
+
+def _require_numpy() -> None:
+    """
+        Importe NumPy au premier appel ; lève ImportError s'il n'est pas
+        installé.
+    """
+
+    global np
+
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - dépendance optionnelle
+            raise ImportError("Ce module nécessite NumPy (pip install numpy).") from None
+
+        np = numpy
+
+
+def _table(name: str) -> "np.ndarray":
+    """
+        Tables d'index au format NumPy, construites au premier usage à partir
+        de `app.tables`.
+    """
+
+    if not _tables:
+        _tables["units"] = np.array(UNITS, dtype=np.intp)  # (27, 9)
+        _tables["units_of"] = np.array(UNITS_OF, dtype=np.intp)  # (81, 3)
+        _tables["popcount"] = np.array(POPCOUNT, dtype=np.uint8)  # (512,)
+
+        bits = np.zeros(10, dtype=np.uint16)
+        bits[1:] = 1 << np.arange(9, dtype=np.uint16)
+        _tables["bit_of"] = bits  # valeur -> bit (0 -> 0)
+
+    return _tables[name]
+
+
+def as_batch(grids) -> "np.ndarray":
+    """
+        ========================================================
+          Conversion / vérification d'un lot de grilles
+        ========================================================
+
+        Accepte un tableau (N, 81) ou un itérable de grilles compactes ;
+        retourne un tableau (N, 81) `uint8` (sans copie si c'est déjà le cas).
+    """
+
+    _require_numpy()
+
+    if not isinstance(grids, np.ndarray):
+        grids = [bytes(cells) for cells in grids]
+
+        if any(len(cells) != CELLS for cells in grids):
+            raise ValueError(f"Chaque grille doit contenir {CELLS} cases.")
+
+        buffer = np.frombuffer(b"".join(grids), dtype=np.uint8)
+        grids = buffer.reshape(len(grids), CELLS)
+
+    if grids.ndim != 2 or grids.shape[1] != CELLS:
+        raise ValueError(f"Le lot doit être de forme (N, {CELLS}) (reçu {grids.shape}).")
+
+    grids = grids.astype(np.uint8, copy=False)
+
+    if grids.size and grids.max() > 9:
+        raise ValueError("Valeur hors limites dans le lot (attendu : 0 à 9).")
+
+    return grids
+
+
+def parse_lines(lines: Iterable[str]) -> "tuple[np.ndarray, np.ndarray]":
+    """
+        ========================================================
+          Lignes compactes (format de `app.batch`) -> lot
+        ========================================================
+
+        Décodage vectorisé : retourne (lot, lignes valides). Une ligne mal
+        formée donne une grille vide et un indicateur False.
+    """
+
+    _require_numpy()
+
+    lines = list(lines)
+    raw = np.full((len(lines), CELLS), ord("."), dtype=np.uint8)
+    well_formed = np.zeros(len(lines), dtype=bool)
+
+    for row, line in enumerate(lines):
+        data = line.strip().encode("ascii", "replace")
+
+        if len(data) == CELLS:
+            raw[row] = np.frombuffer(data, dtype=np.uint8)
+            well_formed[row] = True
+
+    decode = np.full(256, 255, dtype=np.uint8)
+    decode[ord(".")] = decode[ord("0")] = 0
+    decode[ord("1") : ord("9") + 1] = np.arange(1, 10, dtype=np.uint8)
+
+    grids = decode[raw]
+    well_formed &= (grids != 255).all(axis=1)
+    grids[~well_formed] = 0
+
+    return grids, well_formed
+
+
+def clue_counts(grids) -> "np.ndarray":
+    """
+        Nombre d'indices de chaque grille, (N,).
+    """
+
+    grids = as_batch(grids)
+    return np.count_nonzero(grids, axis=1)
+
+
+def unit_masks(grids) -> "np.ndarray":
+    """
+        Masque des valeurs présentes dans chaque unité, (N, 27) `uint16`.
+    """
+
+    grids = as_batch(grids)
+    bits = _table("bit_of")[grids]
+    return np.bitwise_or.reduce(bits[:, _table("units")], axis=2)
+
+
+def consistent(grids) -> "np.ndarray":
+    """
+        Aucune valeur en double dans une unité, (N,) booléens : le nombre
+        de valeurs distinctes de chaque unité égale son nombre d'indices.
+    """
+
+    grids = as_batch(grids)
+    masks = unit_masks(grids)
+    filled = np.count_nonzero(grids[:, _table("units")], axis=2)
+    return (_table("popcount")[masks] == filled).all(axis=1)
+
+
+def is_solved(grids) -> "np.ndarray":
+    """
+        Grille complète et correcte, (N,) booléens : chaque unité contient
+        les 9 valeurs.
+    """
+
+    return (unit_masks(grids) == FULL_MASK).all(axis=1)
+
+
+def candidates(grids) -> "np.ndarray":
+    """
+        ========================================================
+          Masques de candidats de chaque case, (N, 81) `uint16`
+        ========================================================
+
+        Bit v - 1 levé si la valeur v ne figure ni dans la ligne, ni dans
+        la colonne, ni dans le bloc de la case. Une case remplie porte le
+        bit de sa valeur.
+    """
+
+    grids = as_batch(grids)
+    masks = unit_masks(grids)
+    taken = np.bitwise_or.reduce(masks[:, _table("units_of")], axis=2)
+    free = np.uint16(FULL_MASK) & ~taken
+    return np.where(grids > 0, _table("bit_of")[grids], free).astype(np.uint16)
+
+
+def check(grids) -> BatchCheck:
+    """
+        ========================================================
+          Vérification complète d'un lot
+        ========================================================
+
+        Les masques d'unités ne sont calculés qu'une fois pour l'ensemble
+        des résultats.
+    """
+
+    grids = as_batch(grids)
+    bits = _table("bit_of")[grids]
+    masks = np.bitwise_or.reduce(bits[:, _table("units")], axis=2)
+
+    clues = np.count_nonzero(grids, axis=1)
+    filled = np.count_nonzero(grids[:, _table("units")], axis=2)
+    ok = (_table("popcount")[masks] == filled).all(axis=1)
+    solved = (masks == FULL_MASK).all(axis=1)
+
+    taken = np.bitwise_or.reduce(masks[:, _table("units_of")], axis=2)
+    free = (np.uint16(FULL_MASK) & ~taken).astype(np.uint16)
+    cands = np.where(grids > 0, bits, free).astype(np.uint16)
+    dead = ((grids == 0) & (free == 0)).any(axis=1)
+
+    return BatchCheck(clues, ok, solved, cands, dead)
+
+
+def prefilter(grids, min_clues: int = 0) -> "np.ndarray":
+    """
+        ========================================================
+          Pré-filtre avant résolution, (N,) booléens
+        ========================================================
+
+        Retient les grilles cohérentes, sans case vide privée de candidats
+        et ayant au moins `min_clues` indices (17 est le minimum pour une
+        grille à solution unique).
+    """
+
+    result = check(grids)
+    return result.consistent & ~result.dead & (result.clues >= min_clues)
+
+
+def _chunks(lines: Iterator[str], size: int) -> Iterator[List[str]]:
+    """
+        Paquets de `size` lignes, lus à la demande.
+    """
+
+    while True:
+        chunk = list(itertools.islice(lines, size))
+
+        if not chunk:
+            return
+
+        yield chunk
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+        ========================================================
+          Point d'entrée CLI
+        ========================================================
+
+        Usage :
+            python -m app.vectorized entree.txt [--filter] [--min-clues N]
+                [-o sortie.txt]
+
+        - Sans `--filter`, seul le bilan est produit (sur stderr).
+        - Avec `--filter`, les grilles retenues par `prefilter` sont écrites
+          (sortie standard par défaut), prêtes pour `app.batch`.
+    """
+
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Vérifie un fichier de grilles par lots (NumPy)")
+
+    parser.add_argument("path", help="Fichier d'entrée, une grille de 81 caractères par ligne.")
+    parser.add_argument("--filter", action="store_true", help="Écrit les grilles retenues.")
+    parser.add_argument(
+        "--min-clues",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Nombre minimal d'indices pour retenir une grille (défaut : 0).",
+    )
+    parser.add_argument("-o", "--output", help="Fichier de sortie (défaut : sortie standard).")
+    args = parser.parse_args(argv)
+
+    try:
+        _require_numpy()
+    except ImportError as exc:
+        print(f"Erreur : {exc}", file=sys.stderr)
+        return 1
+
+    totals = dict(puzzles=0, invalid=0, inconsistent=0, dead=0, solved=0, kept=0)
+
+    try:
+        with open(args.path, "r", encoding="utf-8") as source:
+            target = None
+
+            if args.filter:
+                target = sys.stdout if args.output is None else open(args.output, "w", encoding="utf-8")
+
+            try:
+                for lines in _chunks(iter_lines(source), DEFAULT_CHUNK_SIZE):
+                    grids, well_formed = parse_lines(lines)
+                    result = check(grids)
+                    kept = well_formed & result.consistent & ~result.dead
+                    kept &= result.clues >= args.min_clues
+
+                    totals["puzzles"] += len(lines)
+                    totals["invalid"] += int((~well_formed).sum())
+                    totals["inconsistent"] += int((well_formed & ~result.consistent).sum())
+                    totals["dead"] += int((well_formed & result.consistent & result.dead).sum())
+                    totals["solved"] += int((well_formed & result.solved).sum())
+                    totals["kept"] += int(kept.sum())
+
+                    if target is not None:
+                        for line in itertools.compress(lines, kept):
+                            target.write(line + "\n")
+
+            finally:
+                if target is not None and target is not sys.stdout:
+                    target.close()
+
+    except (OSError, ValueError) as exc:  # pragma: no cover - CLI UX
+        print(f"Erreur d'accès au fichier: {exc}", file=sys.stderr)
+        return 1
+
+    print(
+        "{puzzles} grille(s) : {invalid} mal formée(s), {inconsistent} incohérente(s), "
+        "{dead} sans issue, {solved} déjà résolue(s) ; {kept} retenue(s).".format(**totals),
+        file=sys.stderr,
+    )
+
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover - exécution directe
+    raise SystemExit(main())
@@ -1,8 +1,10 @@
 import operator
 import time
-import pprint
 import sys
 
+from app.tables import COORDS, FULL_MASK, PEERS, POPCOUNT, UNITS, UNITS_OF
+from app.transposition import ZOBRIST, zobrist_key
+
 grille = []
 nb_iter = 0
 FULL = [1, 2, 3, 4, 5, 6, 7, 8, 9]
@@ -27,25 +29,161 @@ class Grille:
         notamment parce qu'il y a plusieurs fonctions qu'il est utile de rattacher
         à "l'objet" grille.
 
-        Il n'y a qu'un seul attribut, qui est la liste des valeurs de la grille. 
+        L'attribut principal est la liste des valeurs de la grille. 
 
         La liste est renseignée d'après un fichier texte, et a une longeur de 81 (9x9).
+        Elle est stockée sous forme compacte (un 'bytearray' de 81 octets), ce qui fait
+        de la copie d'une grille une seule allocation.
         Elle contient, pour chaque case, une valeur de 0 à 9 :
 
             - 0 si la case n'est pas renseignée ;
             - Sinon la valeur de la case (de 1 à 9)
 
+        La grille tient aussi à jour, au fil des placements (méthode 'place'), le nombre de
+        cases remplies et le remplissage de chacune des 27 unités (lignes, colonnes, blocs).
+        Savoir si la grille est complète ('est_complete') ne demande donc plus de la parcourir :
+        la vérification complète ('est_resolu') n'est faite que sur les grilles complètes.
+
+        Elle tient enfin à jour les candidats de chaque case vide (masque de 9 bits, bit num - 1
+        pour la valeur num), ce qui rend 'est_possible' et 'cherche_ordre' immédiats.
+        La recherche ('cherche') travaille sur une seule grille, modifiée sur place : chaque
+        placement est inscrit dans un journal (case placée, candidats éliminés chez ses voisins),
+        et 'annule' défait le dernier placement lors du retour arrière.
+
+        La clé de Zobrist de la grille ('cle', voir app.transposition) est elle aussi tenue
+        à jour à chaque placement et à chaque annulation, pour la table de transposition
+        facultative de 'cherche'.
+
     '''
 
     def __init__(self, item_list):
 
         #
-        # Initialisation de la grille
+        # Initialisation de la grille, et décompte initial des cases remplies (en tout, et par unité)
+        #
+
+        self.item = bytearray(item_list)
+        self.nb_remplies = 81 - self.item.count(0)
+        self.remplissage = [9 - bytes(self.item[pos] for pos in unite).count(0) for unite in UNITS]
+        self.unites_completes = self.remplissage.count(9)
+
+        #
+        # Candidats de chaque case vide : les valeurs absentes de ses 20 voisins (0 pour une case remplie)
+        #
+
+        self.candidats = [0] * 81
+        for pos in range(0,81):
+            if (self.item[pos] == 0):
+                presentes = 0
+                for voisin in PEERS[pos]:
+                    if self.item[voisin]:
+                        presentes |= 1 << (self.item[voisin] - 1)
+                self.candidats[pos] = FULL_MASK & ~presentes
+
+        # Journal des placements, pour 'annule'
+        self.journal = []
+
+        # Clé de Zobrist de la grille
+        self.cle = zobrist_key(self.item)
+
+
+    def copie(self):
+
+        #
+        # Copie de la grille, compteurs et candidats compris (sans les recalculer).
+        # La copie part d'un journal vide : ses placements ne s'annulent que jusqu'à la copie.
+        #
+
+        nouvelle = Grille.__new__(Grille)
+        nouvelle.item = self.item[:]
+        nouvelle.nb_remplies = self.nb_remplies
+        nouvelle.remplissage = self.remplissage[:]
+        nouvelle.unites_completes = self.unites_completes
+        nouvelle.candidats = self.candidats[:]
+        nouvelle.journal = []
+        nouvelle.cle = self.cle
+        return nouvelle
+
+
+    def place(self, pos, num):
+
+        #
+        # Place 'num' dans la case (vide) 'pos', et met à jour les compteurs : une case remplie
+        # de plus, ainsi que dans chacune des 3 unités (ligne, colonne, bloc) de la case.
+        #
+        # 'num' n'est plus candidat chez les voisins (vides) de la case : on note lesquels
+        # l'ont perdu, avec les candidats de la case elle-même, dans le journal.
+        #
+
+        bit = 1 << (num - 1)
+        candidats = self.candidats
+        elimines = []
+        for voisin in PEERS[pos]:
+            if candidats[voisin] & bit:
+                candidats[voisin] ^= bit
+                elimines.append(voisin)
+
+        self.journal.append((pos, candidats[pos], elimines))
+        candidats[pos] = 0
+
+        self.item[pos] = num
+        self.cle ^= ZOBRIST[pos][num]
+        self.nb_remplies += 1
+
+        for unite in UNITS_OF[pos]:
+            self.remplissage[unite] += 1
+            if self.remplissage[unite] == 9:
+                self.unites_completes += 1
+
+
+    def annule(self):
+
+        #
+        # Annule le dernier placement du journal : la case redevient vide, ses candidats et ceux
+        # des voisins concernés sont rétablis, et les compteurs décrémentés.
+        #
+
+        pos, candidats_pos, elimines = self.journal.pop()
+
+        bit = 1 << (self.item[pos] - 1)
+        candidats = self.candidats
+        for voisin in elimines:
+            candidats[voisin] |= bit
+        candidats[pos] = candidats_pos
+
+        self.cle ^= ZOBRIST[pos][self.item[pos]]
+        self.item[pos] = 0
+        self.nb_remplies -= 1
+
+        for unite in UNITS_OF[pos]:
+            if self.remplissage[unite] == 9:
+                self.unites_completes -= 1
+            self.remplissage[unite] -= 1
+
+
+    def est_complete(self):
+
+        #
+        # Toutes les cases sont-elles remplies ? Réponse immédiate, grâce au compteur.
+        # Comme 'cherche' ne place que des valeurs possibles ('est_possible'), une grille
+        # de départ cohérente et complète est forcément résolue.
+        #
+
+        return self.nb_remplies == 81
+
+
+    def est_coherente(self):
+
+        #
+        # Vérification d'une grille d'entrée : aucune valeur ne doit être répétée dans une ligne,
+        # une colonne ou un bloc (les cases vides ne comptent pas).
         #
 
-        self.item = []
-        for i in item_list:
-            self.item.append(i)
+        item = self.item
+        for pos in range(0,81):
+            if item[pos] and any(item[voisin] == item[pos] for voisin in PEERS[pos]):
+                return False
+        return True
 
 
     def __str__(self):
@@ -141,7 +279,7 @@ class Grille:
         # Renvoie la coordonnées cartésienne (sous forme x,y) d'une position (qui est donc un index de liste)
         #
 
-        return (pos // 9, pos % 9)
+        return COORDS[pos]
 
 
     def cherche_ordre(self):
@@ -166,15 +304,11 @@ class Grille:
             nb_possibilites = 0
 
             # Si la case est remplie (valeur non nulle), c'est 0 ! 
-            # Sinon on teste les nombres de 1 à 9, on regarde si on pourrait le mettre dans la case (ou pas)
+            # Sinon c'est le nombre de candidats de la case (les nombres de 1 à 9 qu'on pourrait y mettre),
+            # lu dans la table POPCOUNT
             if (self.item[pos] == 0):
 
-                # Case non remplie, donc on regarde (pour la case en position 'pos')
-                for num in range(1,10):
-
-                    # On vérifie si on peut utiliser 'num' dans la case 'pos'
-                    if (self.est_possible(num, pos)):
-                        nb_possibilites += 1
+                nb_possibilites = POPCOUNT[self.candidats[pos]]
 
                 # finalement...
                 possibilite_grille[pos] = nb_possibilites
@@ -200,7 +334,7 @@ class Grille:
         # Note importante
         # ---------------
         #
-        # On crée de nouveaux objets à chaque fois par un ... = []
+        # On trie avec sorted(), qui crée une nouvelle liste, plutôt qu'avec .sort().
         # En effet, en Python, lorsqu'on affecte t2 = t1 pour des listes, tableaux, etc., 
         # c'est la référence à l'objet qui est passée, et non le contenu.
         # Si, dans l'exemple précédent on modifie t2, alors on modifie aussi t1 !
@@ -211,25 +345,19 @@ class Grille:
 
         # Vérification des lignes
         for i in range(0,9):
-            lig = []
-            lig = self.ligne(i)
-            lig.sort()
+            lig = sorted(self.ligne(i))
             if (lig != FULL):
                 return False
 
         # Vérification des colonnes
         for j in range(0,9):
-            col = []
-            col = self.colonne(j)
-            col.sort()
+            col = sorted(self.colonne(j))
             if (col != FULL):
                 return False
 
         # Vérification des carrés
         for c in range(0,9):
-            car = []
-            car = self.bloc_index(c)
-            car.sort()
+            car = sorted(self.bloc_index(c))
             if (car != FULL):
                 return False
 
@@ -248,14 +376,24 @@ class Grille:
         #   1) Ni dans la ligne de la case 'pos' considérée ;
         #   2) Ni dans la colonne ;
         #   3) Ni dans la bloc entourant la case.
+        #
+        # Pour une case vide, c'est exactement dire que 'num' fait partie de ses candidats.
+        # Pour une case remplie, on lit ces 20 cases (les « voisins » de 'pos') dans la table
+        # précalculée PEERS.
 
-        lig, col = self.coord(pos)
-        if (num not in self.ligne(lig)) and (num not in self.colonne(col) and (num not in self.bloc_xy(lig, col))):
-            if (DEBUG):
-                print("On peut mettre {} dans la grille à la position ({}, {}).".format(num, lig, col))
-            return True
+        if (self.item[pos] == 0):
+            if not (self.candidats[pos] >> (num - 1)) & 1:
+                return False
         else:
-            return False
+            item = self.item
+            for voisin in PEERS[pos]:
+                if item[voisin] == num:
+                    return False
+
+        if (DEBUG):
+            lig, col = self.coord(pos)
+            print("On peut mettre {} dans la grille à la position ({}, {}).".format(num, lig, col))
+        return True
 
 
 
@@ -264,6 +402,13 @@ class Grille:
       Fonction de lecture de la grille de Sudoku
     =====================================================================
 '''
+#
+# Table de conversion caractère -> valeur de case, pour bytes.translate :
+# '1' à '9' donnent 1 à 9, tout autre caractère 0 (case inconnue)
+#
+CONVERSION = bytes(octet - 48 if 49 <= octet <= 57 else 0 for octet in range(256))
+
+
 def lecture_fichier(nom_fichier):
 
     # 
@@ -274,16 +419,14 @@ def lecture_fichier(nom_fichier):
     with open(nom_fichier,"r") as f:
         lignes = f.readlines()
         
-    grille = []
+    grille = bytearray()
     for ligne in lignes:
         lg = ligne.rstrip('\n')
         lg = lg.replace(' ','')
         if (len(lg) == 9):
-            for c in lg:
-                try:
-                    grille.append(int(c))
-                except:
-                    grille.append(int(0))
+            # Conversion de toute la ligne d'un coup, par la table CONVERSION
+            # ('replace' : un caractère non ASCII devient un seul octet, donc une case inconnue)
+            grille += lg.encode('ascii', 'replace').translate(CONVERSION)
         elif (len(lg) == 0):
             pass
         else:
@@ -301,22 +444,31 @@ def lecture_fichier(nom_fichier):
       Fonction globale de résolution de la grille de Sudoku
     =====================================================================
 '''
-def cherche(grille):
+def cherche(grille, budget=None, table=None):
 
     # 
     # Fonction de recherche de solution.
     #
-    # Paramètre en entrée : 
+    # Paramètres en entrée : 
     #
-    #   - La grille en cours de résolution.
+    #   - La grille en cours de résolution ;
+    #   - Un budget facultatif (voir app.budget) : nombre maximal d'itérations, durée maximale,
+    #     jeton d'annulation. Il est vérifié toutes les 'budget.check_every' itérations (en comptant
+    #     avec 'nb_iter', à remettre à zéro avant la recherche) ; une limite atteinte lève
+    #     SearchAborted, et les solutions déjà trouvées restent comptées dans 'nb_solutions'.
+    #   - Une table de transposition facultative (voir app.transposition), qui peut servir d'une
+    #     recherche à l'autre : une grille déjà explorée sans solution est abandonnée aussitôt, et
+    #     chaque grille explorée en entier y est enregistrée avec son nombre de solutions.
     #
-    # Si la grille est remplie, on a terminé. On sort de la boucle infernale.
+    # Si la grille est remplie, on a terminé. On sort de la boucle infernale. Le test est immédiat
+    # (compteur de cases remplies) ; la vérification complète n'est faite que sur la grille finale.
     #
     # Sinon, on calcule l'ordre des cases à examiner, afin de minimiser la profondeur de la recherche.
     #
     # On va ensuite prendre la grille en cours, et tenter de remplir les cases, dans l'ordre 
     # donné par la liste 'ordre'. On va commencer par la 1ère dans la liste,
-    # puis on va relancer la fonction de recherche avec cette nouvelle grille.
+    # puis on va relancer la fonction de recherche sur la même grille, modifiée sur place ;
+    # au retour, le placement est annulé (journal de la grille, méthode 'annule').
     #
     # Il pourra se passer deux choses :
     #
@@ -334,14 +486,19 @@ def cherche(grille):
 
     if (nb_iter % 5000) == 0:
         print(nb_iter, 'essais')
+    if budget is not None and (nb_iter % budget.check_every) == 0:
+        budget.check(nb_iter)
     if (DEBUG):
         print("({})".format(nb_iter))
         grille.joli_print()
         print()
 
-    if (grille.est_resolu()):
+    if (grille.est_complete()):
 
-        # La grille est complète : on a gagné !
+        # La grille est complète : on vérifie (et compte) la solution, et on a gagné !
+
+        if (not grille.est_resolu()):
+            return False
 
         print('='*40)
         print('SOLUTION #{} TROUVEE ({} itérations) :'.format(nb_solutions, nb_iter))
@@ -362,6 +519,11 @@ def cherche(grille):
         # recalcule l'ordre des cases à remplir (pour optimiser le calcul), et on relance 
         # la recherche avec une grille qui aura donc une case de moins à trouver.
 
+        if table is not None:
+            if table.probe(grille.cle) == 0:
+                return False
+            solutions_avant = nb_solutions
+
         ordre = grille.cherche_ordre()
 
         if (DEBUG):
@@ -380,14 +542,14 @@ def cherche(grille):
                     if (grille.est_possible(num, ind)):
 
                         # Oui, c'est possible. On peut (pour l'instant) ajouter num dans la case indexée 'ind'.
-                        # On relance la recherche sur une NOUVELLE grille (= un nouvel objet Python)
-                        new_grille = Grille(grille.item)
-                        if (DEBUG):
-                            print('grille    ', id(grille))
-                            print('new_grille', id(new_grille))
-                        new_grille.item[ind] = num
-
-                        cherche(new_grille)
+                        # On relance la recherche sur la MEME grille (pas de copie), puis on annule
+                        # le placement, même si la recherche a été interrompue (budget) : la grille
+                        # de l'appelant est ainsi rendue intacte.
+                        grille.place(ind, num)
+                        try:
+                            cherche(grille, budget, table)
+                        finally:
+                            grille.annule()
 
                 else:
 
@@ -400,6 +562,9 @@ def cherche(grille):
             # utilité du break ?
             break
 
+        if table is not None:
+            table.store(grille.cle, nb_solutions - solutions_avant)
+
         if (DEBUG):
             print("Fin des recheches (infructueuses)")
 
@@ -416,51 +581,68 @@ def cherche(grille):
 
 DEFAULT_FILE_NAME = "1.txt"
 
-#
-# On demande en imput (ou en argument de ligne de commande) le nom du fichier, avec ou sans extension '.txt' (qui est ajoutée automatiquement)
-#
-nb_arg = len(sys.argv) - 1
-print(nb_arg)
-
-if (nb_arg == 1):
-    file_name = sys.argv[1]
-else:    
-    file_name = input("Nom du fichier (grille), sans .txt [{}]: ".format(DEFAULT_FILE_NAME))
-
-# On rajoute le '.txt' pour les noms de fichiers n'en ayant pas.    
-if (len(file_name) == 0):
-    file_name = str(DEFAULT_FILE_NAME)
-else:
-    if (len(file_name) < 4):
-        file_name += ".txt"
-    elif (file_name[-4:] != ".txt"):
-        file_name += ".txt"
 
-#
-# On crée ensuite la grille initiale
-#   
-#       
-grille = lecture_fichier(file_name)
-print("\nGrille initiale")
-print(grille)
-print()
+def main():
+
+    #
+    # Programme principal, exécuté uniquement quand le fichier est lancé comme script
+    # (python sudoku.py [fichier]). On peut ainsi importer le module, par exemple pour
+    # mesurer les performances de 'cherche', sans déclencher la saisie ni la recherche.
+    #
 
-# Précaution devenue inutile après diverses optimisations
-#sys.setrecursionlimit(99999)
+    #
+    # On demande en imput (ou en argument de ligne de commande) le nom du fichier, avec ou sans extension '.txt' (qui est ajoutée automatiquement)
+    #
+    nb_arg = len(sys.argv) - 1
+    print(nb_arg)
 
-if (grille.est_resolu()):
-    print("La grille en entrée est déjà terminée ! Il n'y a rien à faire !")
-    exit()
+    if (nb_arg == 1):
+        file_name = sys.argv[1]
+    else:    
+        file_name = input("Nom du fichier (grille), sans .txt [{}]: ".format(DEFAULT_FILE_NAME))
+
+    # On rajoute le '.txt' pour les noms de fichiers n'en ayant pas.    
+    if (len(file_name) == 0):
+        file_name = str(DEFAULT_FILE_NAME)
+    else:
+        if (len(file_name) < 4):
+            file_name += ".txt"
+        elif (file_name[-4:] != ".txt"):
+            file_name += ".txt"
+
+    #
+    # On crée ensuite la grille initiale
+    #   
+    #       
+    grille = lecture_fichier(file_name)
+    print("\nGrille initiale")
+    print(grille)
+    print()
+
+    # Précaution devenue inutile après diverses optimisations
+    #sys.setrecursionlimit(99999)
+
+    if (not grille.est_coherente()):
+        print("La grille en entrée est incohérente (valeur répétée dans une ligne, une colonne ou un bloc) !")
+        return
+
+    if (grille.est_resolu()):
+        print("La grille en entrée est déjà terminée ! Il n'y a rien à faire !")
+        return
+
+    #
+    # On effectue la recherche. 
+    #
+
+    print('On démarre la recherche...\n')
+    t0 = time.time()
+    cherche(grille)
+    t1 = time.time() 
+    print("Problème résolu en {:6f} secondes.\n".format(t1 - t0))
 
-#
-# On effectue la recherche. 
-#
 
-print('On démarre la recherche...\n')
-t0 = time.time()
-cherche(grille)
-t1 = time.time() 
-print("Problème résolu en {:6f} secondes.\n".format(t1 - t0))
+if __name__ == "__main__":
+    main()
 
 # Fin
 